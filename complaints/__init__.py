@@ -0,0 +1,6 @@
+"""
+مكونات مساعدة لخدمة الشكاوى - نائبك
+
+وحدات مستقلة عن Flask وقاعدة البيانات تستخدمها complaints_service.py
+(التخزين المؤقت، معالجة النصوص، ...)
+"""
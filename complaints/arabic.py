@@ -0,0 +1,47 @@
+"""
+تطبيع النصوص العربية للبحث والمقارنة
+
+- توحيد أشكال الألف (أ إ آ ٱ ← ا) والياء (ى ← ي) والتاء المربوطة (ة ← ه)
+- حذف التشكيل والتطويل
+- تحويل الأرقام العربية الهندية إلى أرقام لاتينية
+- تجريد أداة التعريف وحروف العطف والجر الملتصقة من بداية الكلمة
+"""
+
+import re
+
+_DIACRITICS = re.compile('[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]')
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+_FOLDING = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+# الأطول أولاً حتى لا يُجرد "ال" قبل "وال"
+_PREFIXES = ('وبال', 'وكال', 'ولل', 'وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+_MIN_STEM_LENGTH = 2
+
+
+def normalize_arabic(text):
+    """تطبيع نص عربي دون تقسيمه إلى كلمات"""
+    if not text:
+        return ''
+    return _DIACRITICS.sub('', text).translate(_FOLDING).lower()
+
+
+def strip_prefix(token):
+    """تجريد أداة التعريف والحروف الملتصقة إذا بقي جذر كافٍ"""
+    for prefix in _PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= _MIN_STEM_LENGTH:
+            return token[len(prefix):]
+    return token
+
+
+def tokenize(text):
+    """تقسيم النص المطبع إلى كلمات بحث"""
+    return [strip_prefix(token) for token in _TOKEN.findall(normalize_arabic(text))]
+
+
+def search_document(*parts):
+    """نص موحد جاهز للفهرسة من عدة حقول"""
+    return ' '.join(token for part in parts for token in tokenize(part))
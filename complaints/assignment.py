@@ -0,0 +1,132 @@
+"""
+التوزيع الآلي للشكاوى الجديدة على النواب
+
+- جدول توجيه محسوب مسبقاً: (المحافظة، نوع الشكوى) ← النواب المرشحون
+  حسب إعدادات التوزيع بالموقع و/أو بالنوع
+- موازنة الحمل بعدد الشكاوى المفتوحة لكل نائب في الذاكرة، يُحدث مع كل تكليف
+  أو إغلاق، ويُعاد تحميله من قاعدة البيانات كل refresh_interval ثانية لتصحيح
+  الانحراف بين العمليات
+- قرار التوجيه بحث في قاموس واختيار الأقل حملاً دون أي استعلام
+"""
+
+import threading
+import time
+
+
+def build_routing_table(routes, by_location=True, by_type=True):
+    """حساب المرشحين لكل مفتاح توجيه
+    
+    routes: [(deputy_id, governorate_id أو None, complaint_type_id أو None)]
+    المفتاح (المحافظة، النوع) بحسب الإعدادات، مع None للبعد غير المستخدم.
+    الأولوية للنواب المطابقين للبعدين معاً ثم للمحافظة فقط ثم للنوع فقط.
+    """
+    exact, by_governorate, by_complaint_type = {}, {}, {}
+    for deputy_id, governorate_id, complaint_type_id in routes:
+        if governorate_id is not None and complaint_type_id is not None:
+            exact.setdefault((governorate_id, complaint_type_id), []).append(deputy_id)
+        elif governorate_id is not None:
+            by_governorate.setdefault(governorate_id, []).append(deputy_id)
+        elif complaint_type_id is not None:
+            by_complaint_type.setdefault(complaint_type_id, []).append(deputy_id)
+
+    table = {}
+    if by_location and by_type:
+        governorates = {g for g, _ in exact} | set(by_governorate)
+        types = {t for _, t in exact} | set(by_complaint_type)
+        for governorate_id in governorates:
+            for complaint_type_id in types | {None}:
+                candidates = (
+                    exact.get((governorate_id, complaint_type_id))
+                    or by_governorate.get(governorate_id)
+                    or by_complaint_type.get(complaint_type_id)
+                )
+                if candidates:
+                    table[(governorate_id, complaint_type_id)] = tuple(sorted(set(candidates)))
+        for complaint_type_id, candidates in by_complaint_type.items():
+            table.setdefault((None, complaint_type_id), tuple(sorted(set(candidates))))
+    elif by_location:
+        merged = dict(by_governorate)
+        for (governorate_id, _), deputies in exact.items():
+            merged.setdefault(governorate_id, []).extend(deputies)
+        table = {(g, None): tuple(sorted(set(d))) for g, d in merged.items()}
+    elif by_type:
+        merged = dict(by_complaint_type)
+        for (_, complaint_type_id), deputies in exact.items():
+            merged.setdefault(complaint_type_id, []).extend(deputies)
+        table = {(None, t): tuple(sorted(set(d))) for t, d in merged.items()}
+    return table
+
+
+class AssignmentEngine:
+    """محرك توزيع على مستوى العملية مع أحمال النواب في الذاكرة"""
+
+    def __init__(self, loader, settings, refresh_interval=300, clock=time.monotonic):
+        # loader() -> (routes, loads) حيث loads: {deputy_id: عدد الشكاوى المفتوحة}
+        self.loader = loader
+        self.settings = settings
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._table = None
+        self._loads = {}
+        self._loaded_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.settings.get('auto_assign_enabled')) and (
+            bool(self.settings.get('auto_assign_by_location')) or bool(self.settings.get('auto_assign_by_type'))
+        )
+
+    def _key(self, governorate_id, complaint_type_id):
+        return (
+            governorate_id if self.settings.get('auto_assign_by_location') else None,
+            complaint_type_id if self.settings.get('auto_assign_by_type') else None,
+        )
+
+    def _ensure_loaded(self):
+        if self._table is not None and not self._stale and self.clock() - self._loaded_at < self.refresh_interval:
+            return
+        self.refresh()
+
+    def refresh(self):
+        """إعادة بناء جدول التوجيه والأحمال من قاعدة البيانات فوراً"""
+        routes, loads = self.loader()
+        table = build_routing_table(
+            routes,
+            by_location=bool(self.settings.get('auto_assign_by_location')),
+            by_type=bool(self.settings.get('auto_assign_by_type')),
+        )
+        with self._lock:
+            self._table = table
+            self._loads = dict(loads)
+            self._loaded_at = self.clock()
+            self._stale = False
+
+    def assign(self, governorate_id, complaint_type_id):
+        """اختيار النائب الأقل حملاً للشكوى وحجز مكانها في حمله - يعيد المعرف أو None"""
+        if not self.enabled:
+            return None
+        self._ensure_loaded()
+        key = self._key(governorate_id, complaint_type_id)
+        with self._lock:
+            candidates = self._table.get(key) or self._table.get((key[0], None)) or self._table.get((None, key[1]))
+            if not candidates:
+                return None
+            deputy_id = min(candidates, key=lambda candidate: (self._loads.get(candidate, 0), candidate))
+            self._loads[deputy_id] = self._loads.get(deputy_id, 0) + 1
+            return deputy_id
+
+    def adjust(self, deputy_id, delta):
+        """تعديل حمل نائب بعد تكليف أو إغلاق أو إلغاء تكليف"""
+        if deputy_id is None:
+            return
+        with self._lock:
+            self._loads[deputy_id] = max(self._loads.get(deputy_id, 0) + delta, 0)
+
+    def load_of(self, deputy_id):
+        return self._loads.get(deputy_id, 0)
+
+    def mark_stale(self):
+        """إعادة بناء جدول التوجيه والأحمال عند الاستخدام التالي"""
+        self._stale = True
@@ -0,0 +1,37 @@
+"""
+مخزن المرفقات حسب المحتوى (content-addressed)
+
+كل ملف يُخزن مرة واحدة باسم بصمته SHA-256 في شجرة مجزأة
+objects/ab/cd/abcd...، فرفع نفس الصورة أو المستند لعدة شكاوى لا يستهلك
+مساحة إضافية. عدد المراجع يُحفظ في قاعدة البيانات ويُحذف الملف عند وصوله للصفر.
+"""
+
+import glob
+import os
+
+OBJECTS_DIR = 'objects'
+
+
+def blob_path(root, sha256):
+    """المسار المجزأ لمحتوى ببصمة معينة"""
+    return os.path.join(root, OBJECTS_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def store_blob(received, root):
+    """نقل ملف مستقبل إلى موضعه في المخزن (إعادة تسمية ذرية) وإرجاع مساره"""
+    return received.commit_to(blob_path(root, received.sha256))
+
+
+def remove_blob(path):
+    """حذف محتوى لم يعد له مراجع ونسخه المشتقة مع تنظيف مجلدات التجزئة الفارغة"""
+    for derived in glob.glob(glob.escape(path) + '.*'):
+        os.remove(derived)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return
+    for directory in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
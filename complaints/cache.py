@@ -0,0 +1,141 @@
+"""
+تخزين مؤقت للاستجابات مع مدة صلاحية (TTL) وحد أقصى للحجم
+
+يحتفظ كل عملية بنسخة محلية في الذاكرة، ويمكن ربطه اختيارياً بـ Redis
+لمشاركة القيم بين عمليات gunicorn. الإبطال يمسح النسخة المحلية والمشتركة معاً،
+أما النسخ المحلية في العمليات الأخرى فتنتهي بانتهاء مدة صلاحيتها.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class RedisBackend:
+    """واجهة تخزين مشتركة فوق Redis"""
+
+    def __init__(self, url, prefix='naebak:complaints:cache:'):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, max(int(ttl), 1), value)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+def backend_from_url(url):
+    """إنشاء واجهة التخزين المشتركة إذا كان Redis متاحاً، وإلا None"""
+    if not url or redis is None:
+        return None
+    return RedisBackend(url)
+
+
+class ResponseCache:
+    """ذاكرة مؤقتة LRU محدودة الحجم لقيم bytes مع عدادات الإصابة والإخفاق"""
+
+    def __init__(self, ttl=30, max_entries=128, backend=None, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.backend = backend
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """إرجاع القيمة المخزنة أو None"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._backend_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value, now)
+        return value
+
+    def set(self, key, value):
+        """تخزين قيمة محلياً وفي واجهة التخزين المشتركة إن وجدت"""
+        with self._lock:
+            self._store(key, value, self.clock())
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, self.ttl)
+            except Exception:
+                pass
+
+    def get_or_set(self, key, producer):
+        """إرجاع القيمة المخزنة أو حسابها بواسطة producer وتخزينها"""
+        value = self.get(key)
+        if value is None:
+            value = producer()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key=None):
+        """إبطال مفتاح محدد أو كل القيم المخزنة"""
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            for k in keys:
+                self._entries.pop(k, None)
+            self.invalidations += 1
+        if self.backend is not None:
+            for k in keys:
+                try:
+                    self.backend.delete(k)
+                except Exception:
+                    pass
+
+    def stats(self):
+        """عدادات الأداء للذاكرة المؤقتة"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'shared_backend': self.backend is not None,
+            }
+
+    def _store(self, key, value, now):
+        self._entries[key] = (now + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _backend_get(self, key):
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.get(key)
+        except Exception:
+            return None
@@ -0,0 +1,184 @@
+"""
+اكتشاف الشكاوى شبه المكررة بتوقيعات MinHash وفهرس LSH في الذاكرة
+
+- النص (العنوان + الوصف) يُطبع بنفس تطبيع البحث ثم يُقسم إلى أزواج كلمات متتالية
+- توقيع MinHash بطول ثابت يقدر تشابه Jaccard بين مجموعتي الأزواج
+- التوقيع يُقسم إلى نطاقات (bands)؛ تطابق أي نطاق كامل يجعل الشكوى مرشحة، فالبحث
+  عدد ثابت من عمليات القاموس بدلاً من مقارنة الشكوى بكل الشكاوى السابقة
+- التوقيعات تُحفظ مع الشكاوى في قاعدة البيانات، والفهرس يحمّل عند كل تحديث نافذة
+  من آخر الصفوف (id أكبر من آخر صف محمل ناقص lookback) حتى لا تفوته صفوف
+  حُجزت أرقامها قبل آخر صف محمل لكنها حُفظت بعده، والمحمّل سابقاً يُتجاهل
+"""
+
+import hashlib
+import struct
+import threading
+import time
+
+from complaints.arabic import tokenize
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+SHINGLE_SIZE = 2
+DEFAULT_THRESHOLD = 0.6
+
+# قيمة الخانة 24 بت وإزاحة التكثيف (حتى 63 خانة) فوقها، فيبقى التوقيع في 32 بت
+_MAX_VALUE = (1 << 24) - 1
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """مجموعة تتابعات الكلمات المطبعة (أو الكلمات نفسها للنصوص القصيرة جداً)"""
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return set(tokens)
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _stable_hash(shingle, salt=b''):
+    # hash() المدمجة تتغير بين العمليات، والتوقيعات تُحفظ في قاعدة البيانات
+    digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8, salt=salt).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class MinHasher:
+    """توقيعات MinHash بتبديل واحد (one-permutation hashing) مع تكثيف الخانات الفارغة
+
+    كل زوج كلمات يُجزأ مرة واحدة: جزء من التجزئة يحدد خانته من num_permutations
+    خانة والباقي قيمته، والتوقيع هو أصغر قيمة في كل خانة. الخانة الفارغة تأخذ قيمة
+    أقرب خانة غير فارغة على يمينها (دورياً) مع إزاحة بالمسافة، فيبقى تطابق الخانات
+    تقديراً لتشابه Jaccard وتكون الكلفة بعدد الأزواج لا بحاصل ضربه في عدد التباديل.
+    نفس البذرة تعطي نفس التوقيع في كل عملية.
+    """
+
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, seed=1):
+        self.num_permutations = num_permutations
+        self.salt = seed.to_bytes(16, 'little')
+
+    def signature(self, text):
+        """توقيع النص كـ tuple من أعداد 32 بت، أو None إذا لم يحتوِ كلمات"""
+        size = self.num_permutations
+        bins = [None] * size
+        for shingle in shingles(text):
+            value = _stable_hash(shingle, self.salt)
+            slot, value = value % size, (value // size) & _MAX_VALUE
+            if bins[slot] is None or value < bins[slot]:
+                bins[slot] = value
+        first = next((slot for slot in range(size) if bins[slot] is not None), None)
+        if first is None:
+            return None
+        signature = list(bins)
+        # مرور عكسي واحد: following أقرب خانة غير فارغة بعد الخانة الحالية دورياً
+        following = first + size
+        for slot in reversed(range(size)):
+            if bins[slot] is None:
+                signature[slot] = bins[following % size] + (following - slot) * (_MAX_VALUE + 1)
+            else:
+                following = slot
+        return tuple(signature)
+
+
+def similarity(first, second):
+    """تقدير تشابه Jaccard من توقيعين"""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def pack_signature(signature):
+    return struct.pack(f'<{len(signature)}I', *signature)
+
+
+def unpack_signature(data):
+    return struct.unpack(f'<{len(data) // 4}I', data)
+
+
+class DuplicateIndex:
+    """فهرس LSH على مستوى العملية مع تحميل تزايدي من قاعدة البيانات
+
+    المفتاح هو الرقم العام للشكوى، والنطاق (scope) يقصر المقارنة على شكاوى نفس
+    المحافظة، والعنقود هو أول شكوى في مجموعة المكررات.
+    """
+
+    def __init__(self, loader, bands=BANDS, threshold=DEFAULT_THRESHOLD, refresh_interval=300,
+                 clock=time.monotonic, lookback=1000):
+        # loader(after_id) -> [(id, المفتاح، النطاق، العنقود أو None، التوقيع المحزوم)] بترتيب id
+        self.loader = loader
+        self.lookback = lookback
+        self.bands = bands
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.last_id = 0
+        self._buckets = {}
+        self._signatures = {}
+        self._clusters = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature, scope):
+        rows = len(signature) // self.bands
+        return [(scope, band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def _insert(self, key, signature, scope, cluster):
+        if key in self._signatures:
+            return
+        self._signatures[key] = signature
+        self._clusters[key] = self._clusters.get(cluster, cluster) if cluster else key
+        for band_key in self._band_keys(signature, scope):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def refresh(self):
+        """تحميل الشكاوى المضافة منذ آخر تحميل (من هذه العملية أو غيرها)
+
+        المعاملات المتزامنة قد تحفظ صفاً برقم أصغر من صف محمل بالفعل، لذا يُعاد
+        تحميل آخر lookback رقماً ويتجاهل _insert المفاتيح الموجودة.
+        """
+        rows = self.loader(max(self.last_id - self.lookback, 0))
+        with self._lock:
+            for row_id, key, scope, cluster, packed in rows:
+                if packed:
+                    self._insert(key, unpack_signature(packed), scope, cluster)
+                self.last_id = max(self.last_id, row_id)
+            self._loaded_at = self.clock()
+        return len(rows)
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or self.clock() - self._loaded_at >= self.refresh_interval:
+            self.refresh()
+
+    def match(self, signature, scope=None):
+        """أقرب شكوى سابقة فوق عتبة التشابه - يعيد (العنقود، المفتاح، التشابه) أو None"""
+        if signature is None:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(signature, scope):
+                candidates.update(self._buckets.get(band_key, ()))
+            best = None
+            for key in candidates:
+                score = similarity(signature, self._signatures[key])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (key, score)
+            if best is None:
+                return None
+            return self._clusters[best[0]], best[0], best[1]
+
+    def add(self, key, signature, scope=None, cluster=None):
+        """إضافة شكوى محفوظة إلى الفهرس (بعد الـ commit)"""
+        if signature is None:
+            return
+        with self._lock:
+            self._insert(key, signature, scope, cluster)
+
+    def cluster_of(self, key):
+        return self._clusters.get(key)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._signatures.clear()
+            self._clusters.clear()
+            self.last_id = 0
+            self._loaded_at = None
+
+    def __len__(self):
+        return len(self._signatures)
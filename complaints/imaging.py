@@ -0,0 +1,137 @@
+"""
+توليد نسخ مصغرة ومضغوطة من صور المرفقات خارج مسار الطلب
+
+- كل نسخة تُحفظ بجوار محتوى المرفق في المخزن (objects/ab/cd/<sha256>.thumbnail.jpg)
+  فتستفيد من إزالة التكرار: الصورة المرفوعة عدة مرات تُعالج مرة واحدة
+- المعالجة في مجمع عمليات محدود الحجم، والطلبات الزائدة عن الحد تُرفض فوراً
+  (تلتقطها أداة process-images لاحقاً) بدلاً من تكديسها في الذاكرة
+- Pillow اعتمادية اختيارية: بدونها تبقى المرفقات بحجمها الأصلي فقط
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# الاسم: (أقصى عرض/ارتفاع، جودة JPEG)
+VARIANTS = {
+    'thumbnail': (320, 70),
+    'web': (1600, 82),
+}
+IMAGE_TYPES = {'png', 'jpg', 'gif', 'webp'}
+
+
+def available():
+    """هل مكتبة معالجة الصور مثبتة"""
+    return Image is not None
+
+
+def variant_path(source_path, variant):
+    """مسار النسخة المشتقة بجوار المحتوى الأصلي"""
+    return f'{source_path}.{variant}.jpg'
+
+
+def existing_variants(source_path):
+    """النسخ المشتقة الموجودة مسبقاً على القرص {الاسم: المسار}"""
+    paths = {variant: variant_path(source_path, variant) for variant in VARIANTS}
+    return {variant: path for variant, path in paths.items() if os.path.exists(path)}
+
+
+def render_variants(source_path):
+    """توليد كل النسخ من الصورة الأصلية - تعمل داخل عملية منفصلة"""
+    rendered = {}
+    with Image.open(source_path) as image:
+        image.seek(0)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'L'):
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+        for variant, (max_side, quality) in VARIANTS.items():
+            copy = image.copy()
+            copy.thumbnail((max_side, max_side))
+            path = variant_path(source_path, variant)
+            temp_path = f'{path}.part'
+            copy.save(temp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+            os.replace(temp_path, path)
+            rendered[variant] = path
+    return rendered
+
+
+class ImageProcessor:
+    """مجمع عمليات محدود لمعالجة الصور مع استدعاء on_done(sha256, variants) عند الانتهاء"""
+
+    def __init__(self, max_workers=2, max_pending=32, worker=render_variants, on_done=None):
+        self.max_workers = max_workers
+        self.worker = worker
+        self.on_done = on_done
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def submit(self, sha256, source_path):
+        """جدولة معالجة صورة دون انتظار - يعيد False إذا كان المجمع ممتلئاً"""
+        with self._lock:
+            if sha256 in self._pending:
+                return True
+            if not self._slots.acquire(blocking=False):
+                self.rejected += 1
+                return False
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._pending.add(sha256)
+            self.submitted += 1
+            executor = self._executor
+        try:
+            future = executor.submit(self.worker, source_path)
+        except Exception:
+            # مجمع معطل (BrokenProcessPool) أو مغلق: تحرير المكان وإنشاء مجمع جديد في المرة التالية
+            with self._lock:
+                self._pending.discard(sha256)
+                self.failed += 1
+                if self._executor is executor:
+                    self._executor = None
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda done: self._finish(sha256, done))
+        return True
+
+    def _finish(self, sha256, future):
+        try:
+            variants = future.result()
+            if self.on_done is not None:
+                self.on_done(sha256, variants)
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"فشل توليد نسخ الصورة {sha256[:12]}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(sha256)
+            self._slots.release()
+
+    def shutdown(self, wait=True):
+        """إيقاف المجمع بعد انتهاء المهام الجارية"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'failed': self.failed,
+        }
@@ -0,0 +1,26 @@
+"""
+ترقيم الصفحات بالمؤشر (keyset pagination)
+
+المؤشر قيمة معتمة مشفرة بـ base64 تحمل مفتاح الترتيب لآخر صف في الصفحة
+(submitted_at, id)، فتكلفة أي صفحة ثابتة مهما كان عمقها بدلاً من OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(submitted_at, row_id):
+    """تشفير مفتاح آخر صف كمؤشر معتم"""
+    raw = json.dumps([submitted_at.isoformat() if submitted_at else None, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """فك تشفير المؤشر إلى (submitted_at, id) أو رفع ValueError"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        submitted_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(submitted_at), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('مؤشر الصفحة غير صحيح')
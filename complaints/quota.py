@@ -0,0 +1,147 @@
+"""
+حصة التقديم اليومية لكل مواطن بعداد نافذة منزلقة
+
+بدلاً من COUNT(*) على جدول الشكاوى مع كل تقديم، يُحفظ لكل مستخدم عداد للنافذة
+الحالية وعداد للنافذة السابقة، والتقدير = السابقة × الجزء المتبقي منها + الحالية.
+الفحص والزيادة عملية واحدة ذرية O(1)، محلياً في ذاكرة العملية أو مشتركة عبر Redis.
+"""
+
+import math
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class LocalQuotaStore:
+    """عدادات في ذاكرة العملية (عامل واحد أو بيئة التطوير)"""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, window, weight, cost, limit):
+        """زيادة العداد إذا بقي التقدير ضمن الحد - يعيد (مسموح، التقدير)"""
+        with self._lock:
+            current_window, current, previous = self._windows.get(key, (window, 0, 0))
+            if current_window != window:
+                previous = current if current_window == window - 1 else 0
+                current = 0
+            estimate = previous * weight + current
+            allowed = estimate + cost <= limit
+            if allowed:
+                current += cost
+            if len(self._windows) >= self.max_keys and key not in self._windows:
+                self._prune(window)
+            self._windows[key] = (window, current, previous)
+            return allowed, estimate
+
+    def release(self, key, window, cost):
+        """استرجاع وحدات من النافذة الحالية بعد فشل التقديم"""
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry and entry[0] == window:
+                self._windows[key] = (window, max(entry[1] - cost, 0), entry[2])
+
+    def reset(self):
+        with self._lock:
+            self._windows.clear()
+
+    def _prune(self, window):
+        # العدادات الأقدم من النافذة السابقة لا تؤثر على أي تقدير
+        stale = [key for key, entry in self._windows.items() if entry[0] < window - 1]
+        for key in stale:
+            del self._windows[key]
+
+
+# فحص وزيادة ذريان داخل Redis
+_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local estimate = previous * tonumber(ARGV[1]) + current
+if estimate + tonumber(ARGV[2]) > tonumber(ARGV[3]) then
+    return {0, tostring(estimate)}
+end
+redis.call('INCRBY', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1, tostring(estimate)}
+"""
+
+
+class RedisQuotaStore:
+    """عدادات مشتركة بين كل العمليات عبر Redis"""
+
+    def __init__(self, url, window_seconds, prefix='naebak:complaints:quota:'):
+        self.client = redis.Redis.from_url(url)
+        self.window_seconds = window_seconds
+        self.prefix = prefix
+        self._hit = self.client.register_script(_HIT_SCRIPT)
+
+    def _key(self, key, window):
+        return f'{self.prefix}{key}:{window}'
+
+    def hit(self, key, window, weight, cost, limit):
+        allowed, estimate = self._hit(
+            keys=[self._key(key, window), self._key(key, window - 1)],
+            args=[weight, cost, limit, self.window_seconds * 2]
+        )
+        return bool(allowed), float(estimate)
+
+    def release(self, key, window, cost):
+        self.client.decrby(self._key(key, window), cost)
+
+    def reset(self):
+        for key in self.client.scan_iter(f'{self.prefix}*'):
+            self.client.delete(key)
+
+
+def quota_store_from_url(url, window_seconds):
+    """عدادات مشتركة إذا كان Redis متاحاً، وإلا عدادات محلية"""
+    if not url or redis is None:
+        return LocalQuotaStore()
+    return RedisQuotaStore(url, window_seconds)
+
+
+class QuotaExceeded(Exception):
+    """تجاوز الحصة مع عدد الثواني التقريبي حتى التقديم التالي"""
+
+    def __init__(self, limit, retry_after):
+        super().__init__(f'quota of {limit} exceeded')
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class SubmissionQuota:
+    """حصة عدد العمليات لكل مستخدم خلال نافذة زمنية منزلقة"""
+
+    def __init__(self, limit, window_seconds, store=None, clock=time.time):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.store = store or LocalQuotaStore()
+        self.clock = clock
+
+    def _position(self):
+        elapsed = self.clock() / self.window_seconds
+        window = math.floor(elapsed)
+        return window, elapsed - window
+
+    def acquire(self, identity, cost=1):
+        """حجز cost وحدة أو رفع QuotaExceeded - يعيد النافذة لاستخدامها في release"""
+        window, progress = self._position()
+        allowed, _ = self.store.hit(str(identity), window, 1 - progress, cost, self.limit)
+        if not allowed:
+            # تقريبي: بداية النافذة التالية حين يبدأ وزن العدادات الحالية بالتناقص
+            retry_after = math.ceil((1 - progress) * self.window_seconds)
+            raise QuotaExceeded(self.limit, retry_after)
+        return window
+
+    def release(self, identity, window, cost=1):
+        """إرجاع وحدات محجوزة لعملية لم تكتمل"""
+        self.store.release(str(identity), window, cost)
+
+    def reset(self):
+        self.store.reset()
@@ -0,0 +1,102 @@
+"""
+سجل البيانات المرجعية (المحافظات وأنواع الشكاوى) في ذاكرة العملية
+
+يتم تحميل الجداول المرجعية مرة واحدة عند أول استخدام، ويُعاد تحميلها عند:
+- تعديل أي صف من داخل نفس العملية (mark_stale بعد الـ commit)
+- تغير رمز النسخة في قاعدة البيانات، ويُفحص مرة كل refresh_interval ثانية
+  لالتقاط التعديلات التي تمت من عمليات أخرى
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+
+class ReferenceSnapshot:
+    """نسخة ثابتة من البيانات المرجعية مع استجابات JSON جاهزة"""
+
+    def __init__(self, governorates, complaint_types, token, version):
+        self.governorates = {gov['id']: gov for gov in governorates}
+        self.complaint_types = {ctype['id']: ctype for ctype in complaint_types}
+        self.token = token
+        self.version = version
+        self.governorates_json = self._dump('governorates', governorates)
+        self.complaint_types_json = self._dump('complaint_types', complaint_types)
+        # ETag قوي مشتق من محتوى الاستجابة نفسها
+        self.governorates_etag = hashlib.sha256(self.governorates_json).hexdigest()[:32]
+        self.complaint_types_etag = hashlib.sha256(self.complaint_types_json).hexdigest()[:32]
+
+    @staticmethod
+    def _dump(key, rows):
+        active = sorted(
+            (row for row in rows if row.get('is_active')),
+            key=lambda row: (row.get('display_order') or 0)
+        )
+        return json.dumps({key: active}, ensure_ascii=False).encode('utf-8')
+
+
+class ReferenceRegistry:
+    """سجل مرجعي على مستوى العملية مع تحديث حسب النسخة"""
+
+    def __init__(self, loader, probe, refresh_interval=300, clock=time.monotonic):
+        # loader() -> (governorates, complaint_types, token)
+        # probe() -> token ، استعلام خفيف لاكتشاف التعديلات من عمليات أخرى
+        self.loader = loader
+        self.probe = probe
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._snapshot = None
+        self._stale = True
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """إرجاع النسخة الحالية بعد التأكد من حداثتها"""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale:
+            if self.clock() - self._checked_at < self.refresh_interval:
+                return snapshot
+        return self.refresh()
+
+    def refresh(self, force=False):
+        """إعادة التحميل إذا تغيرت النسخة في قاعدة البيانات"""
+        with self._lock:
+            snapshot = self._snapshot
+            now = self.clock()
+            if snapshot is not None and not self._stale and not force:
+                if now - self._checked_at < self.refresh_interval:
+                    return snapshot
+                if self.probe() == snapshot.token:
+                    self._checked_at = now
+                    return snapshot
+
+            governorates, complaint_types, token = self.loader()
+            self._version += 1
+            self._snapshot = ReferenceSnapshot(governorates, complaint_types, token, self._version)
+            self._stale = False
+            self._checked_at = now
+            return self._snapshot
+
+    def mark_stale(self):
+        """طلب إعادة التحميل عند الاستخدام التالي"""
+        self._stale = True
+
+    def governorate(self, governorate_id):
+        """المحافظة كقاموس أو None"""
+        return self.snapshot().governorates.get(_as_int(governorate_id))
+
+    def complaint_type(self, complaint_type_id):
+        """نوع الشكوى كقاموس أو None"""
+        return self.snapshot().complaint_types.get(_as_int(complaint_type_id))
+
+
+def _as_int(value):
+    # True و 1.5 ليسا معرفين حتى لو قبلهما int()
+    if isinstance(value, (bool, float)):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,76 @@
+"""
+تسلسل خفيف لاستجابات الشكاوى من صفوف الأعمدة مباشرة إلى JSON bytes
+
+بدلاً من بناء كائنات ORM ثم قواميس متداخلة ثم استدعاء isoformat لكل حقل،
+يتم اختيار الأعمدة المطلوبة فقط من قاعدة البيانات وتحويل كل صف (tuple) إلى قاموس
+بمُسقِط مُعد مسبقاً، ثم ترميز الاستجابة كاملة مرة واحدة. يُستخدم orjson إذا كان
+مثبتاً (يرمز التواريخ بنفسه)، وإلا json القياسي.
+"""
+
+import json
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """ترميز الاستجابة إلى JSON bytes بأسرع مرمز متاح"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+class FieldProjectionError(ValueError):
+    """حقول غير معروفة في معامل fields"""
+
+
+def parse_fields(value, allowed, default):
+    """تحويل معامل fields=a,b,c إلى قائمة مرتبة بعد التحقق منها"""
+    if not value:
+        return list(default)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    if not fields:
+        raise FieldProjectionError('معامل fields فارغ')
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise FieldProjectionError(f"حقول غير معروفة: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+class RowSerializer:
+    """مُسقِط من صفوف أعمدة (tuples) إلى قواميس الاستجابة
+
+    columns: أسماء الأعمدة بترتيب ظهورها في الصف
+    fields: الحقول المطلوبة في الناتج بترتيبها
+    embeds: {اسم الحقل: (عمود المصدر، دالة الجلب)} للكائنات المضمنة مثل المحافظة
+    """
+
+    def __init__(self, columns, fields, embeds=None):
+        embeds = embeds or {}
+        position = {column: index for index, column in enumerate(columns)}
+        self._plan = []
+        for field in fields:
+            if field in embeds:
+                source, resolve = embeds[field]
+                self._plan.append((field, position[source], resolve))
+            else:
+                self._plan.append((field, position[field], None))
+
+    def row(self, values):
+        item = {}
+        for field, index, resolve in self._plan:
+            value = values[index]
+            item[field] = resolve(value) if resolve is not None else value
+        return item
+
+    def rows(self, rows):
+        return [self.row(values) for values in rows]
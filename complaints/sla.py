@@ -0,0 +1,66 @@
+"""
+متابعة المواعيد المستهدفة لحل الشكاوى (SLA)
+
+الموعد due_at يُحسب مرة واحدة عند التقديم من estimated_resolution_days لنوع الشكوى
+ويُخزن في الصف، فاكتشاف الشكاوى المتأخرة أو القريبة من موعدها مسح نطاق واحد على
+الفهرس (status, due_at) بدلاً من حساب تاريخ لكل صف في الجدول.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESOLUTION_DAYS = 30
+
+# الحالات التي يسري فيها الموعد (pending_info بانتظار المواطن فلا تُحتسب عليه)
+SLA_STATUSES = ('submitted', 'under_review', 'in_progress')
+
+
+def due_at_for(submitted_at, resolution_days):
+    """الموعد المستهدف للحل من تاريخ التقديم"""
+    return submitted_at + timedelta(days=resolution_days or DEFAULT_RESOLUTION_DAYS)
+
+
+class SlaScheduler:
+    """تشغيل دوري لمسح المواعيد في خيط خلفي
+    
+    scan(now) يعالج الشكاوى القريبة من موعدها والمتأخرة التي لم تُصعّد بعد ويعيد
+    ملخصاً. لا تُقصر النافذة على ما تجاوز موعده منذ آخر مسح، فالشكوى التي تجاوزته
+    خارج حالات SLA_STATUSES (مثل pending_info) تُصعّد عند عودتها إليها.
+    """
+
+    def __init__(self, scan, interval=300, clock=datetime.utcnow):
+        self.scan = scan
+        self.interval = interval
+        self.clock = clock
+        self.last_scan = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self, now):
+        summary = self.scan(now)
+        self.last_scan = now
+        return summary
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once(self.clock())
+            except Exception as e:
+                logger.error(f"فشل مسح مواعيد الشكاوى: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """بدء المسح الدوري في خيط خلفي (مرة واحدة لكل عملية)"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='sla-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
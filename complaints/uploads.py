@@ -0,0 +1,116 @@
+"""
+استقبال المرفقات كتدفق على دفعات ثابتة الحجم
+
+- الكتابة إلى ملف مؤقت في نفس مجلد الوجهة (حتى تكون إعادة التسمية ذرية)
+- حساب الحجم وبصمة SHA-256 أثناء الكتابة دون تحميل الملف في الذاكرة
+- التحقق من النوع الفعلي عبر البايتات الأولى (magic bytes) وليس الامتداد فقط
+"""
+
+import hashlib
+import os
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+
+# البايتات المميزة لكل نوع: [(الإزاحة، التوقيع)]
+MAGIC_SIGNATURES = {
+    'png': [(0, b'\x89PNG\r\n\x1a\n')],
+    'jpg': [(0, b'\xff\xd8\xff')],
+    'gif': [(0, b'GIF87a'), (0, b'GIF89a')],
+    'webp': [(8, b'WEBP')],
+    'pdf': [(0, b'%PDF-')],
+    'doc': [(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')],
+    'docx': [(0, b'PK\x03\x04')],
+}
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+HEAD_SIZE = 16
+
+
+class UploadError(Exception):
+    """خطأ في الملف المرفوع مع رمز HTTP المناسب"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def detect_file_type(head):
+    """النوع الفعلي للملف من بايتاته الأولى أو None"""
+    for file_type, signatures in MAGIC_SIGNATURES.items():
+        for offset, signature in signatures:
+            if head[offset:offset + len(signature)] == signature:
+                return file_type
+    return None
+
+
+def extension_of(filename):
+    """امتداد الملف بأحرف صغيرة بعد توحيد الأسماء البديلة"""
+    if not filename or '.' not in filename:
+        return None
+    extension = filename.rsplit('.', 1)[1].lower()
+    return EXTENSION_ALIASES.get(extension, extension)
+
+
+def size_limit_for(extension, allowed_file_types):
+    """الحد الأقصى للحجم بالبايت لامتداد مسموح، أو None إذا لم يكن مسموحاً"""
+    for group in ('images', 'documents'):
+        extensions = [EXTENSION_ALIASES.get(ext, ext) for ext in allowed_file_types[group]['extensions']]
+        if extension in extensions:
+            return allowed_file_types[group]['max_size_mb'] * 1024 * 1024
+    return None
+
+
+class ReceivedFile:
+    """نتيجة استقبال ملف: المسار المؤقت والحجم والبصمة والنوع المكتشف"""
+
+    def __init__(self, temp_path, size, sha256, file_type):
+        self.temp_path = temp_path
+        self.size = size
+        self.sha256 = sha256
+        self.file_type = file_type
+
+    def commit_to(self, final_path):
+        """نقل الملف إلى مساره النهائي بإعادة تسمية ذرية"""
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(self.temp_path, final_path)
+        self.temp_path = None
+        return final_path
+
+    def discard(self):
+        if self.temp_path and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        self.temp_path = None
+
+
+def receive_stream(stream, directory, expected_type, max_bytes, chunk_size=CHUNK_SIZE):
+    """كتابة التدفق إلى ملف مؤقت على دفعات مع التحقق من النوع والحجم أثناء الاستقبال"""
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-', suffix='.part')
+    digest = hashlib.sha256()
+    size = 0
+    head = b''
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                if len(head) < HEAD_SIZE:
+                    head += chunk[:HEAD_SIZE - len(head)]
+                    if len(head) >= HEAD_SIZE and detect_file_type(head) != expected_type:
+                        raise UploadError('محتوى الملف لا يطابق نوعه', status=415)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadError('حجم الملف كبير جداً', status=413)
+                digest.update(chunk)
+                output.write(chunk)
+        if size == 0:
+            raise UploadError('الملف فارغ')
+        if detect_file_type(head) != expected_type:
+            raise UploadError('محتوى الملف لا يطابق نوعه', status=415)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return ReceivedFile(temp_path, size, digest.hexdigest(), expected_type)
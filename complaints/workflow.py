@@ -0,0 +1,45 @@
+"""
+آلة حالات الشكوى
+
+submitted → under_review → in_progress → resolved → closed
+مع pending_info لطلب معلومات إضافية من المواطن، وrejected من أي مرحلة مراجعة.
+الشكوى المحلولة يمكن إعادة فتحها (in_progress) قبل إغلاقها.
+"""
+
+STATUSES = ('submitted', 'under_review', 'in_progress', 'pending_info', 'resolved', 'closed', 'rejected')
+
+TRANSITIONS = {
+    'submitted': {'under_review', 'rejected'},
+    'under_review': {'in_progress', 'pending_info', 'resolved', 'rejected'},
+    'in_progress': {'pending_info', 'resolved', 'rejected'},
+    'pending_info': {'under_review', 'in_progress', 'rejected', 'closed'},
+    'resolved': {'in_progress', 'closed'},
+    'rejected': {'closed'},
+    'closed': set(),
+}
+
+# أعمدة التوقيت التي تُضبط عند الدخول إلى الحالة
+# reviewed_at يُضبط مرة واحدة عند أول خروج من submitted ولا يُعاد ضبطه
+STATUS_TIMESTAMPS = {
+    'resolved': 'resolved_at',
+    'closed': 'closed_at',
+}
+
+
+def can_transition(old_status, new_status):
+    """هل الانتقال بين الحالتين مسموح"""
+    return new_status in TRANSITIONS.get(old_status, ())
+
+
+def sources_for(new_status):
+    """الحالات التي يمكن الانتقال منها إلى الحالة المطلوبة بترتيب ثابت"""
+    return [status for status in STATUSES if new_status in TRANSITIONS[status]]
+
+
+# الحالات التي تنتهي عندها مسؤولية النائب عن الشكوى (لا تُحتسب من حمله)
+CLOSED_STATUSES = frozenset({'resolved', 'closed', 'rejected'})
+
+
+def is_open(status):
+    """هل الشكوى ما زالت مفتوحة وتُحتسب من حمل النائب المكلف"""
+    return status not in CLOSED_STATUSES
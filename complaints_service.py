@@ -15,15 +15,45 @@
 - API بسيط وواضح
 """
 
-from flask import Flask, request, jsonify, send_file
+import click
+from flask import Flask, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as SessionBase, selectinload
 from datetime import datetime, timedelta
 import uuid
 import os
 import logging
 import json
+import re
+import csv
+import io
+import math
+import time
+import mimetypes
+from functools import wraps
+from urllib.parse import unquote
+
+from complaints import imaging
+from complaints.arabic import search_document, tokenize
+from complaints.assignment import AssignmentEngine
+from complaints.blobstore import blob_path, remove_blob, store_blob
+from complaints.cache import ResponseCache, backend_from_url
+from complaints.duplicates import DuplicateIndex, MinHasher, pack_signature, unpack_signature
+from complaints.notifications import NotificationPolicy, NotificationWorker, retry_delay, transport_from_url
+from complaints.pagination import decode_cursor, encode_cursor
+from complaints.quota import QuotaExceeded, SubmissionQuota, quota_store_from_url
+from complaints.registry import ReferenceRegistry
+from complaints.serialization import FieldProjectionError, RowSerializer, dumps, parse_fields
+from complaints.sla import DEFAULT_RESOLUTION_DAYS, SLA_STATUSES, SlaScheduler, due_at_for
+from complaints.uploads import UploadError, extension_of, receive_stream, size_limit_for
+from complaints.workflow import CLOSED_STATUSES, STATUS_TIMESTAMPS, STATUSES, is_open, sources_for
+from initial_data import (
+    ALLOWED_FILE_TYPES, PARLIAMENT_COMPLAINT_TYPES, SENATE_COMPLAINT_TYPES, SYSTEM_MESSAGES, SYSTEM_SETTINGS
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -50,11 +80,57 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))
+app.config['IMAGE_MAX_PENDING'] = int(os.environ.get('IMAGE_MAX_PENDING', 32))
+
+# Stats cache configuration
+app.config['STATS_CACHE_TTL'] = int(os.environ.get('STATS_CACHE_TTL', 30))
+app.config['STATS_CACHE_MAX_ENTRIES'] = int(os.environ.get('STATS_CACHE_MAX_ENTRIES', 16))
+STATS_CACHE_KEY = 'stats'
+
+# Reference data registry configuration
+app.config['REFERENCE_REFRESH_SECONDS'] = int(os.environ.get('REFERENCE_REFRESH_SECONDS', 300))
+app.config['REFERENCE_CACHE_MAX_AGE'] = int(os.environ.get('REFERENCE_CACHE_MAX_AGE', 3600))
+
+# Auto-assignment configuration
+app.config['ASSIGNMENT_REFRESH_SECONDS'] = int(os.environ.get('ASSIGNMENT_REFRESH_SECONDS', 300))
+
+# SLA configuration
+app.config['SLA_WARNING_HOURS'] = int(os.environ.get('SLA_WARNING_HOURS', 48))
+app.config['SLA_SCAN_SECONDS'] = int(os.environ.get('SLA_SCAN_SECONDS', 300))
+app.config['SLA_SCHEDULER_ENABLED'] = os.environ.get('SLA_SCHEDULER_ENABLED', 'false').lower() == 'true'
+
+# Notification outbox configuration
+app.config['NOTIFICATION_TRANSPORT_URL'] = os.environ.get('NOTIFICATION_TRANSPORT_URL', 'file:notifications/outbox.jsonl')
+app.config['NOTIFICATION_BATCH_SIZE'] = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 100))
+app.config['NOTIFICATION_MAX_ATTEMPTS'] = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', 5))
+app.config['NOTIFICATION_POLL_SECONDS'] = int(os.environ.get('NOTIFICATION_POLL_SECONDS', 10))
+app.config['NOTIFICATION_WORKER_ENABLED'] = os.environ.get('NOTIFICATION_WORKER_ENABLED', 'false').lower() == 'true'
+
+# Duplicate detection configuration
+app.config['DUPLICATE_THRESHOLD'] = float(os.environ.get('DUPLICATE_THRESHOLD', 0.6))
+app.config['DUPLICATE_REFRESH_SECONDS'] = int(os.environ.get('DUPLICATE_REFRESH_SECONDS', 60))
+
+# Submission quota configuration
+app.config['SUBMISSION_QUOTA_ENABLED'] = os.environ.get('SUBMISSION_QUOTA_ENABLED', 'true').lower() == 'true'
 
 # Initialize extensions
 CORS(app)
 jwt = JWTManager(app)
 db = SQLAlchemy(app)
+stats_cache = ResponseCache(
+    ttl=app.config['STATS_CACHE_TTL'],
+    max_entries=app.config['STATS_CACHE_MAX_ENTRIES'],
+    backend=backend_from_url(os.environ.get('REDIS_URL'))
+)
+submission_quota = SubmissionQuota(
+    limit=SYSTEM_SETTINGS['moderation']['max_complaints_per_day'],
+    window_seconds=SYSTEM_SETTINGS['moderation']['cooldown_period_hours'] * 3600,
+    store=quota_store_from_url(
+        os.environ.get('REDIS_URL'),
+        SYSTEM_SETTINGS['moderation']['cooldown_period_hours'] * 3600
+    )
+)
 
 # Models
 class Governorate(db.Model):
@@ -95,6 +171,7 @@ class ComplaintType(db.Model):
     category = db.Column(db.String(50), nullable=False)  # infrastructure, health, education, etc.
     target_council = db.Column(db.String(20), nullable=False, default='parliament')  # parliament, senate, both
     priority_level = db.Column(db.String(10), nullable=False, default='medium')  # low, medium, high, urgent
+    estimated_resolution_days = db.Column(db.Integer, nullable=True)  # المدة المستهدفة للحل (SLA)
     icon = db.Column(db.String(50), nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     display_order = db.Column(db.Integer, default=0)
@@ -114,6 +191,7 @@ class ComplaintType(db.Model):
             'category': self.category,
             'target_council': self.target_council,
             'priority_level': self.priority_level,
+            'estimated_resolution_days': self.estimated_resolution_days,
             'icon': self.icon,
             'is_active': self.is_active,
             'display_order': self.display_order
@@ -143,7 +221,7 @@ class Complaint(db.Model):
     
     # الحالة والأولوية
     status = db.Column(db.String(20), nullable=False, default='submitted')
-    # submitted, under_review, in_progress, pending_info, resolved, closed, rejected
+    # submitted, under_review, in_progress, pending_info, resolved, closed, rejected (complaints/workflow.py)
     priority = db.Column(db.String(10), nullable=False, default='medium')  # low, medium, high, urgent
     
     # المتابعة والإدارة
@@ -160,18 +238,29 @@ class Complaint(db.Model):
     reviewed_at = db.Column(db.DateTime, nullable=True)
     resolved_at = db.Column(db.DateTime, nullable=True)
     closed_at = db.Column(db.DateTime, nullable=True)
+    
+    # الموعد المستهدف للحل وتنبيهات تجاوزه (تُضبط مرة واحدة لكل شكوى)
+    due_at = db.Column(db.DateTime, nullable=True)
+    sla_warning_at = db.Column(db.DateTime, nullable=True)
+    escalated_at = db.Column(db.DateTime, nullable=True)
+    
+    # اكتشاف التكرار: توقيع MinHash للعنوان والوصف وأول شكوى في عنقود المكررات
+    text_signature = db.Column(db.LargeBinary, nullable=True)
+    duplicate_of = db.Column(db.String(36), nullable=True)
+    duplicate_score = db.Column(db.Float, nullable=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # العلاقات
     complaint_type = db.relationship('ComplaintType', backref='complaints')
     governorate = db.relationship('Governorate', backref='complaints')
     attachments = db.relationship('ComplaintAttachment', backref='complaint', cascade='all, delete-orphan')
-    updates = db.relationship('ComplaintUpdate', backref='complaint', cascade='all, delete-orphan')
+    # سجل التحديثات لا يُحمل كاملاً أبداً: استخدم complaint_updates_page (الأحدث أولاً مع ترقيم)
+    updates = db.relationship('ComplaintUpdate', backref='complaint', cascade='all, delete-orphan', lazy='raise')
     
     def __repr__(self):
         return f'<Complaint {self.complaint_id}>'
     
-    def to_dict(self, include_details=True):
+    def to_dict(self, include_details=True, updates=None):
         data = {
             'id': self.id,
             'complaint_id': self.complaint_id,
@@ -182,8 +271,8 @@ class Complaint(db.Model):
             'title': self.title,
             'status': self.status,
             'priority': self.priority,
-            'complaint_type': self.complaint_type.to_dict() if self.complaint_type else None,
-            'governorate': self.governorate.to_dict() if self.governorate else None,
+            'complaint_type': reference_registry.complaint_type(self.complaint_type_id),
+            'governorate': reference_registry.governorate(self.governorate_id),
             'city': self.city,
             'district': self.district,
             'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
@@ -202,8 +291,12 @@ class Complaint(db.Model):
                 'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
                 'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
                 'closed_at': self.closed_at.isoformat() if self.closed_at else None,
+                'due_at': self.due_at.isoformat() if self.due_at else None,
+                'escalated_at': self.escalated_at.isoformat() if self.escalated_at else None,
+                'duplicate_of': self.duplicate_of,
+                'duplicate_score': self.duplicate_score,
                 'attachments': [att.to_dict() for att in self.attachments],
-                'updates': [upd.to_dict() for upd in self.updates]
+                'updates': updates if updates is not None else [upd.to_dict() for upd in self.updates]
             })
         
         return data
@@ -219,6 +312,11 @@ class ComplaintAttachment(db.Model):
     file_size = db.Column(db.Integer, nullable=False)
     file_type = db.Column(db.String(50), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=True)  # بصمة المحتوى المحسوبة أثناء الرفع
+    
+    # النسخ المشتقة للصور (تُملأ في الخلفية)
+    thumbnail_path = db.Column(db.String(500), nullable=True)
+    web_path = db.Column(db.String(500), nullable=True)
     
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -232,9 +330,25 @@ class ComplaintAttachment(db.Model):
             'original_filename': self.original_filename,
             'file_size': self.file_size,
             'file_type': self.file_type,
+            'variants': [name for name, path in (('thumbnail', self.thumbnail_path), ('web', self.web_path)) if path],
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None
         }
 
+class AttachmentBlob(db.Model):
+    """نموذج محتوى المرفقات المخزن مرة واحدة لكل بصمة مع عدد المراجع"""
+    __tablename__ = 'attachment_blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    file_size = db.Column(db.Integer, nullable=False)
+    file_type = db.Column(db.String(50), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AttachmentBlob {self.sha256[:12]} refs={self.ref_count}>'
+
 class ComplaintUpdate(db.Model):
     """نموذج تحديثات الشكاوى"""
     __tablename__ = 'complaint_updates'
@@ -271,7 +385,515 @@ class ComplaintUpdate(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class ComplaintUpdateArchive(db.Model):
+    """أرشيف تحديثات الشكاوى القديمة على قواعد البيانات التي لا تدعم التقسيم (SQLite)"""
+    __tablename__ = 'complaint_updates_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # نفس معرف الصف الأصلي
+    complaint_id = db.Column(db.Integer, nullable=False)
+    update_type = db.Column(db.String(20), nullable=False)
+    old_status = db.Column(db.String(20), nullable=True)
+    new_status = db.Column(db.String(20), nullable=True)
+    message = db.Column(db.Text, nullable=True)
+    updated_by = db.Column(db.Integer, nullable=False)
+    updated_by_name = db.Column(db.String(100), nullable=False)
+    updated_by_role = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<ComplaintUpdateArchive {self.update_type}>'
+
+class NotificationOutbox(db.Model):
+    """نموذج صندوق الإشعارات الصادرة (يُكتب مع تحديث الشكوى ويُرسل لاحقاً)"""
+    __tablename__ = 'notification_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaints.id'), nullable=False)
+    event = db.Column(db.String(20), nullable=False)  # submitted, assigned, status_change, resolution
+    channel = db.Column(db.String(10), nullable=False)  # email, sms
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    
+    # حالة الإرسال: pending, sent, failed (بعد استنفاد المحاولات)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(500), nullable=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} {self.event} {self.status}>'
+
+# Indexes - مطابقة لمسارات الوصول في قائمة الشكاوى والإحصائيات والتحميل المسبق
+COMPLAINT_INDEXES = [
+    db.Index('ix_complaints_citizen_submitted', Complaint.citizen_id, Complaint.submitted_at.desc(), Complaint.id.desc()),
+    db.Index('ix_complaints_status', Complaint.status),
+    db.Index('ix_complaints_governorate_status', Complaint.governorate_id, Complaint.status),
+    db.Index('ix_complaints_complaint_type', Complaint.complaint_type_id),
+    db.Index('ix_complaints_status_due', Complaint.status, Complaint.due_at),
+    db.Index('ix_complaints_duplicate_of', Complaint.duplicate_of),
+    db.Index('ix_complaint_attachments_complaint', ComplaintAttachment.complaint_id),
+    db.Index('ix_complaint_updates_complaint', ComplaintUpdate.complaint_id, ComplaintUpdate.created_at),
+    db.Index('ix_complaint_updates_archive_complaint', ComplaintUpdateArchive.complaint_id, ComplaintUpdateArchive.created_at),
+    # فهرس جزئي لقائمة انتظار المراجعين: يحتوي الشكاوى غير المكلفة فقط فيصغر كلما فرغت القائمة
+    db.Index(
+        'ix_complaints_queue', Complaint.priority, Complaint.submitted_at, Complaint.id,
+        sqlite_where=db.and_(Complaint.assigned_to.is_(None), Complaint.status.in_(['submitted', 'under_review'])),
+        postgresql_where=db.and_(Complaint.assigned_to.is_(None), Complaint.status.in_(['submitted', 'under_review']))
+    ),
+    db.Index(
+        'ix_notification_outbox_pending', NotificationOutbox.next_attempt_at, NotificationOutbox.id,
+        sqlite_where=NotificationOutbox.status == 'pending',
+        postgresql_where=NotificationOutbox.status == 'pending'
+    ),
+]
+
+class DeputyRoute(db.Model):
+    """نموذج اختصاص النواب (محافظة و/أو نوع شكوى) لجدول التوزيع الآلي"""
+    __tablename__ = 'deputy_routes'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    deputy_id = db.Column(db.Integer, nullable=False)  # معرف النائب في خدمة المستخدمين
+    deputy_name = db.Column(db.String(100), nullable=True)
+    governorate_id = db.Column(db.Integer, db.ForeignKey('governorates.id'), nullable=True)
+    complaint_type_id = db.Column(db.Integer, db.ForeignKey('complaint_types.id'), nullable=True)
+    is_active = db.Column(db.Boolean, default=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DeputyRoute {self.deputy_id} {self.governorate_id}/{self.complaint_type_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'deputy_id': self.deputy_id,
+            'deputy_name': self.deputy_name,
+            'governorate_id': self.governorate_id,
+            'complaint_type_id': self.complaint_type_id,
+            'is_active': self.is_active
+        }
+
+class ComplaintStatsCounter(db.Model):
+    """نموذج عدادات الإحصائيات المحدثة تدريجياً مع كل عملية كتابة"""
+    __tablename__ = 'complaint_stats_counters'
+
+    dimension = db.Column(db.String(20), primary_key=True)  # total, status, priority, type, governorate, attachments, rating
+    bucket = db.Column(db.String(50), primary_key=True, default='')
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ComplaintStatsCounter {self.dimension}:{self.bucket}={self.count}>'
+
+# Reference data registry
+def load_reference_data():
+    """تحميل المحافظات وأنواع الشكاوى كاملة للسجل المرجعي"""
+    governorates = [gov.to_dict() for gov in Governorate.query.order_by(Governorate.id).all()]
+    complaint_types = [t.to_dict() for t in ComplaintType.query.order_by(ComplaintType.id).all()]
+    return governorates, complaint_types, probe_reference_data()
+
+def probe_reference_data():
+    """رمز نسخة البيانات المرجعية (عدد الصفوف وآخر تعديل) لاكتشاف التغييرات"""
+    token = []
+    for model in (Governorate, ComplaintType):
+        count, last_update = db.session.execute(
+            db.select(db.func.count(model.id), db.func.max(model.updated_at))
+        ).one()
+        token.append(f'{count}:{last_update}')
+    return '|'.join(token)
+
+reference_registry = ReferenceRegistry(
+    load_reference_data,
+    probe_reference_data,
+    refresh_interval=app.config['REFERENCE_REFRESH_SECONDS']
+)
+
+# Auto-assignment engine
+def load_assignment_data():
+    """تحميل مسارات النواب النشطة وعدد الشكاوى المفتوحة المكلف بها كل نائب"""
+    routes = db.session.execute(
+        db.select(DeputyRoute.deputy_id, DeputyRoute.governorate_id, DeputyRoute.complaint_type_id)
+        .filter_by(is_active=True)
+    ).all()
+    loads = dict(db.session.execute(
+        db.select(Complaint.assigned_to, db.func.count())
+        .where(Complaint.assigned_to.isnot(None), Complaint.status.notin_(CLOSED_STATUSES))
+        .group_by(Complaint.assigned_to)
+    ).all())
+    return [tuple(route) for route in routes], loads
+
+assignment_engine = AssignmentEngine(
+    load_assignment_data,
+    SYSTEM_SETTINGS['complaints'],
+    refresh_interval=app.config['ASSIGNMENT_REFRESH_SECONDS']
+)
+
+# Duplicate detection - توقيعات MinHash وفهرس LSH في الذاكرة يُحمّل تزايدياً
+def load_duplicate_signatures(after_id):
+    """توقيعات الشكاوى المضافة بعد after_id فقط"""
+    return db.session.execute(
+        db.select(Complaint.id, Complaint.complaint_id, Complaint.governorate_id,
+                  Complaint.duplicate_of, Complaint.text_signature)
+        .where(Complaint.id > after_id, Complaint.text_signature.isnot(None))
+        .order_by(Complaint.id)
+    ).all()
+
+duplicate_hasher = MinHasher()
+duplicate_index = DuplicateIndex(
+    load_duplicate_signatures,
+    threshold=app.config['DUPLICATE_THRESHOLD'],
+    refresh_interval=app.config['DUPLICATE_REFRESH_SECONDS']
+)
+
+def duplicate_fields(title, description, governorate_id):
+    """أعمدة التوقيع والتكرار لشكوى جديدة من الفهرس في الذاكرة (دون أي استعلام)"""
+    signature = duplicate_hasher.signature(f'{title} {description}')
+    match = duplicate_index.match(signature, scope=int(governorate_id))
+    return dict(
+        text_signature=pack_signature(signature) if signature else None,
+        duplicate_of=match[0] if match else None,
+        duplicate_score=round(match[2], 3) if match else None
+    )
+
+def index_new_complaints(rows):
+    """إضافة الشكاوى المحفوظة إلى الفهرس بعد الـ commit حتى لا يبقى فيه ما تم التراجع عنه"""
+    for complaint_id, governorate_id, duplicate_of, packed in rows:
+        if packed:
+            duplicate_index.add(complaint_id, unpack_signature(packed), scope=int(governorate_id), cluster=duplicate_of)
+
+def cluster_within_batch(row, batch_index):
+    """ربط شكوى في دفعة بأقرب شكوى سابقة في نفس الدفعة إذا لم تطابق الفهرس العام
+
+    الدفعة لا تدخل الفهرس العام إلا بعد الـ commit، فتُجمع مكرراتها في فهرس محلي
+    عنقوده أول شكوى في الدفعة (أو عنقودها في الفهرس العام إن طابقته).
+    """
+    if not row['text_signature']:
+        return
+    signature = unpack_signature(row['text_signature'])
+    scope = int(row['governorate_id'])
+    if row['duplicate_of'] is None:
+        match = batch_index.match(signature, scope=scope)
+        if match:
+            row.update(duplicate_of=match[0], duplicate_score=round(match[2], 3))
+    batch_index.add(row['complaint_id'], signature, scope=scope, cluster=row['duplicate_of'])
+
+def backfill_text_signatures(batch_size=500):
+    """حساب التوقيعات وعناقيد التكرار للشكاوى القائمة بترتيب تقديمها"""
+    updated = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Complaint.id, Complaint.complaint_id, Complaint.title, Complaint.description,
+                      Complaint.governorate_id, Complaint.updated_at)
+            .where(Complaint.text_signature.is_(None))
+            .order_by(Complaint.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        values = []
+        for pk, complaint_id, title, description, governorate_id, updated_at in rows:
+            fields = duplicate_fields(title, description, governorate_id)
+            # الشكاوى دون كلمات تُعلَّم بتوقيع فارغ حتى لا تُعاد معالجتها، والفهرسة
+            # ليست تعديلاً على الشكوى فتُمرر updated_at كما هي (وإلا ضبطها onupdate)
+            values.append(dict(fields, id=pk, text_signature=fields['text_signature'] or b'', updated_at=updated_at))
+            index_new_complaints([(complaint_id, governorate_id, fields['duplicate_of'], fields['text_signature'])])
+        db.session.execute(db.update(Complaint), values)
+        db.session.commit()
+        updated += len(rows)
+
+@app.cli.command('backfill-duplicates')
+def backfill_duplicates_command():
+    """حساب توقيعات التكرار للشكاوى التي لم تُفهرس بعد"""
+    logger.info(f"تمت فهرسة {backfill_text_signatures()} شكوى لاكتشاف التكرار")
+
+@db.event.listens_for(SessionBase, 'before_flush')
+def _track_reference_changes(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Governorate, ComplaintType)):
+            session.info['reference_data_changed'] = True
+        elif isinstance(obj, DeputyRoute):
+            session.info['deputy_routes_changed'] = True
+
+@db.event.listens_for(SessionBase, 'after_commit')
+def _refresh_reference_registry(session):
+    if session.info.pop('reference_data_changed', False):
+        reference_registry.mark_stale()
+    if session.info.pop('deputy_routes_changed', False):
+        assignment_engine.mark_stale()
+
+@db.event.listens_for(SessionBase, 'after_rollback')
+def _discard_reference_changes(session):
+    session.info.pop('reference_data_changed', None)
+    session.info.pop('deputy_routes_changed', None)
+
+# Notification outbox - الإشعار يُكتب مع التحديث في نفس المعاملة ويُرسل من عامل خلفي
+NOTIFICATION_SUBJECTS = {
+    'submitted': 'تم استلام شكواك رقم {complaint_id}',
+    'assigned': 'تم تعيين شكواك رقم {complaint_id}',
+    'status_change': 'تحديث على شكواك رقم {complaint_id}',
+    'resolution': 'تم حل شكواك رقم {complaint_id}',
+}
+notification_policy = NotificationPolicy(SYSTEM_SETTINGS['notifications'])
+notification_transport = transport_from_url(app.config['NOTIFICATION_TRANSPORT_URL'])
+
+def enqueue_notifications(entries, now):
+    """إضافة إشعارات إلى صندوق الصادر ضمن المعاملة الحالية بجملة INSERT واحدة
+
+    entries: [(id الشكوى، رقمها العام، البريد، الهاتف، الحدث، نص الرسالة)]
+    """
+    rows = [
+        dict(
+            complaint_id=pk, event=event, channel=channel, recipient=recipient,
+            subject=NOTIFICATION_SUBJECTS[event].format(complaint_id=complaint_id), body=body,
+            status='pending', attempts=0, next_attempt_at=now, created_at=now
+        )
+        for pk, complaint_id, email, phone, event, body in entries
+        if notification_policy.wants(event)
+        for channel, recipient in notification_policy.channels(email, phone)
+    ]
+    if rows:
+        db.session.execute(db.insert(NotificationOutbox), rows)
+    return len(rows)
+
+def submission_notifications(pk, complaint_id, email, phone, assigned_to):
+    """إشعارات تقديم الشكوى وتكليفها الآلي"""
+    entries = [(pk, complaint_id, email, phone, 'submitted', SYSTEM_MESSAGES['complaint_submitted'])]
+    if assigned_to is not None:
+        entries.append((pk, complaint_id, email, phone, 'assigned', SYSTEM_MESSAGES['complaint_assigned']))
+    return entries
+
+def dispatch_notifications(transport=None, now=None):
+    """إرسال دفعة من الإشعارات المستحقة - يعيد عدد الرسائل المعالجة
+
+    على PostgreSQL تُحجز الدفعة بـ FOR UPDATE SKIP LOCKED فيعمل أكثر من عامل معاً
+    دون إرسال مزدوج. الفشل يؤجل الرسالة بمهلة متضاعفة حتى استنفاد المحاولات، أما
+    القنوات التي لا يدعمها الناقل (transport.channels) فتفشل نهائياً من أول مرة.
+    """
+    transport = transport or notification_transport
+    now = now or datetime.utcnow()
+    batch = db.session.execute(
+        db.select(NotificationOutbox.id, NotificationOutbox.event, NotificationOutbox.channel,
+                  NotificationOutbox.recipient, NotificationOutbox.subject, NotificationOutbox.body,
+                  NotificationOutbox.attempts)
+        .where(NotificationOutbox.status == 'pending', NotificationOutbox.next_attempt_at <= now)
+        .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+        .limit(app.config['NOTIFICATION_BATCH_SIZE'])
+        .with_for_update(skip_locked=True)
+    ).mappings().all()
+    if not batch:
+        db.session.rollback()
+        return 0
+
+    messages = [dict(row) for row in batch]
+    unsupported = {message['id'] for message in messages if message['channel'] not in transport.channels}
+    deliverable = [message for message in messages if message['id'] not in unsupported]
+    failures = {}
+    if deliverable:
+        try:
+            failures = dict(transport.deliver(deliverable))
+        except Exception as e:
+            failures = {message['id']: str(e) for message in deliverable}
+    for message in messages:
+        if message['id'] in unsupported:
+            failures[message['id']] = f"قناة غير مدعومة في الناقل: {message['channel']}"
+
+    sent = [message['id'] for message in messages if message['id'] not in failures]
+    if sent:
+        db.session.execute(
+            db.update(NotificationOutbox).where(NotificationOutbox.id.in_(sent))
+            .values(status='sent', sent_at=now, attempts=NotificationOutbox.attempts + 1, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+    if failures:
+        retries = []
+        for message in messages:
+            if message['id'] not in failures:
+                continue
+            attempts = message['attempts'] + 1
+            exhausted = attempts >= app.config['NOTIFICATION_MAX_ATTEMPTS'] or message['id'] in unsupported
+            retries.append(dict(
+                id=message['id'],
+                attempts=attempts,
+                status='failed' if exhausted else 'pending',
+                next_attempt_at=now + timedelta(seconds=retry_delay(attempts)),
+                last_error=failures[message['id']][:500]
+            ))
+        db.session.execute(db.update(NotificationOutbox), retries)
+        logger.warning(f"فشل إرسال {len(failures)} إشعار من أصل {len(messages)}")
+    db.session.commit()
+    return len(messages)
+
+def run_notification_dispatch():
+    with app.app_context():
+        return dispatch_notifications()
+
+notification_worker = NotificationWorker(
+    run_notification_dispatch,
+    batch_size=app.config['NOTIFICATION_BATCH_SIZE'],
+    interval=app.config['NOTIFICATION_POLL_SECONDS']
+)
+
+@app.cli.command('dispatch-notifications')
+def dispatch_notifications_command():
+    """إرسال كل الإشعارات المستحقة في صندوق الصادر"""
+    logger.info(f"تمت معالجة {notification_worker.drain()} إشعار")
+
+# Complaint construction
+MAX_DESCRIPTION_LENGTH = 1500
+REQUIRED_COMPLAINT_FIELDS = ['title', 'description', 'complaint_type_id', 'governorate_id', 'citizen_name', 'citizen_email']
+TEXT_COMPLAINT_FIELDS = [
+    'title', 'description', 'citizen_name', 'citizen_email', 'citizen_phone', 'city', 'district', 'detailed_location'
+]
+
+def is_integer_id(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+def validate_complaint_data(data):
+    """التحقق من بيانات شكوى جديدة مقابل السجل المرجعي - يعيد (رسالة الخطأ أو None، نوع الشكوى، المحافظة)"""
+    # الحقول النصية تُقاس وتُقص لاحقاً، فأي قيمة غير نصية خطأ في البيانات وليس خطأ في الخادم
+    for field in TEXT_COMPLAINT_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return f'{field} يجب أن يكون نصاً', None, None
+    
+    for field in REQUIRED_COMPLAINT_FIELDS:
+        if not data.get(field):
+            return f'{field} مطلوب', None, None
+    
+    # التحقق من طول الوصف (حد أقصى 1500 حرف)
+    if len(data['description']) > MAX_DESCRIPTION_LENGTH:
+        return 'الوصف يجب ألا يزيد عن 1500 حرف', None, None
+    
+    # التحقق من وجود نوع الشكوى والمحافظة (من السجل المرجعي دون استعلام)
+    # المعرفات أعداد صحيحة في JSON فقط: true و 1.5 و "1" مرفوضة
+    complaint_type = reference_registry.complaint_type(data['complaint_type_id']) if is_integer_id(data['complaint_type_id']) else None
+    if not complaint_type or not complaint_type['is_active']:
+        return 'نوع الشكوى غير صحيح', None, None
+    
+    governorate = reference_registry.governorate(data['governorate_id']) if is_integer_id(data['governorate_id']) else None
+    if not governorate or not governorate['is_active']:
+        return 'المحافظة غير صحيحة', None, None
+    
+    return None, complaint_type, governorate
+
+def complaint_row(citizen_id, data, complaint_type, governorate, now, assigned_to=None):
+    """قيم أعمدة شكوى جديدة كاملة (بما فيها الافتراضية) من بيانات الطلب"""
+    return dict(
+        complaint_id=str(uuid.uuid4()),
+        citizen_id=citizen_id,
+        citizen_name=data['citizen_name'].strip(),
+        citizen_email=data['citizen_email'].strip(),
+        citizen_phone=data.get('citizen_phone', '').strip() if data.get('citizen_phone') else None,
+        title=data['title'].strip(),
+        description=data['description'].strip(),
+        complaint_type_id=complaint_type['id'],
+        governorate_id=governorate['id'],
+        city=data.get('city', '').strip() if data.get('city') else None,
+        district=data.get('district', '').strip() if data.get('district') else None,
+        detailed_location=data.get('detailed_location', '').strip() if data.get('detailed_location') else None,
+        status='submitted',
+        priority=complaint_type['priority_level'],
+        assigned_to=assigned_to,
+        due_at=due_at_for(now, complaint_type.get('estimated_resolution_days')),
+        submitted_at=now,
+        updated_at=now,
+        **duplicate_fields(data['title'].strip(), data['description'].strip(), governorate['id'])
+    )
+
+def initial_update_row(updated_by, updated_by_name, now, role='citizen', message='تم تقديم الشكوى بنجاح'):
+    """قيم أعمدة التحديث الأولي لشكوى جديدة"""
+    return dict(
+        update_type='status_change',
+        old_status=None,
+        new_status='submitted',
+        message=message,
+        updated_by=updated_by,
+        updated_by_name=updated_by_name,
+        updated_by_role=role,
+        created_at=now
+    )
+
+def auto_assign(governorate, complaint_type):
+    """النائب المختص بالشكوى من جدول التوجيه في الذاكرة (دون استعلام) أو None"""
+    return assignment_engine.assign(governorate['id'], complaint_type['id'])
+
+def build_complaint(citizen_id, data, complaint_type, governorate, assigned_to=None):
+    """إنشاء كائن شكوى جديد مع تحديثه الأولي دون أي استعلام (الحقول الافتراضية تُملأ مسبقاً)"""
+    now = datetime.utcnow()
+    # التكليف الآلي يظهر في رسالة التحديث الأولي نفسه حتى لا يضيف جملة INSERT
+    assignment = {'message': SYSTEM_MESSAGES['complaint_assigned']} if assigned_to is not None else {}
+    initial_update = ComplaintUpdate(**initial_update_row(citizen_id, data['citizen_name'], now, **assignment))
+    return Complaint(
+        **complaint_row(citizen_id, data, complaint_type, governorate, now, assigned_to),
+        attachments=[],
+        updates=[initial_update]
+    )
+
+# Query loading profiles - تحميل العلاقات مسبقاً لتجنب استعلام لكل صف (N+1)
+# النوع والمحافظة يأتيان من السجل المرجعي دون أي استعلام
+DETAIL_LOAD_OPTIONS = (
+    selectinload(Complaint.attachments),
+)
+
+# List serialization - أعمدة القائمة تُقرأ كصفوف وتُرمز مباشرة دون كائنات ORM
+LIST_FIELDS = [
+    'id', 'complaint_id', 'citizen_id', 'citizen_name', 'citizen_email', 'citizen_phone',
+    'title', 'status', 'priority', 'complaint_type', 'governorate', 'city', 'district',
+    'submitted_at', 'updated_at'
+]
+LIST_EMBEDS = {
+    'complaint_type': ('complaint_type_id', reference_registry.complaint_type),
+    'governorate': ('governorate_id', reference_registry.governorate),
+}
+LIST_COLUMNS = [LIST_EMBEDS[field][0] if field in LIST_EMBEDS else field for field in LIST_FIELDS]
+# حقول إضافية متاحة عبر fields= فقط (لا تُقرأ افتراضياً)
+LIST_OPTIONAL_FIELDS = [
+    'description', 'detailed_location', 'assigned_to', 'citizen_rating',
+    'reviewed_at', 'resolved_at', 'closed_at', 'due_at', 'duplicate_of'
+]
+LIST_ALLOWED_FIELDS = LIST_FIELDS + LIST_OPTIONAL_FIELDS
+
+def projection_columns(fields, required=()):
+    """الأعمدة اللازمة فعلياً لحقول الاستجابة المطلوبة (دفع الإسقاط إلى SELECT)"""
+    columns = [LIST_EMBEDS[field][0] if field in LIST_EMBEDS else field for field in fields]
+    return list(dict.fromkeys(columns + list(required)))
+
+def json_bytes_response(payload, status=200):
+    """استجابة JSON مرمزة مباشرة إلى bytes"""
+    return app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+def count_rows(query):
+    """عدد صفوف استعلام select دون ترتيبه"""
+    return db.session.execute(
+        db.select(db.func.count()).select_from(query.order_by(None).subquery())
+    ).scalar()
+
 # Helper functions
+def role_required(*roles):
+    """التحقق من JWT ومن أن دور المستخدم (claim: role) ضمن الأدوار المسموحة"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if get_jwt().get('role') not in roles:
+                return jsonify({'error': 'غير مصرح لك بهذا الإجراء'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def conditional_json_response(body, etag):
+    """استجابة JSON مع ETag تُرجع 304 إذا طابقت If-None-Match"""
+    response = app.response_class(body, status=200, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['REFERENCE_CACHE_MAX_AGE']
+    return response.make_conditional(request)
+
 def allowed_file(filename):
     """التحقق من نوع الملف المسموح"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -283,6 +905,658 @@ def get_file_size(file_path):
     except:
         return 0
 
+# Statistics engine
+STATS_STATUSES = list(STATUSES)
+
+def compute_stats():
+    """عدادات الإحصائيات محسوبة من جدول الشكاوى مباشرة {(البعد، الفئة): العدد}
+
+    استعلام مجمع واحد على كل الأبعاد معاً بدلاً من استعلام لكل عداد، وآخر لعدد
+    الشكاوى ذات المرفقات. المفاتيح بنفس صيغة جدول العدادات (الفئة نصية).
+    """
+    grouped = db.session.execute(
+        db.select(Complaint.status, Complaint.priority, Complaint.complaint_type_id, Complaint.governorate_id,
+                  db.func.count(Complaint.id), db.func.count(Complaint.citizen_rating))
+        .group_by(Complaint.status, Complaint.priority, Complaint.complaint_type_id, Complaint.governorate_id)
+    ).all()
+
+    counters = {('total', ''): 0, ('rating', 'rated'): 0}
+    for status, priority, complaint_type_id, governorate_id, count, rated in grouped:
+        for dimension, bucket in (('total', ''), ('status', status), ('priority', priority),
+                                  ('type', complaint_type_id), ('governorate', governorate_id)):
+            key = (dimension, str(bucket))
+            counters[key] = counters.get(key, 0) + count
+        counters[('rating', 'rated')] += rated
+    counters[('attachments', 'with_attachments')] = db.session.execute(
+        db.select(db.func.count(db.distinct(ComplaintAttachment.complaint_id)))
+    ).scalar()
+    return counters
+
+# Incremental statistics counters
+def apply_stats_deltas(deltas):
+    """تطبيق فروق العدادات داخل المعاملة الحالية (upsert ذري لكل عداد)"""
+    rows = [
+        {'dimension': dimension, 'bucket': str(bucket), 'count': delta, 'updated_at': datetime.utcnow()}
+        for (dimension, bucket), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+
+    table = ComplaintStatsCounter.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.dimension, table.c.bucket],
+            set_={'count': table.c.count + stmt.excluded.count, 'updated_at': stmt.excluded.updated_at}
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        result = db.session.execute(
+            table.update()
+            .where(table.c.dimension == row['dimension'], table.c.bucket == row['bucket'])
+            .values(count=table.c.count + row['count'], updated_at=row['updated_at'])
+        )
+        if result.rowcount == 0:
+            db.session.execute(table.insert().values(**row))
+
+def complaint_stats_deltas(complaint, sign=1):
+    """فروق العدادات الناتجة عن إضافة شكوى (أو حذفها عند sign=-1)"""
+    return {
+        ('total', ''): sign,
+        ('status', complaint.status or 'submitted'): sign,
+        ('priority', complaint.priority or 'medium'): sign,
+        ('type', complaint.complaint_type_id): sign,
+        ('governorate', complaint.governorate_id): sign,
+    }
+
+def rows_stats_deltas(rows):
+    """مجموع فروق العدادات لدفعة من صفوف الشكاوى (قواميس)"""
+    deltas = {}
+    for row in rows:
+        for key in (
+            ('total', ''),
+            ('status', row['status']),
+            ('priority', row['priority']),
+            ('type', row['complaint_type_id']),
+            ('governorate', row['governorate_id']),
+        ):
+            deltas[key] = deltas.get(key, 0) + 1
+    return deltas
+
+def record_status_change(old_status, new_status, old_priority=None, new_priority=None):
+    """تحديث العدادات عند تغيير حالة الشكوى أو أولويتها"""
+    deltas = {}
+    if old_status != new_status:
+        deltas[('status', old_status)] = -1
+        deltas[('status', new_status)] = 1
+    if old_priority and new_priority and old_priority != new_priority:
+        deltas[('priority', old_priority)] = -1
+        deltas[('priority', new_priority)] = 1
+    apply_stats_deltas(deltas)
+
+def record_rating(previous_rating):
+    """تحديث عداد الشكاوى المقيمة عند أول تقييم"""
+    if previous_rating is None:
+        apply_stats_deltas({('rating', 'rated'): 1})
+
+def record_attachment_removed(complaint_pk):
+    """تحديث عداد الشكاوى ذات المرفقات بعد حذف آخر مرفق (يُستدعى بعد حذف المرفق)"""
+    has_attachments = db.session.execute(
+        db.select(ComplaintAttachment.id).filter_by(complaint_id=complaint_pk).limit(1)
+    ).first()
+    if not has_attachments:
+        apply_stats_deltas({('attachments', 'with_attachments'): -1})
+
+def record_attachment_added(complaint_pk):
+    """تحديث عداد الشكاوى ذات المرفقات عند إضافة أول مرفق (يُستدعى قبل إضافة المرفق)"""
+    has_attachments = db.session.execute(
+        db.select(ComplaintAttachment.id).filter_by(complaint_id=complaint_pk).limit(1)
+    ).first()
+    if not has_attachments:
+        apply_stats_deltas({('attachments', 'with_attachments'): 1})
+
+def rebuild_stats_counters():
+    """إعادة بناء العدادات من جدول الشكاوى لإصلاح أي انحراف"""
+    deltas = compute_stats()
+
+    previous = {
+        (counter.dimension, counter.bucket): counter.count
+        for counter in ComplaintStatsCounter.query.all()
+    }
+    db.session.execute(ComplaintStatsCounter.__table__.delete())
+    apply_stats_deltas(deltas)
+    db.session.commit()
+
+    current = {(dimension, str(bucket)): count for (dimension, bucket), count in deltas.items() if count}
+    drift = {
+        f'{dimension}:{bucket}': current.get((dimension, bucket), 0) - previous.get((dimension, bucket), 0)
+        for dimension, bucket in set(previous) | set(current)
+        if current.get((dimension, bucket), 0) != previous.get((dimension, bucket), 0)
+    }
+    return drift
+
+def read_stats_counters():
+    """قراءة الإحصائيات من جدول العدادات (عدد الصفوف = عدد الفئات وليس عدد الشكاوى)"""
+    return stats_from_counters({
+        (counter.dimension, counter.bucket): counter.count
+        for counter in ComplaintStatsCounter.query.all()
+    })
+
+def stats_from_counters(counters):
+    """استجابة /api/stats من العدادات {(البعد، الفئة النصية): العدد}"""
+    stats = {'total_complaints': counters.get(('total', ''), 0)}
+    for status in STATS_STATUSES:
+        stats[status] = counters.get(('status', status), 0)
+    stats['high_priority'] = counters.get(('priority', 'high'), 0)
+    stats['urgent_priority'] = counters.get(('priority', 'urgent'), 0)
+    stats['with_attachments'] = counters.get(('attachments', 'with_attachments'), 0)
+    stats['rated_complaints'] = counters.get(('rating', 'rated'), 0)
+
+    # الأسماء من السجل المرجعي في الذاكرة، والفئات التي ليست معرفات صحيحة تُتجاهل
+    # (صفوف قديمة بقيم مثل 'True' أو '1.5') حتى لا تُسقط الإحصائيات كلها
+    by_type, by_governorate = [], []
+    for (dimension, bucket), count in counters.items():
+        if dimension not in ('type', 'governorate') or count <= 0 or not bucket.isdigit():
+            continue
+        if dimension == 'type':
+            complaint_type = reference_registry.complaint_type(int(bucket))
+            if complaint_type:
+                by_type.append({'type': complaint_type['name'], 'count': count})
+        else:
+            governorate = reference_registry.governorate(int(bucket))
+            if governorate:
+                by_governorate.append({'governorate': governorate['name'], 'count': count})
+    stats['by_type'] = by_type
+    stats['by_governorate'] = by_governorate
+    return stats
+
+def invalidate_stats_cache():
+    """إبطال الإحصائيات المخزنة مؤقتاً بعد أي عملية كتابة تؤثر عليها"""
+    stats_cache.invalidate(STATS_CACHE_KEY)
+
+@app.cli.command('reconcile-stats')
+def reconcile_stats_command():
+    """إعادة بناء عدادات الإحصائيات من الصفر"""
+    drift = rebuild_stats_counters()
+    invalidate_stats_cache()
+    if drift:
+        logger.warning(f"تم تصحيح انحراف في عدادات الإحصائيات: {drift}")
+    else:
+        logger.info("عدادات الإحصائيات مطابقة لجدول الشكاوى")
+
+# Full-text search - FTS5 على SQLite و tsvector + GIN على PostgreSQL
+COMPLAINT_ID_FRAGMENT = re.compile(r'^[0-9a-fA-F]{8}(-[0-9a-fA-F-]*)?$')
+SEARCH_INDEX_BATCH_SIZE = 500
+
+def ensure_search_schema():
+    """إنشاء فهرس البحث النصي المناسب لقاعدة البيانات وتسجيل نوعه في الإعدادات"""
+    dialect = db.engine.dialect.name
+    backend = None
+    try:
+        with db.engine.begin() as connection:
+            if dialect == 'sqlite':
+                connection.execute(db.text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS complaints_fts "
+                    "USING fts5(title, description, tokenize='unicode61 remove_diacritics 0')"
+                ))
+                backend = 'sqlite_fts5'
+            elif dialect == 'postgresql':
+                connection.execute(db.text(
+                    "CREATE TABLE IF NOT EXISTS complaint_search ("
+                    "complaint_pk INTEGER PRIMARY KEY REFERENCES complaints(id) ON DELETE CASCADE, "
+                    "document TSVECTOR NOT NULL)"
+                ))
+                connection.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_complaint_search_document "
+                    "ON complaint_search USING GIN (document)"
+                ))
+                backend = 'postgresql_tsvector'
+    except Exception as e:
+        logger.warning(f"البحث النصي الكامل غير متاح، سيتم استخدام LIKE: {str(e)}")
+    app.config['FULL_TEXT_SEARCH'] = backend
+    return backend
+
+SEARCH_BACKEND_TABLES = {'sqlite': ('sqlite_fts5', 'complaints_fts'), 'postgresql': ('postgresql_tsvector', 'complaint_search')}
+
+def full_text_search_backend(connection=None):
+    """نوع فهرس البحث النصي، ويُكتشف من المخطط عند أول استخدام في العملية
+
+    init_database لا تعمل إلا عند التشغيل المباشر، فعمال gunicorn يكتشفون النوع
+    هنا بدلاً من الرجوع إلى LIKE وإهمال تحديث الفهرس.
+    """
+    if 'FULL_TEXT_SEARCH' not in app.config:
+        connection = connection if connection is not None else db.session.connection()
+        backend, table = SEARCH_BACKEND_TABLES.get(connection.dialect.name, (None, None))
+        app.config['FULL_TEXT_SEARCH'] = backend if table and db.inspect(connection).has_table(table) else None
+    return app.config['FULL_TEXT_SEARCH']
+
+def index_complaint_text(connection, rows):
+    """إضافة أو تحديث نصوص الشكاوى في فهرس البحث - rows: [(id, title, description)]"""
+    backend = full_text_search_backend(connection)
+    params = [
+        {'pk': pk, 'title': search_document(title), 'description': search_document(description)}
+        for pk, title, description in rows
+    ]
+    if not backend or not params:
+        return
+    if backend == 'sqlite_fts5':
+        connection.execute(db.text("DELETE FROM complaints_fts WHERE rowid = :pk"), params)
+        connection.execute(db.text(
+            "INSERT INTO complaints_fts (rowid, title, description) VALUES (:pk, :title, :description)"
+        ), params)
+    else:
+        connection.execute(db.text(
+            "INSERT INTO complaint_search (complaint_pk, document) VALUES (:pk, "
+            "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :description), 'B')) "
+            "ON CONFLICT (complaint_pk) DO UPDATE SET document = EXCLUDED.document"
+        ), params)
+
+def remove_complaint_text(connection, pks):
+    """حذف الشكاوى من فهرس البحث"""
+    backend = full_text_search_backend(connection)
+    if not backend or not pks:
+        return
+    table = 'complaints_fts' if backend == 'sqlite_fts5' else 'complaint_search'
+    column = 'rowid' if backend == 'sqlite_fts5' else 'complaint_pk'
+    connection.execute(db.text(f"DELETE FROM {table} WHERE {column} = :pk"), [{'pk': pk} for pk in pks])
+
+def search_index_size():
+    """عدد الشكاوى المفهرسة للبحث النصي"""
+    backend = full_text_search_backend()
+    table = 'complaints_fts' if backend == 'sqlite_fts5' else 'complaint_search'
+    return db.session.execute(db.text(f'SELECT count(*) FROM {table}')).scalar() if backend else 0
+
+def search_hits(search):
+    """استعلام فرعي (complaint_pk, rank) مرتب تصاعدياً بالأهمية، أو None إذا لم يتوفر البحث النصي"""
+    backend = full_text_search_backend()
+    tokens = tokenize(search)
+    if not backend or not tokens:
+        return None
+    if backend == 'sqlite_fts5':
+        sql = db.text(
+            "SELECT rowid AS complaint_pk, bm25(complaints_fts, 10.0, 1.0) AS rank "
+            "FROM complaints_fts WHERE complaints_fts MATCH :search_query"
+        ).bindparams(search_query=' '.join(f'"{token}"*' for token in tokens))
+    else:
+        sql = db.text(
+            "SELECT complaint_pk, -ts_rank(document, to_tsquery('simple', :search_query)) AS rank "
+            "FROM complaint_search WHERE document @@ to_tsquery('simple', :search_query)"
+        ).bindparams(search_query=' & '.join(f'{token}:*' for token in tokens))
+    return sql.columns(complaint_pk=db.Integer, rank=db.Float).subquery('search_hits')
+
+def rebuild_search_index():
+    """إعادة بناء فهرس البحث من جدول الشكاوى على دفعات"""
+    backend = full_text_search_backend()
+    if not backend:
+        return 0
+    total = 0
+    with db.engine.begin() as connection:
+        connection.execute(db.text('DELETE FROM complaints_fts' if backend == 'sqlite_fts5' else 'DELETE FROM complaint_search'))
+        result = connection.execution_options(yield_per=SEARCH_INDEX_BATCH_SIZE).execute(
+            db.select(Complaint.id, Complaint.title, Complaint.description)
+        )
+        for batch in result.partitions():
+            index_complaint_text(connection, batch)
+            total += len(batch)
+    return total
+
+@db.event.listens_for(Complaint, 'after_insert')
+def _index_inserted_complaint(mapper, connection, target):
+    index_complaint_text(connection, [(target.id, target.title, target.description)])
+
+@db.event.listens_for(Complaint, 'after_update')
+def _index_updated_complaint(mapper, connection, target):
+    state = db.inspect(target)
+    if state.attrs.title.history.has_changes() or state.attrs.description.history.has_changes():
+        index_complaint_text(connection, [(target.id, target.title, target.description)])
+
+@db.event.listens_for(Complaint, 'after_delete')
+def _unindex_deleted_complaint(mapper, connection, target):
+    remove_complaint_text(connection, [target.id])
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """إعادة بناء فهرس البحث النصي الكامل"""
+    logger.info(f"تمت فهرسة {rebuild_search_index()} شكوى")
+
+# SLA tracking - الموعد المستهدف مخزن في الصف ومسح النوافذ عبر الفهرس (status, due_at)
+SLA_ACTOR = {'updated_by': 0, 'updated_by_name': 'متابعة المواعيد', 'updated_by_role': 'system'}
+SLA_MESSAGES = {
+    'warning': 'اقترب الموعد المستهدف لحل الشكوى',
+    'overdue': 'تجاوزت الشكوى الموعد المستهدف للحل وتم تصعيدها',
+}
+OVERDUE_LIST_LIMIT = 100
+
+def resolution_days_by_category():
+    """المدة المستهدفة لكل فئة من تعريفات الأنواع (مجلس النواب أولاً عند التكرار)"""
+    days = {}
+    for complaint_type in PARLIAMENT_COMPLAINT_TYPES + SENATE_COMPLAINT_TYPES:
+        days.setdefault(complaint_type['category'], complaint_type['estimated_resolution_days'])
+    return days
+
+def backfill_resolution_days():
+    """ضبط estimated_resolution_days للأنواع التي لم تُحدد لها مدة بعد"""
+    updated = 0
+    for category, days in resolution_days_by_category().items():
+        updated += db.session.execute(
+            db.update(ComplaintType)
+            .where(ComplaintType.category == category, ComplaintType.estimated_resolution_days.is_(None))
+            .values(estimated_resolution_days=days)
+        ).rowcount
+    db.session.commit()
+    return updated
+
+def backfill_due_dates():
+    """حساب due_at للشكاوى القائمة بجملة UPDATE واحدة لكل نوع"""
+    updated = 0
+    types = db.session.execute(db.select(ComplaintType.id, ComplaintType.estimated_resolution_days)).all()
+    for type_id, days in types:
+        days = days or DEFAULT_RESOLUTION_DAYS
+        if db.engine.dialect.name == 'postgresql':
+            due_at = Complaint.submitted_at + db.func.make_interval(0, 0, 0, days)
+        else:
+            due_at = db.func.datetime(Complaint.submitted_at, f'+{days} days')
+        updated += db.session.execute(
+            db.update(Complaint)
+            .where(Complaint.complaint_type_id == type_id, Complaint.due_at.is_(None))
+            # updated_at صراحةً حتى لا يطلق onupdate ويغير تاريخ تعديل كل الشكاوى القائمة
+            .values(due_at=due_at, updated_at=Complaint.updated_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.session.commit()
+    return updated
+
+def sla_filter():
+    return Complaint.status.in_(SLA_STATUSES)
+
+def scan_sla(now):
+    """تسجيل التنبيهات والتصعيدات المستحقة - يعيد {'warning': [...], 'overdue': [...]}
+
+    كل نافذة جملة UPDATE ... RETURNING واحدة على الفهرس (status, due_at)، والأعمدة
+    sla_warning_at و escalated_at تجعل المسح آمناً للتكرار وتحد ما يطابقه.
+    """
+    warning_end = now + timedelta(hours=app.config['SLA_WARNING_HOURS'])
+    windows = {
+        'warning': (
+            [Complaint.due_at >= now, Complaint.due_at < warning_end, Complaint.sla_warning_at.is_(None)],
+            {'sla_warning_at': now}
+        ),
+        'overdue': (
+            [Complaint.due_at < now, Complaint.escalated_at.is_(None)],
+            {'escalated_at': now}
+        ),
+    }
+
+    found = {}
+    updates = []
+    for kind, (conditions, values) in windows.items():
+        rows = db.session.execute(
+            db.update(Complaint).where(sla_filter(), *conditions).values(**values)
+            .returning(Complaint.id, Complaint.complaint_id, Complaint.status)
+            .execution_options(synchronize_session=False)
+        ).all()
+        found[kind] = [complaint_id for _, complaint_id, _ in rows]
+        updates += [
+            dict(complaint_id=pk, update_type='escalation', old_status=status, new_status=status,
+                 message=SLA_MESSAGES[kind], created_at=now, **SLA_ACTOR)
+            for pk, _, status in rows
+        ]
+    if updates:
+        db.session.execute(db.insert(ComplaintUpdate), updates)
+    db.session.commit()
+    if updates:
+        logger.info(f"مواعيد الشكاوى: {len(found['warning'])} تنبيه و {len(found['overdue'])} تصعيد")
+    return found
+
+def run_sla_scan(now):
+    with app.app_context():
+        return scan_sla(now)
+
+sla_scheduler = SlaScheduler(run_sla_scan, interval=app.config['SLA_SCAN_SECONDS'])
+
+@app.cli.command('sla-scan')
+def sla_scan_command():
+    """مسح كامل لمواعيد الشكاوى المفتوحة وتسجيل التنبيهات والتصعيدات"""
+    found = scan_sla(datetime.utcnow())
+    logger.info(f"تنبيهات: {len(found['warning'])} - تصعيدات: {len(found['overdue'])}")
+
+# Schema migrations
+# Update history - تقسيم شهري على PostgreSQL وجدول أرشيف على SQLite
+UPDATE_COLUMNS = [
+    'id', 'update_type', 'old_status', 'new_status', 'message',
+    'updated_by', 'updated_by_name', 'updated_by_role', 'created_at'
+]
+UPDATES_PAGE_SIZE = 20
+MAX_UPDATES_PAGE_SIZE = 100
+UPDATE_PARTITION_MONTHS_AHEAD = 3
+
+def month_start(value, offset=0):
+    """أول يوم في الشهر بعد إزاحة عدد من الأشهر"""
+    month = value.year * 12 + value.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1)
+
+def create_partitioned_updates_table(connection):
+    """إنشاء جدول التحديثات مقسماً شهرياً (المفتاح الأساسي يجب أن يتضمن عمود التقسيم)"""
+    connection.execute(db.text(
+        "CREATE TABLE IF NOT EXISTS complaint_updates ("
+        "id BIGSERIAL NOT NULL, "
+        "complaint_id INTEGER NOT NULL REFERENCES complaints(id), "
+        "update_type VARCHAR(20) NOT NULL, "
+        "old_status VARCHAR(20), "
+        "new_status VARCHAR(20), "
+        "message TEXT, "
+        "updated_by INTEGER NOT NULL, "
+        "updated_by_name VARCHAR(100) NOT NULL, "
+        "updated_by_role VARCHAR(20) NOT NULL, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'), "
+        "CONSTRAINT complaint_updates_partitioned_pkey PRIMARY KEY (id, created_at)"
+        ") PARTITION BY RANGE (created_at)"
+    ))
+    connection.execute(db.text(
+        "CREATE TABLE IF NOT EXISTS complaint_updates_default PARTITION OF complaint_updates DEFAULT"
+    ))
+
+def ensure_update_partitions(connection, start, months_ahead=UPDATE_PARTITION_MONTHS_AHEAD):
+    """إنشاء الأقسام الشهرية من start حتى months_ahead شهراً بعد الشهر الحالي"""
+    created = []
+    month = month_start(start)
+    last = month_start(datetime.utcnow(), months_ahead)
+    while month <= last:
+        following = month_start(month, 1)
+        name = f'complaint_updates_{month:%Y_%m}'
+        exists = connection.execute(db.text("SELECT to_regclass(:name)"), {'name': name}).scalar()
+        if not exists:
+            connection.execute(db.text(
+                f"CREATE TABLE {name} PARTITION OF complaint_updates "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{following:%Y-%m-%d}')"
+            ))
+            created.append(name)
+        month = following
+    return created
+
+def updates_table_is_partitioned(connection):
+    return bool(connection.execute(db.text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('complaint_updates')"
+    )).scalar())
+
+def ensure_update_history_schema():
+    """تهيئة تخزين سجل التحديثات قبل create_all وتسجيل نوعه في الإعدادات"""
+    if db.engine.dialect.name != 'postgresql':
+        app.config['UPDATE_HISTORY'] = 'archive'
+        return 'archive'
+    
+    # الجداول التي يعتمد عليها المفتاح الأجنبي أولاً
+    db.metadata.create_all(db.engine, tables=[
+        table for table in db.metadata.sorted_tables if table.name != 'complaint_updates'
+    ])
+    with db.engine.begin() as connection:
+        if not db.inspect(connection).has_table('complaint_updates'):
+            create_partitioned_updates_table(connection)
+        layout = 'partitioned' if updates_table_is_partitioned(connection) else 'archive'
+        if layout == 'partitioned':
+            ensure_update_partitions(connection, datetime.utcnow())
+    app.config['UPDATE_HISTORY'] = layout
+    return layout
+
+def partition_existing_updates():
+    """تحويل جدول تحديثات قائم (غير مقسم) على PostgreSQL إلى جدول مقسم شهرياً"""
+    columns = ', '.join(['complaint_id'] + UPDATE_COLUMNS)
+    with db.engine.begin() as connection:
+        if updates_table_is_partitioned(connection):
+            return 0
+        connection.execute(db.text("LOCK TABLE complaint_updates IN ACCESS EXCLUSIVE MODE"))
+        connection.execute(db.text("ALTER TABLE complaint_updates RENAME TO complaint_updates_legacy"))
+        connection.execute(db.text(
+            "ALTER INDEX IF EXISTS ix_complaint_updates_complaint RENAME TO ix_complaint_updates_complaint_legacy"
+        ))
+        create_partitioned_updates_table(connection)
+        oldest = connection.execute(db.text("SELECT min(created_at) FROM complaint_updates_legacy")).scalar()
+        ensure_update_partitions(connection, oldest or datetime.utcnow())
+        moved = connection.execute(db.text(
+            f"INSERT INTO complaint_updates ({columns}) "
+            f"SELECT {columns} FROM complaint_updates_legacy"
+        )).rowcount
+        connection.execute(db.text(
+            "SELECT setval(pg_get_serial_sequence('complaint_updates', 'id'), "
+            "coalesce((SELECT max(id) FROM complaint_updates), 0) + 1, false)"
+        ))
+        connection.execute(db.text("DROP TABLE complaint_updates_legacy"))
+    apply_index_migrations()
+    app.config['UPDATE_HISTORY'] = 'partitioned'
+    return moved
+
+def archive_update_history(older_than_days):
+    """نقل التحديثات الأقدم من المدة المحددة إلى جدول الأرشيف (SQLite)
+    
+    الصف الأحدث لا يُنقل أبداً حتى لا يعيد SQLite استخدام معرفات مؤرشفة
+    (INTEGER PRIMARY KEY بدون AUTOINCREMENT يبدأ من max(id) + 1).
+    """
+    if update_history_layout() != 'archive':
+        return 0
+    hot = ComplaintUpdate.__table__
+    archive = ComplaintUpdateArchive.__table__
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    columns = ['complaint_id'] + UPDATE_COLUMNS
+    with db.engine.begin() as connection:
+        newest = connection.execute(db.select(db.func.max(hot.c.id))).scalar()
+        if newest is None:
+            return 0
+        condition = db.and_(hot.c.created_at < cutoff, hot.c.id < newest)
+        connection.execute(archive.insert().from_select(
+            columns, db.select(*[hot.c[name] for name in columns]).where(condition)
+        ))
+        return connection.execute(hot.delete().where(condition)).rowcount
+
+def update_history_layout():
+    """تخزين سجل التحديثات (archive أو partitioned)، ويُكتشف عند أول استخدام في العملية
+
+    مثل البحث النصي: عمال gunicorn لا يمرون بـ ensure_update_history_schema.
+    """
+    if 'UPDATE_HISTORY' not in app.config:
+        connection = db.session.connection()
+        partitioned = connection.dialect.name == 'postgresql' and updates_table_is_partitioned(connection)
+        app.config['UPDATE_HISTORY'] = 'partitioned' if partitioned else 'archive'
+    return app.config['UPDATE_HISTORY']
+
+def update_history_sources():
+    """الجداول التي يُقرأ منها سجل التحديثات"""
+    if update_history_layout() == 'archive':
+        return [ComplaintUpdate.__table__, ComplaintUpdateArchive.__table__]
+    return [ComplaintUpdate.__table__]
+
+def complaint_updates_page(complaint_pk, limit=UPDATES_PAGE_SIZE, cursor=None):
+    """أحدث تحديثات الشكوى (الأحدث أولاً) بترقيم keyset على (created_at, id) - يعيد (التحديثات، المؤشر التالي)"""
+    selects = []
+    for table in update_history_sources():
+        query = db.select(*[table.c[name] for name in UPDATE_COLUMNS]).where(table.c.complaint_id == complaint_pk)
+        if cursor:
+            query = query.where(db.tuple_(table.c.created_at, table.c.id) < db.tuple_(*cursor))
+        selects.append(query.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit + 1))
+    
+    if len(selects) == 1:
+        rows = db.session.execute(selects[0]).all()
+    else:
+        # كل جزء مرتب ومحدود عبر فهرسه، والدمج النهائي على limit + 1 صف لكل جدول فقط
+        merged = db.union_all(*[db.select(query.subquery()) for query in selects]).subquery()
+        rows = db.session.execute(
+            db.select(merged).order_by(merged.c.created_at.desc(), merged.c.id.desc()).limit(limit + 1)
+        ).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    updates = [
+        dict(row._mapping, created_at=row.created_at.isoformat() if row.created_at else None)
+        for row in rows
+    ]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    return updates, next_cursor
+
+@app.cli.command('partition-updates')
+def partition_updates_command():
+    """تحويل جدول التحديثات إلى جدول مقسم شهرياً (PostgreSQL)"""
+    if db.engine.dialect.name != 'postgresql':
+        logger.warning("التقسيم متاح على PostgreSQL فقط - استخدم archive-updates على SQLite")
+        return
+    logger.info(f"تم نقل {partition_existing_updates()} تحديث إلى الجدول المقسم")
+
+@app.cli.command('ensure-update-partitions')
+def ensure_update_partitions_command():
+    """إنشاء أقسام الأشهر القادمة مسبقاً (يُشغل دورياً)"""
+    if ensure_update_history_schema() != 'partitioned':
+        logger.warning("جدول التحديثات غير مقسم")
+        return
+    logger.info("أقسام جدول التحديثات جاهزة")
+
+@app.cli.command('archive-updates')
+@click.option('--older-than-days', default=180, show_default=True, type=int)
+def archive_updates_command(older_than_days):
+    """نقل التحديثات القديمة إلى جدول الأرشيف (SQLite)"""
+    logger.info(f"تمت أرشفة {archive_update_history(older_than_days)} تحديث")
+
+def apply_index_migrations():
+    """إنشاء الفهارس الناقصة على الجداول الموجودة مسبقاً (create_all لا يعدل الجداول القائمة)"""
+    created = []
+    for index in COMPLAINT_INDEXES:
+        existing = {ix['name'] for ix in db.inspect(db.engine).get_indexes(index.table.name)}
+        if index.name not in existing:
+            index.create(bind=db.engine)
+            created.append(index.name)
+    return created
+
+def apply_column_migrations():
+    """إضافة الأعمدة الجديدة (القابلة لـ NULL) إلى الجداول الموجودة مسبقاً"""
+    added = []
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(f'{table.name}.{column.name}')
+    return added
+
+@app.cli.command('migrate-schema')
+def migrate_schema_command():
+    """تطبيق ترحيل الأعمدة والفهارس على قاعدة بيانات قائمة"""
+    columns = apply_column_migrations()
+    indexes = apply_index_migrations()
+    logger.info(f"الأعمدة المضافة: {columns} - الفهارس المنشأة: {indexes}")
+
+@app.cli.command('migrate-indexes')
+def migrate_indexes_command():
+    """تطبيق ترحيل الفهارس على قاعدة بيانات قائمة"""
+    created = apply_index_migrations()
+    logger.info(f"تم إنشاء الفهارس: {created}" if created else "كل الفهارس موجودة")
+
 def init_database():
     """إنشاء قاعدة البيانات والجداول"""
     with app.app_context():
@@ -290,7 +1564,13 @@ def init_database():
         if not os.path.exists(UPLOAD_FOLDER):
             os.makedirs(UPLOAD_FOLDER)
         
+        ensure_update_history_schema()
         db.create_all()
+        apply_column_migrations()
+        apply_index_migrations()
+        # الفهرس يُعاد بناؤه إذا انحرف عن جدول الشكاوى (وليس فقط إذا كان فارغاً)
+        if ensure_search_schema() and search_index_size() != Complaint.query.count():
+            logger.info(f"تمت فهرسة {rebuild_search_index()} شكوى للبحث النصي")
         
         # إضافة المحافظات المصرية إذا لم تكن موجودة
         if Governorate.query.count() == 0:
@@ -443,6 +1723,25 @@ def init_database():
             db.session.commit()
             logger.info("تم إضافة أنواع الشكاوى الأساسية")
         
+        # المدد المستهدفة للحل ومواعيد الشكاوى القائمة قبل إضافة عمود due_at
+        if backfill_resolution_days():
+            logger.info("تم ضبط المدد المستهدفة لأنواع الشكاوى")
+        if db.session.query(Complaint.query.filter(Complaint.due_at.is_(None)).exists()).scalar():
+            logger.info(f"تم حساب الموعد المستهدف لـ {backfill_due_dates()} شكوى")
+        
+        # تهيئة عدادات الإحصائيات للبيانات الموجودة مسبقاً
+        if ComplaintStatsCounter.query.count() == 0 and Complaint.query.count() > 0:
+            rebuild_stats_counters()
+            logger.info("تم بناء عدادات الإحصائيات")
+        
+        # تحميل البيانات المرجعية وجدول التوزيع وفهرس التكرار في الذاكرة
+        reference_registry.refresh(force=True)
+        assignment_engine.refresh()
+        duplicate_index.reset()
+        duplicate_index.refresh()
+        if db.session.query(Complaint.query.filter(Complaint.text_signature.is_(None)).exists()).scalar():
+            logger.info(f"تمت فهرسة {backfill_text_signatures()} شكوى لاكتشاف التكرار")
+        
         logger.info("تم إنشاء قاعدة البيانات بنجاح")
 
 # API Routes
@@ -471,10 +1770,8 @@ def health_check():
 def get_complaint_types():
     """الحصول على أنواع الشكاوى"""
     try:
-        types = ComplaintType.query.filter_by(is_active=True).order_by(ComplaintType.display_order).all()
-        return jsonify({
-            'complaint_types': [t.to_dict() for t in types]
-        }), 200
+        snapshot = reference_registry.snapshot()
+        return conditional_json_response(snapshot.complaint_types_json, snapshot.complaint_types_etag)
         
     except Exception as e:
         logger.error(f"خطأ في الحصول على أنواع الشكاوى: {str(e)}")
@@ -484,10 +1781,8 @@ def get_complaint_types():
 def get_governorates():
     """الحصول على المحافظات"""
     try:
-        governorates = Governorate.query.filter_by(is_active=True).order_by(Governorate.display_order).all()
-        return jsonify({
-            'governorates': [gov.to_dict() for gov in governorates]
-        }), 200
+        snapshot = reference_registry.snapshot()
+        return conditional_json_response(snapshot.governorates_json, snapshot.governorates_etag)
         
     except Exception as e:
         logger.error(f"خطأ في الحصول على المحافظات: {str(e)}")
@@ -497,6 +1792,8 @@ def get_governorates():
 @jwt_required()
 def submit_complaint():
     """تقديم شكوى جديدة"""
+    quota_window = None
+    assigned_to = None
     try:
         citizen_id = get_jwt_identity()
         data = request.get_json()
@@ -504,71 +1801,156 @@ def submit_complaint():
         if not data:
             return jsonify({'error': 'لا توجد بيانات'}), 400
         
-        # التحقق من البيانات المطلوبة
-        required_fields = ['title', 'description', 'complaint_type_id', 'governorate_id', 'citizen_name', 'citizen_email']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} مطلوب'}), 400
+        # التحقق من البيانات المطلوبة ونوع الشكوى والمحافظة
+        error, complaint_type, governorate = validate_complaint_data(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        # التحقق من طول الوصف (حد أقصى 1500 حرف)
-        if len(data['description']) > 1500:
-            return jsonify({'error': 'الوصف يجب ألا يزيد عن 1500 حرف'}), 400
-        
-        # التحقق من وجود نوع الشكوى والمحافظة
-        complaint_type = ComplaintType.query.get(data['complaint_type_id'])
-        if not complaint_type or not complaint_type.is_active:
-            return jsonify({'error': 'نوع الشكوى غير صحيح'}), 400
-        
-        governorate = Governorate.query.get(data['governorate_id'])
-        if not governorate or not governorate.is_active:
-            return jsonify({'error': 'المحافظة غير صحيحة'}), 400
-        
-        # إنشاء الشكوى الجديدة
-        complaint = Complaint(
-            citizen_id=citizen_id,
-            citizen_name=data['citizen_name'].strip(),
-            citizen_email=data['citizen_email'].strip(),
-            citizen_phone=data.get('citizen_phone', '').strip() if data.get('citizen_phone') else None,
-            title=data['title'].strip(),
-            description=data['description'].strip(),
-            complaint_type_id=data['complaint_type_id'],
-            governorate_id=data['governorate_id'],
-            city=data.get('city', '').strip() if data.get('city') else None,
-            district=data.get('district', '').strip() if data.get('district') else None,
-            detailed_location=data.get('detailed_location', '').strip() if data.get('detailed_location') else None,
-            priority=complaint_type.priority_level
-        )
+        # حصة التقديم اليومية قبل أي كتابة في قاعدة البيانات
+        if app.config['SUBMISSION_QUOTA_ENABLED']:
+            try:
+                quota_window = submission_quota.acquire(citizen_id)
+            except QuotaExceeded as e:
+                response = jsonify({
+                    'error': SYSTEM_MESSAGES['complaint_limit_exceeded'].format(max_per_day=e.limit)
+                })
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 429
         
+        # إنشاء الشكوى مع تحديثها الأولي (وتحديث التكليف الآلي إن وجد) في معاملة واحدة
+        assigned_to = auto_assign(governorate, complaint_type)
+        complaint = build_complaint(citizen_id, data, complaint_type, governorate, assigned_to)
         db.session.add(complaint)
-        db.session.commit()
+        apply_stats_deltas(complaint_stats_deltas(complaint))
+        db.session.flush()
+        enqueue_notifications(submission_notifications(
+            complaint.id, complaint.complaint_id, complaint.citizen_email, complaint.citizen_phone, assigned_to
+        ), complaint.submitted_at)
         
-        # إضافة تحديث أولي
-        initial_update = ComplaintUpdate(
-            complaint_id=complaint.id,
-            update_type='status_change',
-            old_status=None,
-            new_status='submitted',
-            message='تم تقديم الشكوى بنجاح',
-            updated_by=citizen_id,
-            updated_by_name=data['citizen_name'],
-            updated_by_role='citizen'
-        )
-        
-        db.session.add(initial_update)
+        # التسلسل قبل الـ commit: كل الحقول في الذاكرة فلا حاجة لإعادة التحميل بعده
+        complaint_data = complaint.to_dict()
+        signature_row = (complaint.complaint_id, complaint.governorate_id, complaint.duplicate_of, complaint.text_signature)
         db.session.commit()
+        quota_window = assigned_to = None
+        invalidate_stats_cache()
+        index_new_complaints([signature_row])
         
-        logger.info(f"تم تقديم شكوى جديدة: {complaint.complaint_id}")
+        logger.info(f"تم تقديم شكوى جديدة: {complaint_data['complaint_id']}")
+        if complaint_data['duplicate_of']:
+            logger.info(f"الشكوى مكررة من {complaint_data['duplicate_of']} (تشابه {complaint_data['duplicate_score']})")
         
         return jsonify({
             'message': 'تم تقديم الشكوى بنجاح',
-            'complaint': complaint.to_dict()
+            'complaint': complaint_data
         }), 201
         
     except Exception as e:
         db.session.rollback()
+        # الشكوى لم تُحفظ فلا تُحتسب من الحصة
+        if quota_window is not None:
+            submission_quota.release(citizen_id, quota_window)
+        assignment_engine.adjust(assigned_to, -1)
         logger.error(f"خطأ في تقديم الشكوى: {str(e)}")
         return jsonify({'error': 'حدث خطأ في تقديم الشكوى'}), 500
 
+MAX_BULK_COMPLAINTS = 500
+
+@app.route('/api/complaints/bulk', methods=['POST'])
+@role_required('admin', 'deputy')
+def submit_complaints_bulk():
+    """إدخال دفعة من الشكاوى الورقية من مكاتب النواب في معاملة واحدة
+    
+    مقصور على المسؤولين والنواب، ولا تسري عليه حصة التقديم اليومية لأنها حصة
+    المواطن نفسه بينما يُدخل مكتب النائب شكاوى مواطنين متعددين نيابة عنهم.
+    """
+    rows = []
+    try:
+        entered_by, _, entered_by_role = reviewer_identity()
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('complaints'), list) or not data['complaints']:
+            return jsonify({'error': 'قائمة الشكاوى مطلوبة'}), 400
+        
+        items = data['complaints']
+        if len(items) > MAX_BULK_COMPLAINTS:
+            return jsonify({'error': f'الحد الأقصى للدفعة {MAX_BULK_COMPLAINTS} شكوى'}), 400
+        
+        entered_by_name = (data.get('entered_by_name') or '').strip() or 'مكتب النائب'
+        now = datetime.utcnow()
+        
+        # التحقق من كل العناصر في مرور واحد مقابل السجل المرجعي
+        results, rows = [], []
+        batch_duplicates = DuplicateIndex(lambda after_id: [], threshold=duplicate_index.threshold)
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results.append({'index': index, 'status': 'error', 'error': 'بيانات غير صحيحة'})
+                continue
+            error, complaint_type, governorate = validate_complaint_data(item)
+            # صاحب الشكوى هو المواطن دائماً وليس المكتب الذي أدخلها
+            citizen_id = item.get('citizen_id')
+            if not error and not is_integer_id(citizen_id):
+                error = 'citizen_id مطلوب ويجب أن يكون رقماً صحيحاً'
+            if error:
+                results.append({'index': index, 'status': 'error', 'error': error})
+                continue
+            row = complaint_row(citizen_id, item, complaint_type, governorate, now,
+                                auto_assign(governorate, complaint_type))
+            cluster_within_batch(row, batch_duplicates)
+            rows.append(row)
+            results.append({'index': index, 'status': 'created', 'complaint_id': row['complaint_id']})
+        
+        if rows:
+            # إدراج جماعي للشكاوى ثم لتحديثاتها الأولية
+            # الربط بالمعرف العام بدلاً من ترتيب المعاملات حتى يبقى RETURNING مجمعاً
+            # render_nulls: الصفوف كاملة الأعمدة، فلا تُقسم الدفعة حسب الأعمدة الفارغة (مثل duplicate_of)
+            pk_by_complaint_id = dict(
+                (complaint_id, pk) for pk, complaint_id in db.session.execute(
+                    db.insert(Complaint).returning(Complaint.id, Complaint.complaint_id), rows,
+                    execution_options={'render_nulls': True}
+                )
+            )
+            inserted = [pk_by_complaint_id[row['complaint_id']] for row in rows]
+            db.session.execute(db.insert(ComplaintUpdate), [
+                dict(
+                    initial_update_row(entered_by, entered_by_name, now, role=entered_by_role,
+                                       message='تم إدخال الشكوى ضمن دفعة من مكتب النائب'),
+                    complaint_id=pk
+                )
+                for pk in inserted
+            ])
+            # الإدراج الجماعي لا يطلق أحداث النموذج، لذا تتم الفهرسة والعدادات صراحةً
+            index_complaint_text(db.session.connection(), [
+                (pk, row['title'], row['description']) for pk, row in zip(inserted, rows)
+            ])
+            apply_stats_deltas(rows_stats_deltas(rows))
+            enqueue_notifications([
+                entry
+                for pk, row in zip(inserted, rows)
+                for entry in submission_notifications(
+                    pk, row['complaint_id'], row['citizen_email'], row['citizen_phone'], row['assigned_to']
+                )
+            ], now)
+            db.session.commit()
+            invalidate_stats_cache()
+            index_new_complaints([
+                (row['complaint_id'], row['governorate_id'], row['duplicate_of'], row['text_signature']) for row in rows
+            ])
+        
+        logger.info(f"تم إدخال دفعة شكاوى: {len(rows)} من {len(items)}")
+        
+        return jsonify({
+            'created': len(rows),
+            'failed': len(items) - len(rows),
+            'results': results
+        }), 201 if rows else 400
+        
+    except Exception as e:
+        db.session.rollback()
+        for row in rows:
+            assignment_engine.adjust(row['assigned_to'], -1)
+        logger.error(f"خطأ في إدخال دفعة الشكاوى: {str(e)}")
+        return jsonify({'error': 'حدث خطأ في إدخال دفعة الشكاوى'}), 500
+
 @app.route('/api/complaints', methods=['GET'])
 @jwt_required()
 def get_complaints():
@@ -579,53 +1961,118 @@ def get_complaints():
         # معاملات البحث والتصفية
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
-        status = request.args.get('status')
-        complaint_type_id = request.args.get('complaint_type_id', type=int)
-        governorate_id = request.args.get('governorate_id', type=int)
-        priority = request.args.get('priority')
-        search = request.args.get('search', '').strip()
-        
-        # بناء الاستعلام
-        query = Complaint.query.filter_by(citizen_id=citizen_id)
-        
-        if status:
-            query = query.filter(Complaint.status == status)
+        try:
+            fields = parse_fields(request.args.get('fields'), LIST_ALLOWED_FIELDS, LIST_FIELDS)
+        except FieldProjectionError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if complaint_type_id:
-            query = query.filter(Complaint.complaint_type_id == complaint_type_id)
-        
-        if governorate_id:
-            query = query.filter(Complaint.governorate_id == governorate_id)
+        # بناء الاستعلام على مستوى الأعمدة المطلوبة فقط (المؤشر يحتاج مفتاح الترتيب)
+        cursor_mode = 'cursor' in request.args
+        columns = projection_columns(fields, ('submitted_at', 'id') if cursor_mode else ())
+        serializer = RowSerializer(columns, fields, LIST_EMBEDS)
+        query = db.select(*[getattr(Complaint, column) for column in columns]).where(
+            Complaint.citizen_id == citizen_id
+        )
+        query, hits = apply_complaint_filters(query, request.args)
         
-        if priority:
-            query = query.filter(Complaint.priority == priority)
-        
-        if search:
-            query = query.filter(
-                db.or_(
-                    Complaint.title.contains(search),
-                    Complaint.description.contains(search),
-                    Complaint.complaint_id.contains(search)
-                )
-            )
+        # التصفح بالمؤشر: ?cursor= للصفحة الأولى ثم قيمة next_cursor
+        if cursor_mode:
+            return get_complaints_page_by_cursor(query, per_page, serializer)
         
         # التصفح
-        complaints = query.order_by(Complaint.submitted_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        page = max(page, 1)
+        per_page = per_page if per_page > 0 else 20
+        total = count_rows(query)
+        if hits is not None:
+            query = query.order_by(db.func.coalesce(hits.c.rank, -1e9))
+        rows = db.session.execute(
+            query.order_by(Complaint.submitted_at.desc()).limit(per_page).offset((page - 1) * per_page)
+        ).all()
         
-        return jsonify({
-            'complaints': [complaint.to_dict(include_details=False) for complaint in complaints.items],
-            'total': complaints.total,
-            'pages': complaints.pages,
+        return json_bytes_response({
+            'complaints': serializer.rows(rows),
+            'total': total,
+            'pages': math.ceil(total / per_page),
             'current_page': page,
             'per_page': per_page
-        }), 200
+        })
         
     except Exception as e:
         logger.error(f"خطأ في الحصول على الشكاوى: {str(e)}")
         return jsonify({'error': 'حدث خطأ في الحصول على الشكاوى'}), 500
 
+def apply_complaint_filters(query, args):
+    """تطبيق معاملات التصفية والبحث المشتركة بين القائمة والتصدير - يعيد (الاستعلام، نتائج البحث النصي)"""
+    status = args.get('status')
+    complaint_type_id = args.get('complaint_type_id', type=int)
+    governorate_id = args.get('governorate_id', type=int)
+    priority = args.get('priority')
+    search = args.get('search', '').strip()
+    
+    if status:
+        query = query.filter(Complaint.status == status)
+    
+    if complaint_type_id:
+        query = query.filter(Complaint.complaint_type_id == complaint_type_id)
+    
+    if governorate_id:
+        query = query.filter(Complaint.governorate_id == governorate_id)
+    
+    if priority:
+        query = query.filter(Complaint.priority == priority)
+    
+    hits = search_hits(search) if search else None
+    if hits is not None:
+        # البحث النصي الكامل مع ترتيب النتائج حسب الأهمية
+        if COMPLAINT_ID_FRAGMENT.match(search):
+            query = query.outerjoin(hits, hits.c.complaint_pk == Complaint.id).filter(
+                db.or_(hits.c.complaint_pk.isnot(None), Complaint.complaint_id.startswith(search))
+            )
+        else:
+            query = query.join(hits, hits.c.complaint_pk == Complaint.id)
+    elif search:
+        query = query.filter(
+            db.or_(
+                Complaint.title.contains(search),
+                Complaint.description.contains(search),
+                Complaint.complaint_id.contains(search)
+            )
+        )
+    
+    return query, hits
+
+MAX_CURSOR_PAGE_SIZE = 100
+
+def get_complaints_page_by_cursor(query, per_page, serializer):
+    """صفحة من الشكاوى بترقيم keyset على (submitted_at, id) دون COUNT أو OFFSET"""
+    per_page = max(1, min(per_page, MAX_CURSOR_PAGE_SIZE))
+    cursor = request.args.get('cursor', '').strip()
+    include_total = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+    
+    total = count_rows(query) if include_total else None
+    
+    if cursor:
+        try:
+            submitted_at, row_id = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        query = query.filter(db.tuple_(Complaint.submitted_at, Complaint.id) < db.tuple_(submitted_at, row_id))
+    
+    rows = db.session.execute(
+        query.order_by(Complaint.submitted_at.desc(), Complaint.id.desc()).limit(per_page + 1)
+    ).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(rows[-1].submitted_at, rows[-1].id) if has_more else None
+    
+    return json_bytes_response({
+        'complaints': serializer.rows(rows),
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'total': total,
+        'per_page': per_page
+    })
+
 @app.route('/api/complaints/<complaint_id>', methods=['GET'])
 @jwt_required()
 def get_complaint_details(complaint_id):
@@ -633,7 +2080,7 @@ def get_complaint_details(complaint_id):
     try:
         citizen_id = get_jwt_identity()
         
-        complaint = Complaint.query.filter_by(
+        complaint = Complaint.query.options(*DETAIL_LOAD_OPTIONS).filter_by(
             complaint_id=complaint_id,
             citizen_id=citizen_id
         ).first()
@@ -641,14 +2088,304 @@ def get_complaint_details(complaint_id):
         if not complaint:
             return jsonify({'error': 'الشكوى غير موجودة'}), 404
         
+        updates, next_cursor = complaint_updates_page(complaint.id)
         return jsonify({
-            'complaint': complaint.to_dict(include_details=True)
+            'complaint': complaint.to_dict(include_details=True, updates=updates),
+            'updates_next_cursor': next_cursor
         }), 200
         
     except Exception as e:
         logger.error(f"خطأ في الحصول على تفاصيل الشكوى: {str(e)}")
         return jsonify({'error': 'حدث خطأ في الحصول على تفاصيل الشكوى'}), 500
 
+@app.route('/api/complaints/<complaint_id>/updates', methods=['GET'])
+@jwt_required()
+def get_complaint_updates(complaint_id):
+    """صفحات سجل تحديثات الشكوى (الأحدث أولاً) بمعاملي limit و cursor"""
+    try:
+        complaint_pk = db.session.execute(
+            db.select(Complaint.id).filter_by(complaint_id=complaint_id, citizen_id=get_jwt_identity())
+        ).scalar()
+        if not complaint_pk:
+            return jsonify({'error': 'الشكوى غير موجودة'}), 404
+        
+        limit = max(1, min(request.args.get('limit', UPDATES_PAGE_SIZE, type=int), MAX_UPDATES_PAGE_SIZE))
+        cursor = request.args.get('cursor', '').strip()
+        try:
+            cursor = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        updates, next_cursor = complaint_updates_page(complaint_pk, limit, cursor)
+        return jsonify({
+            'updates': updates,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"خطأ في الحصول على تحديثات الشكوى: {str(e)}")
+        return jsonify({'error': 'حدث خطأ في الحصول على تحديثات الشكوى'}), 500
+
+@app.route('/api/complaints/<complaint_id>/attachments', methods=['POST'])
+@jwt_required()
+def upload_attachment(complaint_id):
+    """رفع مرفق كتدفق خام (application/octet-stream) واسم الملف في ترويسة X-File-Name"""
+    received = None
+    stored_path = None
+    try:
+        citizen_id = get_jwt_identity()
+        original_filename = os.path.basename(
+            unquote(request.headers.get('X-File-Name') or request.args.get('filename', ''))
+        ).strip()
+        
+        # التحقق من النوع والحجم المعلن قبل قراءة أي بايت
+        extension = extension_of(original_filename)
+        max_bytes = size_limit_for(extension, ALLOWED_FILE_TYPES)
+        if not max_bytes:
+            return jsonify({'error': SYSTEM_MESSAGES['invalid_file_type']}), 415
+        if request.content_length and request.content_length > max_bytes:
+            return jsonify({'error': SYSTEM_MESSAGES['file_too_large'].format(max_size=max_bytes // (1024 * 1024))}), 413
+        
+        complaint_pk = db.session.execute(
+            db.select(Complaint.id).filter_by(complaint_id=complaint_id, citizen_id=citizen_id)
+        ).scalar()
+        if not complaint_pk:
+            return jsonify({'error': 'الشكوى غير موجودة'}), 404
+        
+        # حدود عدد المرفقات وحجمها الكلي للشكوى
+        files_count, total_size = db.session.execute(
+            db.select(db.func.count(ComplaintAttachment.id), db.func.coalesce(db.func.sum(ComplaintAttachment.file_size), 0))
+            .filter_by(complaint_id=complaint_pk)
+        ).one()
+        max_files = ALLOWED_FILE_TYPES['max_files_per_complaint']
+        if files_count >= max_files:
+            return jsonify({'error': SYSTEM_MESSAGES['max_files_exceeded'].format(max_files=max_files)}), 400
+        remaining = ALLOWED_FILE_TYPES['total_max_size_mb'] * 1024 * 1024 - total_size
+        
+        # الاستقبال على دفعات إلى ملف مؤقت ثم إعادة تسمية ذرية
+        directory = os.path.join(app.config['UPLOAD_FOLDER'], 'tmp')
+        received = receive_stream(request.stream, directory, extension, min(max_bytes, remaining))
+        
+        # المحتوى المكرر لا يستهلك مساحة: يُحذف الملف المؤقت ويُزاد عدد المراجع فقط
+        blob_file, created = acquire_attachment_blob(received, extension)
+        if created:
+            stored_path = blob_file
+        
+        # إنشاء سجل المرفق بعد وجود الملف في مكانه النهائي فقط
+        record_attachment_added(complaint_pk)
+        variants = imaging.existing_variants(blob_file)
+        attachment = ComplaintAttachment(
+            complaint_id=complaint_pk,
+            filename=f'{received.sha256}.{extension}',
+            original_filename=original_filename,
+            file_size=received.size,
+            file_type=extension,
+            file_path=blob_file,
+            sha256=received.sha256,
+            thumbnail_path=variants.get('thumbnail'),
+            web_path=variants.get('web')
+        )
+        db.session.add(attachment)
+        db.session.commit()
+        invalidate_stats_cache()
+        
+        if extension in imaging.IMAGE_TYPES and len(variants) < len(imaging.VARIANTS):
+            # المرفق محفوظ بالفعل: فشل الجدولة لا يُفشل الرفع، والأمر process-images يعالجه لاحقاً
+            try:
+                schedule_image_processing(received.sha256, blob_file)
+            except Exception as e:
+                logger.error(f"تعذرت جدولة معالجة الصورة {received.sha256[:12]}: {str(e)}")
+        
+        logger.info(f"تم رفع مرفق للشكوى {complaint_id}: {received.size} بايت")
+        
+        return jsonify({
+            'message': SYSTEM_MESSAGES['file_upload_success'],
+            'attachment': attachment.to_dict()
+        }), 201
+        
+    except UploadError as e:
+        return jsonify({'error': e.message}), e.status
+    
+    except Exception as e:
+        db.session.rollback()
+        if received is not None:
+            received.discard()
+        # لا يُحذف المحتوى إذا سجله طلب آخر متزامن لنفس البصمة
+        if stored_path and db.session.get(AttachmentBlob, received.sha256) is None:
+            remove_blob(stored_path)
+        logger.error(f"خطأ في رفع المرفق: {str(e)}")
+        return jsonify({'error': SYSTEM_MESSAGES['file_upload_error']}), 500
+
+def record_image_variants(sha256, variants):
+    """تسجيل النسخ المشتقة لكل المرفقات التي تشارك نفس المحتوى"""
+    with app.app_context():
+        db.session.execute(
+            db.update(ComplaintAttachment)
+            .where(ComplaintAttachment.sha256 == sha256)
+            .values(thumbnail_path=variants.get('thumbnail'), web_path=variants.get('web'))
+        )
+        db.session.commit()
+
+image_processor = imaging.ImageProcessor(
+    max_workers=app.config['IMAGE_WORKERS'],
+    max_pending=app.config['IMAGE_MAX_PENDING'],
+    on_done=record_image_variants
+)
+
+def schedule_image_processing(sha256, path):
+    """جدولة توليد النسخ المشتقة دون تأخير الاستجابة"""
+    if not imaging.available():
+        return False
+    return image_processor.submit(sha256, path)
+
+@app.cli.command('process-images')
+def process_images_command():
+    """توليد النسخ المشتقة للصور التي لم تُعالج بعد"""
+    if not imaging.available():
+        logger.warning("مكتبة Pillow غير مثبتة - لا يمكن معالجة الصور")
+        return
+    pending = db.session.execute(
+        db.select(ComplaintAttachment.sha256, db.func.min(ComplaintAttachment.file_path))
+        .where(
+            ComplaintAttachment.sha256.isnot(None),
+            ComplaintAttachment.thumbnail_path.is_(None),
+            ComplaintAttachment.file_type.in_(imaging.IMAGE_TYPES)
+        )
+        .group_by(ComplaintAttachment.sha256)
+    ).all()
+    scheduled = 0
+    for sha256, path in pending:
+        # الانتظار عند امتلاء المجمع بدلاً من التخطي
+        while not image_processor.submit(sha256, path):
+            time.sleep(0.1)
+        scheduled += 1
+    image_processor.shutdown(wait=True)
+    logger.info(f"تمت معالجة {scheduled} صورة: {image_processor.stats()}")
+
+def acquire_attachment_blob(received, extension):
+    """تسجيل مرجع جديد لمحتوى الملف وتخزينه إذا كان جديداً - يعيد (المسار، هل خُزن الآن)
+    
+    مسار المحتوى مشتق من البصمة، فرفعان متزامنان لنفس المحتوى يكتبان نفس الملف بإعادة
+    تسمية ذرية، وعدد المراجع يُزاد بـ upsert ذري بدلاً من قراءة ثم إدراج يتعارض فيه الطلبان.
+    """
+    path = blob_path(app.config['UPLOAD_FOLDER'], received.sha256)
+    created = not os.path.exists(path)
+    if created:
+        store_blob(received, app.config['UPLOAD_FOLDER'])
+    else:
+        received.discard()
+    
+    row = {
+        'sha256': received.sha256, 'file_size': received.size, 'file_type': extension,
+        'file_path': path, 'ref_count': 1
+    }
+    table = AttachmentBlob.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        stmt = insert(table).values(**row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.sha256],
+            set_={'ref_count': table.c.ref_count + 1, 'file_path': stmt.excluded.file_path}
+        )
+        db.session.execute(stmt)
+    else:
+        result = db.session.execute(
+            table.update().where(table.c.sha256 == received.sha256)
+            .values(ref_count=table.c.ref_count + 1, file_path=path)
+        )
+        if result.rowcount == 0:
+            db.session.execute(table.insert().values(**row))
+    return path, created
+
+def release_attachment_blob(sha256):
+    """إنقاص عدد مراجع المحتوى وإرجاع مساره إذا لم يعد مستخدماً (يُحذف بعد الـ commit)"""
+    blob = db.session.execute(
+        db.select(AttachmentBlob).filter_by(sha256=sha256).with_for_update()
+    ).scalar()
+    if blob is None:
+        return None
+    blob.ref_count -= 1
+    if blob.ref_count > 0:
+        return None
+    db.session.delete(blob)
+    return blob.file_path
+
+def find_attachment(complaint_id, attachment_id, staff_roles=('admin', 'deputy')):
+    """المرفق إذا كانت الشكوى ملكاً للمستخدم الحالي أو كان دوره ضمن staff_roles"""
+    query = db.select(ComplaintAttachment).join(Complaint).where(
+        Complaint.complaint_id == complaint_id,
+        ComplaintAttachment.id == attachment_id
+    )
+    if get_jwt().get('role') not in staff_roles:
+        query = query.where(Complaint.citizen_id == get_jwt_identity())
+    return db.session.execute(query).scalar()
+
+def private_file_response(response):
+    """مرفقات المواطنين لا تُخزن في الوسطاء المشتركين، والمتصفح يعيد التحقق عبر ETag"""
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/complaints/<complaint_id>/attachments/<int:attachment_id>', methods=['GET'])
+@jwt_required()
+def download_attachment(complaint_id, attachment_id):
+    """تنزيل مرفق عبر send_file (sendfile دون نسخ) مع دعم Range وETag"""
+    attachment = find_attachment(complaint_id, attachment_id)
+    if not attachment or not os.path.exists(attachment.file_path):
+        return jsonify({'error': 'المرفق غير موجود'}), 404
+    
+    # ?variant=thumbnail|web للعرض في القوائم، مع الرجوع للأصل إذا لم تُولد بعد
+    variant = request.args.get('variant')
+    if variant not in (None, 'thumbnail', 'web'):
+        return jsonify({'error': 'نسخة غير معروفة'}), 400
+    variant_path = getattr(attachment, f'{variant}_path') if variant else None
+    if variant_path and os.path.exists(variant_path):
+        return private_file_response(send_file(
+            os.path.abspath(variant_path),
+            mimetype='image/jpeg',
+            conditional=True,
+            etag=f'{attachment.sha256}-{variant}'
+        ))
+    
+    mimetype = mimetypes.guess_type(attachment.original_filename)[0] or 'application/octet-stream'
+    return private_file_response(send_file(
+        os.path.abspath(attachment.file_path),
+        mimetype=mimetype,
+        as_attachment=variant is None,
+        download_name=attachment.original_filename,
+        conditional=True,
+        etag=attachment.sha256 or True
+    ))
+
+@app.route('/api/complaints/<complaint_id>/attachments/<int:attachment_id>', methods=['DELETE'])
+@jwt_required()
+def delete_attachment(complaint_id, attachment_id):
+    """حذف مرفق وتحرير محتواه عند انتهاء مراجعه (صاحب الشكوى أو المسؤول فقط)"""
+    try:
+        attachment = find_attachment(complaint_id, attachment_id, staff_roles=('admin',))
+        if not attachment:
+            return jsonify({'error': 'المرفق غير موجود'}), 404
+        
+        complaint_pk = attachment.complaint_id
+        orphan_path = release_attachment_blob(attachment.sha256) if attachment.sha256 else attachment.file_path
+        db.session.delete(attachment)
+        db.session.flush()
+        record_attachment_removed(complaint_pk)
+        db.session.commit()
+        invalidate_stats_cache()
+        
+        if orphan_path:
+            remove_blob(orphan_path)
+        
+        return jsonify({'message': 'تم حذف المرفق'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"خطأ في حذف المرفق: {str(e)}")
+        return jsonify({'error': 'حدث خطأ في حذف المرفق'}), 500
+
 @app.route('/api/complaints/<complaint_id>/rate', methods=['POST'])
 @jwt_required()
 def rate_complaint_resolution(complaint_id):
@@ -678,6 +2415,7 @@ def rate_complaint_resolution(complaint_id):
             return jsonify({'error': 'لا يمكن تقييم شكوى لم يتم حلها بعد'}), 400
         
         # تحديث التقييم
+        record_rating(complaint.citizen_rating)
         complaint.citizen_rating = rating
         complaint.citizen_feedback = feedback if feedback else None
         complaint.updated_at = datetime.utcnow()
@@ -694,6 +2432,7 @@ def rate_complaint_resolution(complaint_id):
         
         db.session.add(update)
         db.session.commit()
+        invalidate_stats_cache()
         
         logger.info(f"تم تقييم الشكوى {complaint_id} بـ {rating} نجوم")
         
@@ -707,46 +2446,501 @@ def rate_complaint_resolution(complaint_id):
         logger.error(f"خطأ في تقييم الشكوى: {str(e)}")
         return jsonify({'error': 'حدث خطأ في تقييم الشكوى'}), 500
 
-@app.route('/api/stats', methods=['GET'])
-def get_stats():
-    """إحصائيات الخدمة"""
+EXPORT_COLUMNS = [
+    'id', 'complaint_id', 'citizen_id', 'citizen_name', 'citizen_email', 'citizen_phone',
+    'title', 'description', 'complaint_type_id', 'governorate_id', 'city', 'district',
+    'detailed_location', 'status', 'priority', 'assigned_to', 'citizen_rating',
+    'submitted_at', 'reviewed_at', 'resolved_at', 'closed_at', 'updated_at'
+]
+EXPORT_BATCH_SIZE = 500
+
+def export_rows(args):
+    """مولد لصفوف التصدير من مؤشر خادم (stream_results) بذاكرة ثابتة"""
+    query = db.select(*[getattr(Complaint, column) for column in EXPORT_COLUMNS])
+    query, _ = apply_complaint_filters(query, args)
+    citizen_id = args.get('citizen_id', type=int)
+    if citizen_id:
+        query = query.filter(Complaint.citizen_id == citizen_id)
+    query = query.order_by(Complaint.id)
+    
+    result = db.session.execute(query, execution_options={'stream_results': True, 'yield_per': EXPORT_BATCH_SIZE})
+    for row in result:
+        record = dict(zip(EXPORT_COLUMNS, row))
+        complaint_type = reference_registry.complaint_type(record['complaint_type_id'])
+        governorate = reference_registry.governorate(record['governorate_id'])
+        record['complaint_type'] = complaint_type['name'] if complaint_type else None
+        record['governorate'] = governorate['name'] if governorate else None
+        for column in ('submitted_at', 'reviewed_at', 'resolved_at', 'closed_at', 'updated_at'):
+            record[column] = record[column].isoformat() if record[column] else None
+        yield record
+
+def export_ndjson(rows):
+    for record in rows:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+def export_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS + ['complaint_type', 'governorate'])
+    # BOM لفتح العربية بشكل صحيح في Excel، والعناوين تُرسل فوراً قبل تنفيذ الاستعلام
+    buffer.write('\ufeff')
+    writer.writeheader()
+    yield buffer.getvalue()
+    
+    buffer.seek(0)
+    buffer.truncate()
+    for count, record in enumerate(rows, 1):
+        writer.writerow(record)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@app.route('/api/admin/complaints/export', methods=['GET'])
+@role_required('admin')
+def export_complaints():
+    """تصدير الشكاوى كتدفق NDJSON أو CSV (نفس معاملات التصفية في قائمة الشكاوى)"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'صيغة التصدير يجب أن تكون ndjson أو csv'}), 400
+    
+    args = request.args.copy()
+    if export_format == 'csv':
+        body, mimetype = export_csv(export_rows(args)), 'text/csv'
+    else:
+        body, mimetype = export_ndjson(export_rows(args)), 'application/x-ndjson'
+    
+    filename = f"complaints-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    response = app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    logger.info(f"بدء تصدير الشكاوى بصيغة {export_format}")
+    return response
+
+@app.route('/api/admin/complaints/<complaint_id>/duplicates', methods=['GET'])
+@role_required('admin', 'deputy')
+def get_complaint_duplicates(complaint_id):
+    """عنقود المكررات الذي تنتمي إليه الشكوى: الشكوى الأولى ثم المكررات بترتيب تقديمها"""
+    duplicate_of = db.session.execute(
+        db.select(Complaint.duplicate_of).where(Complaint.complaint_id == complaint_id)
+    ).first()
+    if duplicate_of is None:
+        return jsonify({'error': 'الشكوى غير موجودة'}), 404
+
+    cluster = duplicate_of[0] or complaint_id
+    rows = db.session.execute(
+        db.select(Complaint.complaint_id, Complaint.title, Complaint.status, Complaint.governorate_id,
+                  Complaint.duplicate_score, Complaint.submitted_at)
+        .where(db.or_(Complaint.complaint_id == cluster, Complaint.duplicate_of == cluster))
+        .order_by(Complaint.submitted_at, Complaint.id)
+    ).mappings().all()
+    return json_bytes_response({
+        'cluster': cluster,
+        'count': len(rows),
+        'complaints': [dict(row) for row in rows]
+    })
+
+# Deputy routes - إدارة جدول التوزيع الآلي
+@app.route('/api/admin/deputy-routes', methods=['GET'])
+@role_required('admin')
+def get_deputy_routes():
+    """مسارات النواب النشطة مع الحمل الحالي لكل نائب"""
+    routes = DeputyRoute.query.filter_by(is_active=True).order_by(DeputyRoute.deputy_id, DeputyRoute.id).all()
+    return jsonify({
+        'enabled': assignment_engine.enabled,
+        'routes': [
+            dict(route.to_dict(), open_complaints=assignment_engine.load_of(route.deputy_id))
+            for route in routes
+        ]
+    }), 200
+
+@app.route('/api/admin/deputy-routes', methods=['POST'])
+@role_required('admin')
+def create_deputy_route():
+    """إضافة اختصاص لنائب: محافظة و/أو نوع شكوى"""
     try:
-        stats = {
-            'total_complaints': Complaint.query.count(),
-            'submitted': Complaint.query.filter_by(status='submitted').count(),
-            'under_review': Complaint.query.filter_by(status='under_review').count(),
-            'in_progress': Complaint.query.filter_by(status='in_progress').count(),
-            'resolved': Complaint.query.filter_by(status='resolved').count(),
-            'closed': Complaint.query.filter_by(status='closed').count(),
-            'rejected': Complaint.query.filter_by(status='rejected').count(),
-            'high_priority': Complaint.query.filter_by(priority='high').count(),
-            'urgent_priority': Complaint.query.filter_by(priority='urgent').count(),
-            'with_attachments': Complaint.query.join(ComplaintAttachment).count(),
-            'rated_complaints': Complaint.query.filter(Complaint.citizen_rating.isnot(None)).count()
-        }
+        data = request.get_json() or {}
+        deputy_id = data.get('deputy_id')
+        governorate_id = data.get('governorate_id')
+        complaint_type_id = data.get('complaint_type_id')
         
-        # إحصائيات حسب النوع
-        type_stats = db.session.query(
-            ComplaintType.name,
-            db.func.count(Complaint.id).label('count')
-        ).join(Complaint).group_by(ComplaintType.name).all()
+        deputy_name = data.get('deputy_name')
         
-        stats['by_type'] = [{'type': name, 'count': count} for name, count in type_stats]
+        # bool فرع من int في بايثون فيُستبعد صراحةً، والمعرفات تُخزن كما في السجل المرجعي
+        if not is_integer_id(deputy_id):
+            return jsonify({'error': 'deputy_id مطلوب'}), 400
+        if governorate_id is None and complaint_type_id is None:
+            return jsonify({'error': 'يجب تحديد المحافظة أو نوع الشكوى'}), 400
+        governorate = reference_registry.governorate(governorate_id) if is_integer_id(governorate_id) else None
+        if governorate_id is not None and not governorate:
+            return jsonify({'error': 'المحافظة غير صحيحة'}), 400
+        complaint_type = reference_registry.complaint_type(complaint_type_id) if is_integer_id(complaint_type_id) else None
+        if complaint_type_id is not None and not complaint_type:
+            return jsonify({'error': 'نوع الشكوى غير صحيح'}), 400
+        if deputy_name is not None and not isinstance(deputy_name, str):
+            return jsonify({'error': 'deputy_name يجب أن يكون نصاً'}), 400
         
-        # إحصائيات حسب المحافظة
-        gov_stats = db.session.query(
-            Governorate.name,
-            db.func.count(Complaint.id).label('count')
-        ).join(Complaint).group_by(Governorate.name).all()
+        route = DeputyRoute(
+            deputy_id=deputy_id,
+            deputy_name=(deputy_name or '').strip() or None,
+            governorate_id=governorate['id'] if governorate else None,
+            complaint_type_id=complaint_type['id'] if complaint_type else None
+        )
+        db.session.add(route)
+        db.session.commit()
+        return jsonify({'route': route.to_dict()}), 201
         
-        stats['by_governorate'] = [{'governorate': name, 'count': count} for name, count in gov_stats]
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"خطأ في إضافة مسار النائب: {str(e)}")
+        return jsonify({'error': 'حدث خطأ في إضافة مسار النائب'}), 500
+
+@app.route('/api/admin/deputy-routes/<int:route_id>', methods=['DELETE'])
+@role_required('admin')
+def delete_deputy_route(route_id):
+    """إيقاف مسار نائب (الشكاوى المكلفة سابقاً تبقى كما هي)"""
+    route = db.session.get(DeputyRoute, route_id)
+    if not route or not route.is_active:
+        return jsonify({'error': 'المسار غير موجود'}), 404
+    route.is_active = False
+    db.session.commit()
+    return jsonify({'message': 'تم إيقاف المسار'}), 200
+
+# Work queue - توزيع الشكاوى على المراجعين دون تعارض أو تكليف مزدوج
+# قائمة الانتظار للشكاوى غير المكلفة فقط: الشكوى الموزعة آلياً عند التقديم تخص النائب
+# المختص ولا تظهر هنا، إلا إذا أعادها النائب أو المسؤول عبر release فتدخل القائمة
+QUEUE_STATUSES = ('submitted', 'under_review')
+QUEUE_PRIORITIES = ('urgent', 'high', 'medium', 'low')
+
+def queue_filter():
+    return db.and_(Complaint.assigned_to.is_(None), Complaint.status.in_(QUEUE_STATUSES))
+
+def claim_next_complaint(reviewer_id, now):
+    """تكليف المراجع بأقدم شكوى غير مكلفة بأعلى أولوية - يعيد صف RETURNING أو None
+    
+    جملة UPDATE واحدة لكل أولوية: على PostgreSQL يقفل الاستعلام الفرعي الصف بـ
+    FOR UPDATE SKIP LOCKED فيتخطى المراجعون المتزامنون الصفوف المحجوزة دون انتظار،
+    وعلى SQLite تُنفذ الجملة كاملة تحت قفل الكتابة فلا يمكن أن يحجز طلبان نفس الصف.
+    """
+    for priority in QUEUE_PRIORITIES:
+        candidate = (
+            db.select(Complaint.id)
+            .where(queue_filter(), Complaint.priority == priority)
+            .order_by(Complaint.submitted_at, Complaint.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        claimed = db.session.execute(
+            db.update(Complaint)
+            .where(Complaint.id == candidate, queue_filter())
+            .values(
+                assigned_to=reviewer_id,
+                reviewed_at=db.func.coalesce(Complaint.reviewed_at, now),
+                updated_at=now
+            )
+            .returning(Complaint.id, Complaint.status, Complaint.priority, Complaint.complaint_id,
+                       Complaint.citizen_email, Complaint.citizen_phone)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if claimed:
+            return claimed
+    return None
+
+def reviewer_identity():
+    """معرف المراجع واسمه ودوره من JWT"""
+    claims = get_jwt()
+    role = claims.get('role')
+    return int(get_jwt_identity()), claims.get('name') or role, role
+
+@app.route('/api/admin/queue', methods=['GET'])
+@role_required('admin', 'deputy')
+def get_queue_summary():
+    """عدد الشكاوى المنتظرة لكل أولوية وأقدم شكوى منتظرة"""
+    rows = db.session.execute(
+        db.select(Complaint.priority, db.func.count(), db.func.min(Complaint.submitted_at))
+        .where(queue_filter())
+        .group_by(Complaint.priority)
+    ).all()
+    by_priority = {priority: 0 for priority in QUEUE_PRIORITIES}
+    oldest = None
+    for priority, count, submitted_at in rows:
+        by_priority[priority] = count
+        oldest = submitted_at if oldest is None else min(oldest, submitted_at)
+    return jsonify({
+        'waiting': sum(by_priority.values()),
+        'by_priority': by_priority,
+        'oldest_submitted_at': oldest.isoformat() if oldest else None
+    }), 200
+
+@app.route('/api/admin/sla', methods=['GET'])
+@role_required('admin', 'deputy')
+def get_sla_summary():
+    """الشكاوى المتأخرة والقريبة من موعدها (النائب يرى الشكاوى المكلف بها فقط)"""
+    now = datetime.utcnow()
+    warning_end = now + timedelta(hours=app.config['SLA_WARNING_HOURS'])
+    actor_id, _, role = reviewer_identity()
+    scope = [sla_filter()] + ([Complaint.assigned_to == actor_id] if role == 'deputy' else [])
+
+    overdue_count, due_soon_count = db.session.execute(db.select(
+        db.select(db.func.count()).where(*scope, Complaint.due_at < now).scalar_subquery(),
+        db.select(db.func.count()).where(*scope, Complaint.due_at >= now, Complaint.due_at < warning_end).scalar_subquery()
+    )).one()
+    overdue = db.session.execute(
+        db.select(Complaint.complaint_id, Complaint.title, Complaint.status, Complaint.priority,
+                  Complaint.assigned_to, Complaint.due_at, Complaint.escalated_at)
+        .where(*scope, Complaint.due_at < now)
+        .order_by(Complaint.due_at, Complaint.id)
+        .limit(OVERDUE_LIST_LIMIT)
+    ).mappings().all()
+    return json_bytes_response({
+        'overdue_count': overdue_count,
+        'due_soon_count': due_soon_count,
+        'warning_hours': app.config['SLA_WARNING_HOURS'],
+        'overdue': [dict(row) for row in overdue]
+    })
+
+@app.route('/api/admin/queue/claim', methods=['POST'])
+@role_required('admin', 'deputy')
+def claim_from_queue():
+    """سحب الشكوى التالية من قائمة الانتظار وتكليف المراجع الحالي بها"""
+    try:
+        reviewer_id, reviewer_name, role = reviewer_identity()
+        now = datetime.utcnow()
+        claimed = claim_next_complaint(reviewer_id, now)
+        if claimed is None:
+            db.session.rollback()
+            return '', 204
         
-        return jsonify(stats), 200
+        complaint_pk, status, priority, complaint_id, email, phone = claimed
+        if status == 'submitted':
+            db.session.execute(
+                db.update(Complaint).where(Complaint.id == complaint_pk).values(status='under_review')
+                .execution_options(synchronize_session=False)
+            )
+            record_status_change(status, 'under_review')
+        db.session.add(ComplaintUpdate(
+            complaint_id=complaint_pk,
+            update_type='assignment',
+            old_status=status,
+            new_status='under_review',
+            message='تم تكليف مراجع بالشكوى',
+            updated_by=reviewer_id,
+            updated_by_name=reviewer_name,
+            updated_by_role=role,
+            created_at=now
+        ))
+        enqueue_notifications([
+            (complaint_pk, complaint_id, email, phone, 'assigned', SYSTEM_MESSAGES['complaint_assigned'])
+        ], now)
+        db.session.commit()
+        invalidate_stats_cache()
+        assignment_engine.adjust(reviewer_id, 1)
+        
+        complaint = db.session.get(Complaint, complaint_pk, options=DETAIL_LOAD_OPTIONS)
+        logger.info(f"تم تكليف المراجع {reviewer_id} بالشكوى {complaint.complaint_id} ({priority})")
+        updates, _ = complaint_updates_page(complaint_pk)
+        return jsonify({'complaint': complaint.to_dict(include_details=True, updates=updates)}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"خطأ في سحب شكوى من قائمة الانتظار: {str(e)}")
+        return jsonify({'error': 'حدث خطأ في سحب الشكوى'}), 500
+
+@app.route('/api/admin/queue/<complaint_id>/release', methods=['POST'])
+@role_required('admin', 'deputy')
+def release_to_queue(complaint_id):
+    """إعادة شكوى مكلفة إلى قائمة الانتظار (المراجع المكلف أو المسؤول فقط)"""
+    try:
+        reviewer_id, reviewer_name, role = reviewer_identity()
+        previous = db.session.execute(
+            db.select(Complaint.assigned_to).filter_by(complaint_id=complaint_id)
+        ).scalar()
+        if previous is None or (role != 'admin' and previous != reviewer_id):
+            return jsonify({'error': 'الشكوى غير موجودة أو غير مكلفة لك'}), 404
+        
+        # الشرط على المكلف السابق يمنع إلغاء تكليف تغير بين القراءة والتحديث
+        query = db.update(Complaint).where(
+            Complaint.complaint_id == complaint_id,
+            Complaint.assigned_to == previous,
+            Complaint.status.in_(QUEUE_STATUSES)
+        )
+        released = db.session.execute(
+            query.values(assigned_to=None, updated_at=datetime.utcnow())
+            .returning(Complaint.id, Complaint.status)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if not released:
+            db.session.rollback()
+            return jsonify({'error': 'الشكوى غير موجودة أو غير مكلفة لك'}), 404
+        
+        db.session.add(ComplaintUpdate(
+            complaint_id=released.id,
+            update_type='assignment',
+            old_status=released.status,
+            new_status=released.status,
+            message='أعيدت الشكوى إلى قائمة الانتظار',
+            updated_by=reviewer_id,
+            updated_by_name=reviewer_name,
+            updated_by_role=role
+        ))
+        db.session.commit()
+        assignment_engine.adjust(previous, -1)
+        return jsonify({'message': 'أعيدت الشكوى إلى قائمة الانتظار'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"خطأ في إعادة الشكوى إلى قائمة الانتظار: {str(e)}")
+        return jsonify({'error': 'حدث خطأ في إعادة الشكوى'}), 500
+
+# Status transitions - نقل دفعات من الشكاوى بجمل UPDATE/INSERT على مستوى المجموعة
+MAX_BULK_TRANSITIONS = 500
+STATUS_MESSAGES = {
+    'in_progress': SYSTEM_MESSAGES['complaint_in_progress'],
+    'resolved': SYSTEM_MESSAGES['complaint_resolved'],
+    'rejected': SYSTEM_MESSAGES['complaint_rejected'],
+}
+
+def transition_complaints(complaint_ids, new_status, actor_id, actor_name, actor_role, message=None, assigned_to=None):
+    """نقل الشكاوى المسموح لها إلى الحالة الجديدة - يعيد [(id, complaint_id, old_status, assigned_to)]
+    
+    جملة UPDATE واحدة لكل حالة مصدر مسموحة (6 جمل على الأكثر مهما كان حجم الدفعة)،
+    فالحالة القديمة معروفة من شرط WHERE ولا حاجة لقراءة الصفوف أو قفلها مسبقاً.
+    """
+    now = datetime.utcnow()
+    values = {
+        'status': new_status,
+        'updated_at': now,
+        'reviewed_at': db.func.coalesce(Complaint.reviewed_at, now),
+    }
+    if new_status in STATUS_TIMESTAMPS:
+        values[STATUS_TIMESTAMPS[new_status]] = now
+    
+    moved, contacts = [], []
+    for old_status in sources_for(new_status):
+        query = db.update(Complaint).where(Complaint.complaint_id.in_(complaint_ids), Complaint.status == old_status)
+        if assigned_to is not None:
+            query = query.where(Complaint.assigned_to == assigned_to)
+        rows = db.session.execute(
+            query.values(**values)
+            .returning(Complaint.id, Complaint.complaint_id, Complaint.assigned_to,
+                       Complaint.citizen_email, Complaint.citizen_phone)
+            .execution_options(synchronize_session=False)
+        ).all()
+        moved += [(pk, complaint_id, old_status, deputy_id) for pk, complaint_id, deputy_id, _, _ in rows]
+        contacts += [(pk, complaint_id, email, phone) for pk, complaint_id, _, email, phone in rows]
+    
+    if moved:
+        message = message or STATUS_MESSAGES.get(new_status) or 'تم تحديث حالة الشكوى'
+        db.session.execute(db.insert(ComplaintUpdate), [
+            dict(
+                complaint_id=pk,
+                update_type='resolution' if new_status == 'resolved' else 'status_change',
+                old_status=old_status,
+                new_status=new_status,
+                message=message,
+                updated_by=actor_id,
+                updated_by_name=actor_name,
+                updated_by_role=actor_role,
+                created_at=now
+            )
+            for pk, _, old_status, _ in moved
+        ])
+        event = 'resolution' if new_status == 'resolved' else 'status_change'
+        enqueue_notifications([
+            (pk, complaint_id, email, phone, event, message) for pk, complaint_id, email, phone in contacts
+        ], now)
+        deltas = {}
+        for _, _, old_status, _ in moved:
+            deltas[('status', old_status)] = deltas.get(('status', old_status), 0) - 1
+        deltas[('status', new_status)] = len(moved)
+        apply_stats_deltas(deltas)
+    return moved
+
+@app.route('/api/admin/complaints/transition', methods=['POST'])
+@role_required('admin', 'deputy')
+def transition_complaints_bulk():
+    """نقل دفعة من الشكاوى إلى حالة جديدة (النائب يقتصر على الشكاوى المكلف بها)"""
+    try:
+        data = request.get_json() or {}
+        new_status = data.get('status')
+        complaint_ids = data.get('complaint_ids')
+        
+        if new_status not in STATUSES or new_status == 'submitted':
+            return jsonify({'error': 'الحالة المطلوبة غير صحيحة'}), 400
+        if not isinstance(complaint_ids, list) or not complaint_ids:
+            return jsonify({'error': 'قائمة الشكاوى مطلوبة'}), 400
+        if len(complaint_ids) > MAX_BULK_TRANSITIONS:
+            return jsonify({'error': f'الحد الأقصى للدفعة {MAX_BULK_TRANSITIONS} شكوى'}), 400
+        complaint_ids = list(dict.fromkeys(str(complaint_id) for complaint_id in complaint_ids))
+        
+        actor_id, actor_name, role = reviewer_identity()
+        moved = transition_complaints(
+            complaint_ids, new_status, actor_id, actor_name, role,
+            message=(data.get('message') or '').strip() or None,
+            assigned_to=actor_id if role == 'deputy' else None
+        )
+        db.session.commit()
+        if moved:
+            invalidate_stats_cache()
+        # حمل النواب: الإغلاق يحرر مكاناً وإعادة الفتح تشغله
+        for _, _, old_status, deputy_id in moved:
+            if is_open(old_status) != is_open(new_status):
+                assignment_engine.adjust(deputy_id, 1 if is_open(new_status) else -1)
+        
+        # سبب التخطي لما لم يُنقل: غير موجودة أو انتقال غير مسموح من حالتها الحالية
+        updated = {complaint_id for _, complaint_id, _, _ in moved}
+        remaining = [complaint_id for complaint_id in complaint_ids if complaint_id not in updated]
+        skipped = []
+        if remaining:
+            current = dict(db.session.execute(
+                db.select(Complaint.complaint_id, Complaint.status).where(Complaint.complaint_id.in_(remaining))
+            ).all())
+            skipped = [
+                {'complaint_id': complaint_id, 'status': current.get(complaint_id),
+                 'error': 'انتقال غير مسموح' if complaint_id in current else 'الشكوى غير موجودة'}
+                for complaint_id in remaining
+            ]
+        
+        logger.info(f"تم نقل {len(moved)} شكوى إلى الحالة {new_status}")
+        return jsonify({
+            'status': new_status,
+            'updated': [complaint_id for _, complaint_id, _, _ in moved],
+            'skipped': skipped
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"خطأ في نقل حالة الشكاوى: {str(e)}")
+        return jsonify({'error': 'حدث خطأ في تحديث حالة الشكاوى'}), 500
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """إحصائيات الخدمة"""
+    try:
+        cached = stats_cache.get(STATS_CACHE_KEY)
+        if cached is None:
+            cached = app.json.dumps(read_stats_counters()).encode('utf-8')
+            stats_cache.set(STATS_CACHE_KEY, cached)
+            cache_status = 'MISS'
+        else:
+            cache_status = 'HIT'
+        
+        response = app.response_class(cached, status=200, mimetype='application/json')
+        response.headers['X-Cache'] = cache_status
+        return response
         
     except Exception as e:
         logger.error(f"خطأ في الحصول على الإحصائيات: {str(e)}")
         return jsonify({'error': 'حدث خطأ في الحصول على الإحصائيات'}), 500
 
+@app.route('/api/stats/cache', methods=['GET'])
+@role_required('admin')
+def get_stats_cache_info():
+    """عدادات أداء ذاكرة الإحصائيات المؤقتة"""
+    return jsonify(stats_cache.stats()), 200
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -763,6 +2957,10 @@ def bad_request(error):
 if __name__ == '__main__':
     # إنشاء قاعدة البيانات
     init_database()
+    if app.config['SLA_SCHEDULER_ENABLED']:
+        sla_scheduler.start()
+    if app.config['NOTIFICATION_WORKER_ENABLED']:
+        notification_worker.start()
     
     logger.info("=" * 50)
     logger.info("🚀 بدء تشغيل خدمة الشكاوى المبسطة v2.0")
@@ -0,0 +1,92 @@
+"""
+Shared fixtures for the Flask complaints service tests
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Fresh in-memory database seeded with reference data"""
+    monkeypatch.chdir(tmp_path)
+    import complaints_service
+
+    complaints_service.app.config['TESTING'] = True
+    # Most tests submit more than one day's quota for the same identity
+    monkeypatch.setitem(complaints_service.app.config, 'SUBMISSION_QUOTA_ENABLED', False)
+    complaints_service.submission_quota.reset()
+    with complaints_service.app.app_context():
+        complaints_service.db.drop_all()
+        with complaints_service.db.engine.begin() as connection:
+            connection.execute(complaints_service.db.text('DROP TABLE IF EXISTS complaints_fts'))
+    complaints_service.init_database()
+    complaints_service.stats_cache.invalidate()
+    complaints_service.stats_cache.hits = complaints_service.stats_cache.misses = 0
+    with complaints_service.app.app_context():
+        yield complaints_service
+        complaints_service.db.session.remove()
+
+
+@pytest.fixture
+def client(service):
+    return service.app.test_client()
+
+
+@pytest.fixture
+def auth_headers(service):
+    """JWT headers for a citizen identity"""
+    from flask_jwt_extended import create_access_token
+
+    def _headers(identity='1', role=None):
+        claims = {'role': role} if role else None
+        token = create_access_token(identity=identity, additional_claims=claims)
+        return {'Authorization': f'Bearer {token}'}
+
+    return _headers
+
+
+@pytest.fixture
+def make_complaint(client, auth_headers):
+    """Submit a complaint through the public API and return its payload"""
+    def _make(identity='1', **overrides):
+        payload = {
+            'title': 'حفرة في الطريق الرئيسي',
+            'description': 'يوجد حفرة كبيرة في منتصف الطريق تسبب حوادث',
+            'complaint_type_id': 1,
+            'governorate_id': 1,
+            'citizen_name': 'مواطن',
+            'citizen_email': 'citizen@example.com',
+        }
+        payload.update(overrides)
+        response = client.post('/api/complaints', json=payload, headers=auth_headers(identity))
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['complaint']
+
+    return _make
+
+
+@pytest.fixture
+def count_queries(service):
+    """Context manager collecting the SQL statements executed inside it"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _count():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = service.db.engine
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+
+    return _count
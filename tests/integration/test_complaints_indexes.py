@@ -0,0 +1,89 @@
+"""
+EXPLAIN-based tests proving the planner uses the complaint indexes
+
+SQLite runs always; PostgreSQL runs when TEST_POSTGRES_URL is set.
+"""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+
+LIST_QUERY = (
+    "SELECT id FROM complaints WHERE citizen_id = 7 "
+    "ORDER BY submitted_at DESC, id DESC LIMIT 20"
+)
+PLAN_QUERIES = {
+    'ix_complaints_citizen_submitted': LIST_QUERY,
+    'ix_complaints_status': "SELECT count(*) FROM complaints WHERE status = 'resolved'",
+    'ix_complaints_governorate_status': (
+        "SELECT count(*) FROM complaints WHERE governorate_id = 3 AND status = 'submitted'"
+    ),
+    'ix_complaints_complaint_type': "SELECT id FROM complaints WHERE complaint_type_id = 2",
+    'ix_complaint_updates_complaint': "SELECT id FROM complaint_updates WHERE complaint_id = 5",
+    'ix_complaints_queue': (
+        "SELECT id FROM complaints WHERE assigned_to IS NULL AND status IN ('submitted', 'under_review') "
+        "AND priority = 'urgent' ORDER BY submitted_at, id LIMIT 1"
+    ),
+    'ix_complaints_duplicate_of': "SELECT id FROM complaints WHERE duplicate_of = 'abc'",
+    'ix_complaints_status_due': (
+        "SELECT count(*) FROM complaints WHERE status IN ('submitted', 'under_review', 'in_progress') "
+        "AND due_at < '2024-06-01 00:00:00'"
+    ),
+}
+
+
+def _sqlite_plan(connection, sql):
+    rows = connection.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    return ' '.join(row[-1] for row in rows)
+
+
+def _postgres_plan(connection, sql):
+    connection.execute(text('SET enable_seqscan = off'))
+    rows = connection.execute(text(f'EXPLAIN {sql}')).all()
+    return ' '.join(row[0] for row in rows)
+
+
+@pytest.mark.integration
+@pytest.mark.database
+class TestIndexUsage:
+    """Each hot query must be answered through its index"""
+
+    @pytest.mark.parametrize('index_name', sorted(PLAN_QUERIES))
+    def test_sqlite_plan_uses_index(self, service, index_name):
+        with service.db.engine.connect() as connection:
+            plan = _sqlite_plan(connection, PLAN_QUERIES[index_name])
+
+        assert index_name in plan
+
+    def test_list_query_avoids_sort(self, service):
+        with service.db.engine.connect() as connection:
+            plan = _sqlite_plan(connection, LIST_QUERY)
+
+        assert 'TEMP B-TREE' not in plan
+
+    def test_migration_adds_missing_indexes(self, service):
+        with service.db.engine.begin() as connection:
+            connection.execute(text('DROP INDEX ix_complaints_status'))
+
+        assert service.apply_index_migrations() == ['ix_complaints_status']
+        assert service.apply_index_migrations() == []
+
+    @pytest.mark.external
+    @pytest.mark.skipif(not os.environ.get('TEST_POSTGRES_URL'), reason='TEST_POSTGRES_URL not set')
+    @pytest.mark.parametrize('index_name', sorted(PLAN_QUERIES))
+    def test_postgres_plan_uses_index(self, service, index_name):
+        engine = create_engine(os.environ['TEST_POSTGRES_URL'])
+        tables = [service.Governorate.__table__, service.ComplaintType.__table__,
+                  service.Complaint.__table__, service.ComplaintUpdate.__table__,
+                  service.ComplaintAttachment.__table__]
+        service.db.metadata.create_all(engine, tables=tables)
+        try:
+            with engine.connect() as connection:
+                plan = _postgres_plan(connection, PLAN_QUERIES[index_name])
+        finally:
+            service.db.metadata.drop_all(engine, tables=tables)
+            engine.dispose()
+
+        assert index_name in plan
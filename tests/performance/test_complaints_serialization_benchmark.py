@@ -0,0 +1,49 @@
+"""
+Micro-benchmark: ORM to_dict + jsonify versus row tuples + RowSerializer
+
+Run directly for numbers: python -m pytest tests/performance -m performance -s
+"""
+
+import time
+
+import pytest
+
+
+PAGE_SIZE = 100
+ROUNDS = 20
+
+
+def _best_of(func):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_row_serializer_faster_than_to_dict(service, auth_headers, client):
+    client.post('/api/complaints/bulk', json={'complaints': [{
+        'title': f'شكوى رقم {index}', 'description': 'وصف الشكوى', 'complaint_type_id': 1 + index % 5,
+        'governorate_id': 1 + index % 20, 'citizen_id': 1, 'citizen_name': 'مواطن', 'citizen_email': 'c@example.com',
+    } for index in range(PAGE_SIZE)]}, headers=auth_headers('1', role='admin'))
+    columns = [getattr(service.Complaint, column) for column in service.LIST_COLUMNS]
+    serializer = service.RowSerializer(service.LIST_COLUMNS, service.LIST_FIELDS, service.LIST_EMBEDS)
+
+    def orm_path():
+        service.db.session.expunge_all()
+        complaints = service.Complaint.query.limit(PAGE_SIZE).all()
+        service.jsonify({'complaints': [c.to_dict(include_details=False) for c in complaints]}).get_data()
+
+    def row_path():
+        rows = service.db.session.execute(service.db.select(*columns).limit(PAGE_SIZE)).all()
+        service.dumps({'complaints': serializer.rows(rows)})
+
+    with service.app.test_request_context():
+        orm_time, row_time = _best_of(orm_path), _best_of(row_path)
+
+    print(f'\nto_dict+jsonify: {orm_time * 1000:.2f}ms  rows+serializer: {row_time * 1000:.2f}ms  '
+          f'speedup: {orm_time / row_time:.1f}x')
+    assert row_time < orm_time
@@ -0,0 +1,114 @@
+"""
+Unit tests for the auto-assignment engine
+"""
+
+import pytest
+
+from complaints.assignment import AssignmentEngine, build_routing_table
+
+SETTINGS = {'auto_assign_enabled': True, 'auto_assign_by_location': True, 'auto_assign_by_type': True}
+ROUTES = [
+    (10, 1, 1),     # governorate 1, type 1
+    (11, 1, None),  # governorate 1, any type
+    (12, None, 2),  # type 2, any governorate
+]
+
+
+@pytest.mark.unit
+class TestRoutingTable:
+    """Test routing table precomputation"""
+
+    def test_most_specific_route_wins(self):
+        table = build_routing_table(ROUTES)
+
+        assert table[(1, 1)] == (10,)
+        assert table[(1, 2)] == (11,)
+        assert table[(1, None)] == (11,)
+        assert table[(None, 2)] == (12,)
+
+    def test_single_dimension(self):
+        assert build_routing_table(ROUTES, by_type=False) == {(1, None): (10, 11)}
+        assert build_routing_table(ROUTES, by_location=False) == {(None, 1): (10,), (None, 2): (12,)}
+
+
+@pytest.mark.unit
+class TestAssignmentEngine:
+    """Test load balancing and settings"""
+
+    def _engine(self, routes, loads, **settings):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return routes, loads
+
+        return AssignmentEngine(loader, dict(SETTINGS, **settings)), calls
+
+    def test_balances_by_open_load(self):
+        engine, calls = self._engine([(10, 1, None), (11, 1, None)], {10: 2})
+
+        picks = [engine.assign(1, 5) for _ in range(4)]
+
+        assert picks == [11, 11, 10, 11]
+        assert engine.load_of(11) == 3
+        assert len(calls) == 1
+
+    def test_fallbacks_and_disabled(self):
+        engine, _ = self._engine(ROUTES, {})
+        disabled, calls = self._engine(ROUTES, {}, auto_assign_enabled=False)
+
+        assert engine.assign(7, 2) == 12
+        assert engine.assign(7, 3) is None
+        assert disabled.assign(1, 1) is None
+        assert calls == []
+
+
+@pytest.mark.unit
+class TestAutoAssignment:
+    """Test routing of submitted complaints"""
+
+    def _route(self, client, auth_headers, **route):
+        response = client.post('/api/admin/deputy-routes', json=route, headers=auth_headers('1', role='admin'))
+        assert response.status_code == 201
+        return response.get_json()['route']
+
+    def test_submission_is_routed_without_extra_queries(self, service, client, auth_headers, make_complaint, count_queries):
+        with count_queries() as baseline:
+            make_complaint()
+        self._route(client, auth_headers, deputy_id=40, governorate_id=1)
+        self._route(client, auth_headers, deputy_id=41, governorate_id=1)
+        make_complaint()  # reloads the routing table after the route changes
+
+        with count_queries() as routed:
+            created = make_complaint()
+
+        assert created['assigned_to'] in (40, 41)
+        assert len(routed) == len(baseline)
+        assigned = [c.assigned_to for c in service.Complaint.query.filter(service.Complaint.assigned_to.isnot(None))]
+        assert sorted(assigned) == [40, 41]
+        assert created['updates'][0]['message'] == service.SYSTEM_MESSAGES['complaint_assigned']
+
+    def test_closing_frees_capacity(self, service, client, auth_headers, make_complaint):
+        self._route(client, auth_headers, deputy_id=40, complaint_type_id=1)
+        created = make_complaint()
+        assert service.assignment_engine.load_of(40) == 1
+
+        for status in ('under_review', 'rejected'):
+            client.post('/api/admin/complaints/transition', json={
+                'complaint_ids': [created['complaint_id']], 'status': status
+            }, headers=auth_headers('1', role='admin'))
+
+        assert service.assignment_engine.load_of(40) == 0
+        routes = client.get('/api/admin/deputy-routes', headers=auth_headers('1', role='admin')).get_json()
+        assert routes['routes'][0]['open_complaints'] == 0
+
+    def test_route_validation(self, client, auth_headers):
+        headers = auth_headers('1', role='admin')
+
+        assert client.post('/api/admin/deputy-routes', json={'deputy_id': 4}, headers=headers).status_code == 400
+        assert client.post('/api/admin/deputy-routes', json={'deputy_id': 4, 'governorate_id': 999}, headers=headers).status_code == 400
+        for invalid in ({'deputy_id': True, 'governorate_id': 1}, {'deputy_id': 4, 'governorate_id': '1'},
+                        {'deputy_id': 4, 'governorate_id': True}, {'deputy_id': 4, 'complaint_type_id': 1.5},
+                        {'deputy_id': 4, 'governorate_id': 1, 'deputy_name': 7}):
+            assert client.post('/api/admin/deputy-routes', json=invalid, headers=headers).status_code == 400
+        assert client.post('/api/admin/deputy-routes', json={'deputy_id': 4, 'governorate_id': 1}, headers=auth_headers()).status_code == 403
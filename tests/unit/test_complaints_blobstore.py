@@ -0,0 +1,114 @@
+"""
+Unit tests for the content-addressed attachment store and downloads
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from complaints.blobstore import blob_path
+from complaints.uploads import ReceivedFile
+
+PDF = b'%PDF-1.7\n' + bytes(range(256)) * 40
+DIGEST = hashlib.sha256(PDF).hexdigest()
+
+
+def upload(client, auth_headers, complaint_id, data=PDF, filename='تقرير.pdf', identity='1'):
+    headers = dict(auth_headers(identity), **{'X-File-Name': filename, 'Content-Type': 'application/octet-stream'})
+    return client.post(f'/api/complaints/{complaint_id}/attachments', data=data, headers=headers)
+
+
+@pytest.mark.unit
+class TestBlobStore:
+    """Test deduplicated storage and reference counting"""
+
+    def test_blob_path_is_sharded(self):
+        assert blob_path('uploads', DIGEST) == os.path.join('uploads', 'objects', DIGEST[:2], DIGEST[2:4], DIGEST)
+
+    def test_same_content_is_stored_once(self, service, client, auth_headers, make_complaint):
+        first = make_complaint()
+        second = make_complaint(identity='2')
+
+        assert upload(client, auth_headers, first['complaint_id']).status_code == 201
+        assert upload(client, auth_headers, second['complaint_id'], identity='2').status_code == 201
+
+        blob = service.AttachmentBlob.query.one()
+        assert blob.ref_count == 2
+        assert {a.file_path for a in service.ComplaintAttachment.query} == {blob.file_path}
+        root = service.app.config['UPLOAD_FOLDER']
+        stored = [name for _, _, files in os.walk(root) for name in files]
+        assert stored == [DIGEST]
+
+    def test_blob_removed_with_last_reference(self, service, client, auth_headers, make_complaint):
+        first = make_complaint()
+        second = make_complaint()
+        upload(client, auth_headers, first['complaint_id'])
+        upload(client, auth_headers, second['complaint_id'])
+        ids = [a.id for a in service.ComplaintAttachment.query.order_by(service.ComplaintAttachment.id)]
+        path = service.AttachmentBlob.query.one().file_path
+
+        response = client.delete(f"/api/complaints/{first['complaint_id']}/attachments/{ids[0]}", headers=auth_headers())
+        assert response.status_code == 200
+        assert service.AttachmentBlob.query.one().ref_count == 1
+        assert os.path.exists(path)
+
+        client.delete(f"/api/complaints/{second['complaint_id']}/attachments/{ids[1]}", headers=auth_headers())
+        assert service.AttachmentBlob.query.count() == 0
+        assert not os.path.exists(path)
+        assert client.get('/api/stats').get_json()['with_attachments'] == 0
+
+    def test_concurrent_first_uploads_share_one_row(self, service, tmp_path):
+        def received():
+            source = tmp_path / f'{len(os.listdir(tmp_path))}.part'
+            source.write_bytes(PDF)
+            return ReceivedFile(str(source), len(PDF), DIGEST, 'pdf')
+
+        # Neither call reads the row first, so the second INSERT must turn into an increment
+        first = service.acquire_attachment_blob(received(), 'pdf')
+        second = service.acquire_attachment_blob(received(), 'pdf')
+        service.db.session.commit()
+
+        assert (first[1], second[1]) == (True, False)
+        assert first[0] == second[0]
+        assert service.AttachmentBlob.query.one().ref_count == 2
+
+    def test_only_owner_or_admin_can_delete(self, service, client, auth_headers, make_complaint):
+        complaint = make_complaint()
+        attachment = upload(client, auth_headers, complaint['complaint_id']).get_json()['attachment']
+        url = f"/api/complaints/{complaint['complaint_id']}/attachments/{attachment['id']}"
+
+        assert client.delete(url, headers=auth_headers('2')).status_code == 404
+        assert client.delete(url, headers=auth_headers('50', role='deputy')).status_code == 404
+        assert client.delete(url, headers=auth_headers('9', role='admin')).status_code == 200
+
+
+@pytest.mark.unit
+class TestAttachmentDownload:
+    """Test GET /api/complaints/<id>/attachments/<attachment_id>"""
+
+    def test_download_supports_range_and_etag(self, service, client, auth_headers, make_complaint):
+        complaint = make_complaint()
+        attachment = upload(client, auth_headers, complaint['complaint_id']).get_json()['attachment']
+        url = f"/api/complaints/{complaint['complaint_id']}/attachments/{attachment['id']}"
+
+        full = client.get(url, headers=auth_headers())
+        partial = client.get(url, headers=dict(auth_headers(), Range='bytes=10-19'))
+        cached = client.get(url, headers=dict(auth_headers(), **{'If-None-Match': f'"{DIGEST}"'}))
+
+        assert full.status_code == 200
+        assert full.data == PDF
+        assert full.mimetype == 'application/pdf'
+        assert partial.status_code == 206
+        assert partial.data == PDF[10:20]
+        assert cached.status_code == 304
+        assert full.headers['Cache-Control'] in ('private, no-cache', 'no-cache, private')
+        assert 'public' not in cached.headers.get('Cache-Control', '')
+
+    def test_download_of_foreign_complaint_is_404(self, service, client, auth_headers, make_complaint):
+        complaint = make_complaint()
+        attachment = upload(client, auth_headers, complaint['complaint_id']).get_json()['attachment']
+        url = f"/api/complaints/{complaint['complaint_id']}/attachments/{attachment['id']}"
+
+        assert client.get(url, headers=auth_headers('2')).status_code == 404
+        assert client.get(url, headers=auth_headers('2', role='admin')).status_code == 200
@@ -0,0 +1,101 @@
+"""
+Unit tests for bulk complaint submission
+"""
+
+import pytest
+
+
+def _item(**overrides):
+    item = {
+        'title': 'تسرب مياه الصرف',
+        'description': 'تسرب مياه الصرف في الشارع الرئيسي',
+        'complaint_type_id': 2,
+        'governorate_id': 3,
+        'citizen_id': 9,
+        'citizen_name': 'مواطن',
+        'citizen_email': 'citizen@example.com',
+    }
+    item.update(overrides)
+    return item
+
+
+@pytest.mark.unit
+class TestBulkSubmission:
+    """Test POST /api/complaints/bulk"""
+
+    def test_partial_batch(self, service, client, auth_headers):
+        response = client.post('/api/complaints/bulk', json={'complaints': [
+            _item(citizen_id=77),
+            _item(governorate_id=999),
+            _item(title=''),
+            _item(complaint_type_id=6, title='سرقة متكررة'),
+        ]}, headers=auth_headers('5', role='deputy'))
+
+        payload = response.get_json()
+        assert response.status_code == 201
+        assert payload['created'] == 2
+        assert [result['status'] for result in payload['results']] == ['created', 'error', 'error', 'created']
+
+        created = service.Complaint.query.filter_by(complaint_id=payload['results'][0]['complaint_id']).one()
+        assert created.citizen_id == 77
+        assert created.priority == 'high'
+        assert [(u.new_status, u.updated_by, u.updated_by_role) for u in service.ComplaintUpdate.query.filter_by(complaint_id=created.id)] == [('submitted', 5, 'deputy')]
+
+        stats = client.get('/api/stats').get_json()
+        assert stats['total_complaints'] == 2
+        assert stats['urgent_priority'] == 1
+
+        search = client.get('/api/complaints', query_string={'search': 'سرقه'}, headers=auth_headers('9'))
+        assert [item['title'] for item in search.get_json()['complaints']] == ['سرقة متكررة']
+
+    def test_statements_do_not_scale_with_batch(self, client, auth_headers, count_queries):
+        def submit(size):
+            with count_queries() as statements:
+                response = client.post('/api/complaints/bulk', json={
+                    'complaints': [_item() for _ in range(size)]
+                }, headers=auth_headers('5', role='deputy'))
+            assert response.status_code == 201
+            return len(statements)
+
+        assert submit(2) == submit(50)
+
+    def test_rejects_empty_and_oversized_batches(self, client, auth_headers):
+        headers = auth_headers('5', role='deputy')
+        assert client.post('/api/complaints/bulk', json={'complaints': []}, headers=headers).status_code == 400
+        oversized = {'complaints': [_item()] * 501}
+        assert client.post('/api/complaints/bulk', json=oversized, headers=headers).status_code == 400
+
+    def test_citizens_cannot_enter_batches(self, service, client, auth_headers):
+        response = client.post('/api/complaints/bulk', json={'complaints': [_item()]}, headers=auth_headers('5'))
+
+        assert response.status_code == 403
+        assert service.Complaint.query.count() == 0
+
+    def test_caller_role_is_recorded(self, service, client, auth_headers):
+        payload = client.post('/api/complaints/bulk', json={'complaints': [_item()]},
+                              headers=auth_headers('2', role='admin')).get_json()
+
+        created = service.Complaint.query.filter_by(complaint_id=payload['results'][0]['complaint_id']).one()
+        update = service.ComplaintUpdate.query.filter_by(complaint_id=created.id).one()
+        assert (update.updated_by, update.updated_by_role) == (2, 'admin')
+
+    def test_malformed_fields_fail_per_item(self, service, client, auth_headers):
+        response = client.post('/api/complaints/bulk', json={'complaints': [
+            _item(title=123),
+            _item(description=['a', 'b']),
+            _item(city={'name': 'x'}),
+            _item(citizen_id='77'),
+            _item(citizen_id=True),
+            _item(citizen_id=None),
+            _item(complaint_type_id=True),
+            _item(governorate_id=1.5),
+            _item(),
+        ]}, headers=auth_headers('5', role='deputy'))
+
+        payload = response.get_json()
+        assert response.status_code == 201
+        assert [result['status'] for result in payload['results']] == ['error'] * 8 + ['created']
+        assert service.Complaint.query.one().citizen_id == 9
+        assert not service.ComplaintStatsCounter.query.filter(
+            service.ComplaintStatsCounter.bucket.in_(['True', '1.5'])
+        ).count()
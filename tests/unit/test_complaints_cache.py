@@ -0,0 +1,87 @@
+"""
+Unit tests for the stats response cache
+"""
+
+import pytest
+
+from complaints.cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test TTL, size limit and counters of ResponseCache"""
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=10, clock=clock)
+        cache.set('stats', b'{}')
+
+        assert cache.get('stats') == b'{}'
+        clock.now = 11
+        assert cache.get('stats') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(ttl=10, max_entries=2)
+        cache.set('a', b'1')
+        cache.set('b', b'2')
+        cache.get('a')
+        cache.set('c', b'3')
+
+        assert cache.get('b') is None
+        assert cache.get('a') == b'1'
+        assert cache.stats()['evictions'] == 1
+
+    def test_shared_backend_fallback(self):
+        class DictBackend(dict):
+            def set(self, key, value, ttl):
+                self[key] = value
+
+            def delete(self, key):
+                self.pop(key, None)
+
+        backend = DictBackend()
+        writer = ResponseCache(backend=backend)
+        reader = ResponseCache(backend=backend)
+        writer.set('stats', b'{"total": 1}')
+
+        assert reader.get('stats') == b'{"total": 1}'
+        writer.invalidate('stats')
+        assert 'stats' not in backend
+
+
+@pytest.mark.unit
+class TestStatsEndpointCache:
+    """Test /api/stats caching and invalidation"""
+
+    def test_hit_miss_and_invalidation(self, client, auth_headers, make_complaint, count_queries):
+        make_complaint()
+
+        first = client.get('/api/stats')
+        with count_queries() as statements:
+            second = client.get('/api/stats')
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert statements == []
+        assert second.get_json()['total_complaints'] == 1
+
+        make_complaint()
+        third = client.get('/api/stats')
+        assert third.headers['X-Cache'] == 'MISS'
+        assert third.get_json()['total_complaints'] == 2
+
+        assert client.get('/api/stats/cache').status_code == 401
+        assert client.get('/api/stats/cache', headers=auth_headers()).status_code == 403
+        info = client.get('/api/stats/cache', headers=auth_headers('1', role='admin')).get_json()
+        assert info['hits'] == 1
+        assert info['misses'] == 2
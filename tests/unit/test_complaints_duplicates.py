@@ -0,0 +1,149 @@
+"""
+Unit tests for MinHash/LSH near-duplicate detection
+"""
+
+import pytest
+
+from complaints.duplicates import (
+    DuplicateIndex, MinHasher, pack_signature, shingles, similarity, unpack_signature
+)
+from initial_data import SAMPLE_COMPLAINTS
+
+ROAD = SAMPLE_COMPLAINTS[0]
+HOSPITAL = SAMPLE_COMPLAINTS[1]
+
+
+def _text(sample):
+    return f"{sample['title']} {sample['description']}"
+
+
+@pytest.mark.unit
+class TestMinHash:
+    """Test shingling and signatures"""
+
+    def test_shingles_are_normalized(self):
+        assert shingles('الطَّريق إلى المستشفى') == shingles('الطريق الى المستشفي')
+        assert shingles('حفرة') == {'حفره'}
+
+    def test_signatures_are_stable_and_estimate_similarity(self):
+        first, second = MinHasher(), MinHasher()
+        road = first.signature(_text(ROAD))
+        reworded = first.signature(_text(ROAD).replace('نطالب بإصلاح عاجل للطريق', 'نرجو إصلاح الطريق'))
+
+        assert road == second.signature(_text(ROAD))
+        assert unpack_signature(pack_signature(road)) == road
+        assert similarity(road, reworded) >= 0.6
+        assert similarity(road, first.signature(_text(HOSPITAL))) < 0.2
+        assert first.signature('...') is None
+
+    def test_short_texts_fill_every_slot(self):
+        signature = MinHasher().signature('حفرة')
+
+        assert len(signature) == 64 and len(set(signature)) == 64
+        assert unpack_signature(pack_signature(signature)) == signature
+
+
+@pytest.mark.unit
+class TestDuplicateIndex:
+    """Test LSH matching, clustering and incremental loading"""
+
+    def test_match_clusters_and_scopes(self):
+        hasher = MinHasher()
+        index = DuplicateIndex(lambda after_id: [])
+        road = hasher.signature(_text(ROAD))
+        index.add('a', road, scope=1)
+        index.add('b', road, scope=1, cluster='a')
+
+        assert index.match(road, scope=1)[0] == 'a'
+        assert index.match(road, scope=2) is None
+        assert index.match(hasher.signature(_text(HOSPITAL)), scope=1) is None
+        assert index.cluster_of('b') == 'a'
+
+    def test_refresh_reloads_a_lookback_window(self):
+        packed = pack_signature(MinHasher().signature(_text(ROAD)))
+        rows = {1: ('a', 1, None, packed), 2: ('b', 1, 'a', packed), 4: ('d', 1, None, b'')}
+        requested = []
+
+        def loader(after_id):
+            requested.append(after_id)
+            return [(pk, *row) for pk, row in sorted(rows.items()) if pk > after_id]
+
+        index = DuplicateIndex(loader, lookback=2)
+        index.refresh()
+        # id 3 was allocated before id 4 but committed after the first refresh
+        rows[3] = ('c', 1, None, packed)
+        rows[5] = ('e', 2, None, packed)
+        index.refresh()
+
+        assert requested == [0, 2]
+        assert len(index) == 4 and index.last_id == 5
+        assert index.cluster_of('b') == 'a' and index.cluster_of('c') == 'c'
+
+
+@pytest.mark.unit
+class TestDuplicateSubmission:
+    """Test flagging at submission and the cluster endpoint"""
+
+    def _submit(self, make_complaint, sample, **overrides):
+        return make_complaint(title=sample['title'], description=sample['description'], **overrides)
+
+    def test_near_duplicates_join_the_first_complaint(self, service, client, auth_headers, make_complaint, count_queries):
+        original = self._submit(make_complaint, ROAD)
+        with count_queries() as plain:
+            self._submit(make_complaint, HOSPITAL)
+        with count_queries() as flagged:
+            duplicate = make_complaint(
+                title=ROAD['title'] + '!!',
+                description=ROAD['description'].replace('نطالب بإصلاح عاجل للطريق', 'نرجو إصلاح الطريق')
+            )
+        other_governorate = self._submit(make_complaint, ROAD, governorate_id=2)
+
+        assert original['duplicate_of'] is None
+        assert duplicate['duplicate_of'] == original['complaint_id'] and duplicate['duplicate_score'] >= 0.6
+        assert len(flagged) == len(plain)
+        assert other_governorate['duplicate_of'] is None
+
+        cluster = client.get(
+            f"/api/admin/complaints/{duplicate['complaint_id']}/duplicates", headers=auth_headers('1', role='admin')
+        ).get_json()
+        assert cluster['cluster'] == original['complaint_id']
+        assert [c['complaint_id'] for c in cluster['complaints']] == [original['complaint_id'], duplicate['complaint_id']]
+
+    def test_duplicates_within_a_bulk_batch_share_a_cluster(self, service, client, auth_headers, make_complaint):
+        reworded = ROAD['description'].replace('نطالب بإصلاح عاجل للطريق', 'نرجو إصلاح الطريق')
+        item = {'complaint_type_id': 1, 'governorate_id': 1, 'citizen_id': 1, 'citizen_name': 'مواطن', 'citizen_email': 'citizen@example.com'}
+        existing = self._submit(make_complaint, HOSPITAL, governorate_id=1)
+
+        response = client.post('/api/complaints/bulk', json={'complaints': [
+            dict(item, title=ROAD['title'], description=ROAD['description']),
+            dict(item, title=HOSPITAL['title'], description=HOSPITAL['description']),
+            dict(item, title=ROAD['title'], description=reworded),
+            dict(item, title=ROAD['title'], description=ROAD['description']),
+        ]}, headers=auth_headers('5', role='deputy'))
+        assert response.status_code == 201
+
+        ids = [result['complaint_id'] for result in response.get_json()['results']]
+        stored = {c.complaint_id: c.duplicate_of for c in service.Complaint.query}
+        assert [stored[complaint_id] for complaint_id in ids] == [None, existing['complaint_id'], ids[0], ids[0]]
+        assert service.duplicate_index.cluster_of(ids[3]) == ids[0]
+
+    def test_backfill_rebuilds_clusters(self, service, make_complaint):
+        first = self._submit(make_complaint, ROAD)
+        second = self._submit(make_complaint, ROAD)
+        service.Complaint.query.update({'text_signature': None, 'duplicate_of': None, 'duplicate_score': None})
+        service.db.session.commit()
+        service.duplicate_index.reset()
+        updated_at = dict(service.db.session.execute(service.db.select(service.Complaint.id, service.Complaint.updated_at)).all())
+
+        assert service.backfill_text_signatures(batch_size=1) == 2
+        service.db.session.expire_all()
+        stored = service.Complaint.query.filter_by(complaint_id=second['complaint_id']).one()
+        assert stored.duplicate_of == first['complaint_id']
+        assert stored.updated_at == updated_at[stored.id]
+        assert len(service.duplicate_index) == 2
+
+    def test_cluster_endpoint_requires_reviewer(self, client, auth_headers, make_complaint):
+        created = make_complaint()
+
+        assert client.get(f"/api/admin/complaints/{created['complaint_id']}/duplicates", headers=auth_headers()).status_code == 403
+        assert client.get('/api/admin/complaints/missing/duplicates', headers=auth_headers('1', role='admin')).status_code == 404
@@ -0,0 +1,58 @@
+"""
+Unit tests for the streaming admin export
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+
+@pytest.mark.unit
+class TestExport:
+    """Test GET /api/admin/complaints/export"""
+
+    def test_requires_admin_role(self, client, auth_headers):
+        response = client.get('/api/admin/complaints/export', headers=auth_headers())
+        assert response.status_code == 403
+
+    def test_ndjson_stream_with_filters(self, client, auth_headers, make_complaint):
+        make_complaint(title='انقطاع الكهرباء', complaint_type_id=3)
+        make_complaint(identity='2', title='حفرة', governorate_id=2)
+        make_complaint(identity='3', title='كهرباء الشارع', complaint_type_id=3)
+
+        response = client.get(
+            '/api/admin/complaints/export?complaint_type_id=3',
+            headers=auth_headers('9', role='admin')
+        )
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [record['title'] for record in records] == ['انقطاع الكهرباء', 'كهرباء الشارع']
+        assert records[0]['governorate'] == 'القاهرة'
+        assert records[0]['description']
+
+    def test_csv_stream(self, client, auth_headers, make_complaint):
+        for index in range(3):
+            make_complaint(title=f'شكوى {index}')
+
+        response = client.get(
+            '/api/admin/complaints/export?format=csv&search=شكوى',
+            headers=auth_headers('9', role='admin')
+        )
+
+        assert response.mimetype == 'text/csv'
+        assert 'attachment' in response.headers['Content-Disposition']
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True).lstrip('\ufeff'))))
+        assert [row['title'] for row in rows] == ['شكوى 0', 'شكوى 1', 'شكوى 2']
+
+    def test_header_sent_before_rows(self, service):
+        chunks = service.export_csv(iter([]))
+        assert next(chunks).startswith('\ufeffid,complaint_id')
+
+    def test_rejects_unknown_format(self, client, auth_headers):
+        response = client.get('/api/admin/complaints/export?format=xml', headers=auth_headers('9', role='admin'))
+        assert response.status_code == 400
@@ -0,0 +1,129 @@
+"""
+Unit tests for background image variants
+"""
+
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from complaints import imaging
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 1000
+
+
+def fake_render(source_path):
+    """Stand-in worker that writes variant files without decoding the image"""
+    rendered = {}
+    for variant in imaging.VARIANTS:
+        path = imaging.variant_path(source_path, variant)
+        with open(path, 'wb') as output:
+            output.write(variant.encode())
+        rendered[variant] = path
+    return rendered
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+@pytest.mark.unit
+class TestImageProcessor:
+    """Test the bounded process pool"""
+
+    def test_results_are_reported(self, tmp_path):
+        source = tmp_path / 'abc'
+        source.write_bytes(PNG)
+        done = {}
+        processor = imaging.ImageProcessor(max_workers=1, worker=fake_render, on_done=done.__setitem__)
+
+        assert processor.submit('abc', str(source))
+        wait_for(lambda: 'abc' in done)
+        processor.shutdown()
+
+        assert imaging.existing_variants(str(source)) == done['abc']
+        assert processor.stats()['pending'] == 0
+
+    def test_rejects_when_full(self, tmp_path):
+        processor = imaging.ImageProcessor(max_workers=1, max_pending=1, worker=time.sleep)
+
+        assert processor.submit('a', 1)
+        assert processor.submit('a', 1)  # نفس المحتوى قيد المعالجة
+        assert not processor.submit('b', 1)
+        processor.shutdown()
+
+        assert processor.stats()['rejected'] == 1
+
+    def test_failed_submit_releases_slot(self):
+        class BrokenExecutor:
+            def submit(self, *args):
+                raise BrokenProcessPool('worker died')
+
+        processor = imaging.ImageProcessor(max_workers=1, max_pending=1, worker=time.sleep)
+        processor._executor = BrokenExecutor()
+
+        with pytest.raises(BrokenProcessPool):
+            processor.submit('a', 0)
+        assert processor.stats()['pending'] == 0
+        assert processor.submit('a', 0)  # the slot is free again and a fresh pool is created
+        processor.shutdown()
+
+    def test_render_variants_with_pillow(self, tmp_path):
+        Image = pytest.importorskip('PIL.Image')
+        source = tmp_path / 'photo'
+        Image.new('RGBA', (3000, 2000), (200, 10, 10, 128)).save(source, 'PNG')
+
+        rendered = imaging.render_variants(str(source))
+
+        with Image.open(rendered['thumbnail']) as thumbnail:
+            assert max(thumbnail.size) == 320
+        assert os.path.getsize(rendered['thumbnail']) < os.path.getsize(source)
+
+
+@pytest.mark.unit
+class TestAttachmentVariants:
+    """Test recording and serving derived files"""
+
+    def test_variants_recorded_and_served(self, service, client, auth_headers, make_complaint):
+        complaint = make_complaint()
+        headers = dict(auth_headers(), **{'X-File-Name': 'photo.png', 'Content-Type': 'application/octet-stream'})
+        attachment = client.post(
+            f"/api/complaints/{complaint['complaint_id']}/attachments", data=PNG, headers=headers
+        ).get_json()['attachment']
+        stored = service.ComplaintAttachment.query.one()
+        url = f"/api/complaints/{complaint['complaint_id']}/attachments/{attachment['id']}"
+
+        # قبل المعالجة تُعاد الصورة الأصلية
+        assert client.get(f'{url}?variant=thumbnail', headers=auth_headers()).data == PNG
+
+        service.record_image_variants(stored.sha256, fake_render(stored.file_path))
+        service.db.session.expire_all()
+
+        thumbnail = client.get(f'{url}?variant=thumbnail', headers=auth_headers())
+        assert thumbnail.data == b'thumbnail'
+        assert thumbnail.mimetype == 'image/jpeg'
+        assert client.get(f'{url}?variant=huge', headers=auth_headers()).status_code == 400
+
+        # رفع نفس الصورة لشكوى أخرى يستفيد من النسخ الموجودة مباشرة
+        other = make_complaint()
+        duplicate = client.post(
+            f"/api/complaints/{other['complaint_id']}/attachments", data=PNG, headers=headers
+        ).get_json()['attachment']
+        assert duplicate['variants'] == ['thumbnail', 'web']
+
+    def test_scheduling_failure_does_not_fail_upload(self, service, client, auth_headers, make_complaint, monkeypatch):
+        def broken(sha256, path):
+            raise BrokenProcessPool('worker died')
+
+        monkeypatch.setattr(service, 'schedule_image_processing', broken)
+        complaint = make_complaint()
+        headers = dict(auth_headers(), **{'X-File-Name': 'photo.png', 'Content-Type': 'application/octet-stream'})
+
+        response = client.post(f"/api/complaints/{complaint['complaint_id']}/attachments", data=PNG, headers=headers)
+
+        assert response.status_code == 201
+        assert service.ComplaintAttachment.query.count() == 1
@@ -0,0 +1,55 @@
+"""
+Unit tests for keyset (cursor) pagination of GET /api/complaints
+"""
+
+import pytest
+
+from complaints.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.unit
+class TestCursorPagination:
+    """Test cursor mode of the complaints list"""
+
+    def test_cursor_roundtrip(self):
+        from datetime import datetime
+
+        submitted_at = datetime(2025, 1, 2, 3, 4, 5, 678)
+        assert decode_cursor(encode_cursor(submitted_at, 42)) == (submitted_at, 42)
+        with pytest.raises(ValueError):
+            decode_cursor('not-a-cursor')
+
+    def test_walk_all_pages(self, service, client, auth_headers, make_complaint):
+        created = [make_complaint(title=f'شكوى {index}')['complaint_id'] for index in range(7)]
+        # submitted_at متطابق لنصف الشكاوى لاختبار كسر التعادل بالمعرف
+        service.Complaint.query.filter(service.Complaint.id <= 4).update(
+            {'submitted_at': service.db.session.get(service.Complaint, 1).submitted_at}
+        )
+        service.db.session.commit()
+
+        seen, cursor, pages = [], '', 0
+        while True:
+            response = client.get(f'/api/complaints?per_page=3&cursor={cursor}', headers=auth_headers())
+            payload = response.get_json()
+            assert response.status_code == 200
+            assert payload['total'] is None
+            seen += [item['complaint_id'] for item in payload['complaints']]
+            pages += 1
+            if not payload['next_cursor']:
+                break
+            cursor = payload['next_cursor']
+
+        assert pages == 3
+        assert sorted(seen) == sorted(created)
+        assert len(set(seen)) == 7
+
+    def test_optional_total_and_bad_cursor(self, client, auth_headers, make_complaint):
+        make_complaint()
+        make_complaint(identity='2')
+
+        payload = client.get('/api/complaints?cursor=&include_total=true', headers=auth_headers()).get_json()
+        bad = client.get('/api/complaints?cursor=%%%', headers=auth_headers())
+
+        assert payload['total'] == 1
+        assert payload['has_more'] is False
+        assert bad.status_code == 400
@@ -0,0 +1,56 @@
+"""
+Unit tests for sparse fieldsets pushed down into the list SELECT
+"""
+
+import pytest
+
+
+@pytest.mark.unit
+class TestProjectionPushdown:
+    """Test fields= on GET /api/complaints"""
+
+    def _select_sql(self, statements):
+        return [sql for sql in statements if 'FROM complaints' in sql and 'count(' not in sql][-1]
+
+    def test_only_requested_columns_fetched(self, client, auth_headers, make_complaint, count_queries):
+        make_complaint()
+
+        with count_queries() as statements:
+            payload = client.get('/api/complaints?fields=id,title,status', headers=auth_headers()).get_json()
+
+        sql = self._select_sql(statements).split('FROM')[0]
+        assert set(payload['complaints'][0]) == {'id', 'title', 'status'}
+        assert 'citizen_email' not in sql
+        assert 'description' not in sql
+        assert 'governorate_id' not in sql
+
+    def test_default_list_skips_description(self, client, auth_headers, make_complaint, count_queries):
+        make_complaint()
+
+        with count_queries() as statements:
+            client.get('/api/complaints', headers=auth_headers())
+
+        assert 'description' not in self._select_sql(statements).split('FROM')[0]
+
+    def test_optional_description_field(self, client, auth_headers, make_complaint):
+        make_complaint(description='وصف تفصيلي')
+
+        payload = client.get('/api/complaints?fields=title,description', headers=auth_headers()).get_json()
+
+        assert payload['complaints'] == [{'title': 'حفرة في الطريق الرئيسي', 'description': 'وصف تفصيلي'}]
+
+    def test_cursor_mode_with_projection(self, client, auth_headers, make_complaint):
+        for _ in range(3):
+            make_complaint()
+
+        payload = client.get('/api/complaints?cursor=&per_page=2&fields=governorate', headers=auth_headers()).get_json()
+
+        assert payload['complaints'][0] == {'governorate': payload['complaints'][0]['governorate']}
+        assert payload['complaints'][0]['governorate']['name'] == 'القاهرة'
+        assert payload['next_cursor']
+
+    def test_blank_fields_is_rejected(self, client, auth_headers, make_complaint):
+        make_complaint()
+
+        for blank in (',', '%20'):
+            assert client.get(f'/api/complaints?fields={blank}', headers=auth_headers()).status_code == 400
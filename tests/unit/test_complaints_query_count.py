@@ -0,0 +1,43 @@
+"""
+Regression tests guarding against N+1 lazy loads in complaint endpoints
+"""
+
+import pytest
+
+
+@pytest.mark.unit
+class TestQueryCount:
+    """Statements per request must not grow with the number of rows"""
+
+    def _list_statements(self, client, auth_headers, count_queries):
+        with count_queries() as statements:
+            response = client.get('/api/complaints?per_page=100', headers=auth_headers())
+        assert response.status_code == 200
+        return len(statements), response.get_json()
+
+    def test_list_statements_constant(self, service, client, auth_headers, make_complaint, count_queries):
+        make_complaint()
+        baseline, _ = self._list_statements(client, auth_headers, count_queries)
+        service.db.session.expunge_all()
+
+        for index in range(10):
+            make_complaint(complaint_type_id=(index % 5) + 1, governorate_id=(index % 7) + 1)
+        service.db.session.expunge_all()
+        statements, payload = self._list_statements(client, auth_headers, count_queries)
+
+        assert len(payload['complaints']) == 11
+        assert payload['complaints'][0]['governorate'] is not None
+        assert statements == baseline <= 2
+
+    def test_detail_statements_constant(self, service, client, auth_headers, make_complaint, count_queries):
+        complaint = make_complaint()
+        service.db.session.expunge_all()
+
+        with count_queries() as statements:
+            response = client.get(f"/api/complaints/{complaint['complaint_id']}", headers=auth_headers())
+
+        payload = response.get_json()['complaint']
+        assert response.status_code == 200
+        assert len(payload['updates']) == 1
+        assert payload['complaint_type']['id'] == 1
+        assert len(statements) <= 3
@@ -0,0 +1,73 @@
+"""
+Unit tests for the reviewer work queue
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def queued(service, make_complaint):
+    """Three complaints with distinct priorities and ages"""
+    complaints = {}
+    base = datetime(2024, 1, 1)
+    for name, priority, age in [('old_medium', 'medium', 3), ('new_urgent', 'urgent', 1), ('old_urgent', 'urgent', 2)]:
+        complaint_id = make_complaint()['complaint_id']
+        service.Complaint.query.filter_by(complaint_id=complaint_id).update(
+            {'priority': priority, 'submitted_at': base - timedelta(days=age)}
+        )
+        complaints[name] = complaint_id
+    service.db.session.commit()
+    return complaints
+
+
+@pytest.mark.unit
+class TestWorkQueue:
+    """Test /api/admin/queue endpoints"""
+
+    def test_claims_by_priority_then_age(self, service, client, auth_headers, queued):
+        headers = auth_headers('50', role='deputy')
+
+        order = [client.post('/api/admin/queue/claim', headers=headers).get_json()['complaint'] for _ in range(3)]
+        empty = client.post('/api/admin/queue/claim', headers=headers)
+
+        assert [c['complaint_id'] for c in order] == [queued['old_urgent'], queued['new_urgent'], queued['old_medium']]
+        assert all(c['status'] == 'under_review' and c['assigned_to'] == 50 and c['reviewed_at'] for c in order)
+        assert order[0]['updates'][0]['update_type'] == 'assignment'
+        assert empty.status_code == 204
+        assert client.get('/api/stats').get_json()['under_review'] == 3
+
+    def test_summary_and_release(self, service, client, auth_headers, queued):
+        deputy = auth_headers('50', role='deputy')
+        claimed = client.post('/api/admin/queue/claim', headers=deputy).get_json()['complaint']['complaint_id']
+
+        summary = client.get('/api/admin/queue', headers=deputy).get_json()
+        other = client.post(f'/api/admin/queue/{claimed}/release', headers=auth_headers('51', role='deputy'))
+        released = client.post(f'/api/admin/queue/{claimed}/release', headers=deputy)
+
+        assert summary['waiting'] == 2
+        assert summary['by_priority'] == {'urgent': 1, 'high': 0, 'medium': 1, 'low': 0}
+        assert other.status_code == 404
+        assert released.status_code == 200
+        assert client.get('/api/admin/queue', headers=deputy).get_json()['waiting'] == 3
+
+    def test_citizens_cannot_pull_work(self, client, auth_headers, queued):
+        assert client.post('/api/admin/queue/claim', headers=auth_headers()).status_code == 403
+
+    def test_auto_assigned_complaints_skip_the_queue_until_released(self, service, client, auth_headers, make_complaint):
+        admin = auth_headers('1', role='admin')
+        client.post('/api/admin/deputy-routes', json={'deputy_id': 40, 'governorate_id': 1}, headers=admin)
+        routed = make_complaint()
+        assert routed['assigned_to'] == 40
+
+        other = auth_headers('50', role='deputy')
+        assert client.get('/api/admin/queue', headers=other).get_json()['waiting'] == 0
+        assert client.post('/api/admin/queue/claim', headers=other).status_code == 204
+
+        released = client.post(f"/api/admin/queue/{routed['complaint_id']}/release", headers=auth_headers('40', role='deputy'))
+        claimed = client.post('/api/admin/queue/claim', headers=other).get_json()['complaint']
+
+        assert released.status_code == 200
+        assert claimed['complaint_id'] == routed['complaint_id'] and claimed['assigned_to'] == 50
+        assert service.assignment_engine.load_of(40) == 0
@@ -0,0 +1,86 @@
+"""
+Unit tests for the per-citizen submission quota
+"""
+
+import pytest
+
+from complaints.quota import LocalQuotaStore, QuotaExceeded, SubmissionQuota
+
+DAY = 24 * 3600
+
+
+class Clock:
+    def __init__(self, now=100 * DAY):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestSubmissionQuota:
+    """Test the sliding window counter"""
+
+    def test_limit_and_release(self):
+        quota = SubmissionQuota(limit=2, window_seconds=DAY, clock=Clock())
+
+        window = quota.acquire('1')
+        quota.acquire('1')
+        with pytest.raises(QuotaExceeded) as exceeded:
+            quota.acquire('1')
+        quota.acquire('2')
+        quota.release('1', window)
+        quota.acquire('1')
+
+        assert 0 < exceeded.value.retry_after <= DAY
+
+    def test_previous_window_decays(self):
+        clock = Clock()
+        quota = SubmissionQuota(limit=4, window_seconds=DAY, clock=clock)
+        for _ in range(4):
+            quota.acquire('1')
+
+        clock.now += DAY + DAY // 4  # next window: 75% of the previous one still counts (3)
+        quota.acquire('1')
+        with pytest.raises(QuotaExceeded):
+            quota.acquire('1')
+
+        clock.now += DAY // 2  # at 75% of the window: 4 * 0.25 + 1 = 2
+        quota.acquire('1')
+        quota.acquire('1')
+        with pytest.raises(QuotaExceeded):
+            quota.acquire('1')
+
+    def test_local_store_prunes_stale_keys(self):
+        store = LocalQuotaStore(max_keys=2)
+        store.hit('a', 1, 1.0, 1, 5)
+        store.hit('b', 1, 1.0, 1, 5)
+
+        store.hit('c', 5, 1.0, 1, 5)
+
+        assert set(store._windows) == {'c'}
+
+
+@pytest.mark.unit
+class TestSubmissionQuotaEndpoint:
+    """Test quota enforcement in POST /api/complaints"""
+
+    def test_rejects_before_any_write(self, service, client, auth_headers, make_complaint, count_queries, monkeypatch):
+        monkeypatch.setitem(service.app.config, 'SUBMISSION_QUOTA_ENABLED', True)
+        limit = service.submission_quota.limit
+        for _ in range(limit):
+            make_complaint()
+
+        with count_queries() as queries:
+            response = client.post('/api/complaints', json={
+                'title': 'حفرة في الطريق الرئيسي', 'description': 'يوجد حفرة كبيرة في منتصف الطريق',
+                'complaint_type_id': 1, 'governorate_id': 1,
+                'citizen_name': 'مواطن', 'citizen_email': 'citizen@example.com'
+            }, headers=auth_headers())
+
+        assert response.status_code == 429
+        assert response.get_json()['error'] == service.SYSTEM_MESSAGES['complaint_limit_exceeded'].format(max_per_day=limit)
+        assert int(response.headers['Retry-After']) > 0
+        assert queries == []
+        assert service.Complaint.query.count() == limit
+        assert make_complaint(identity='2')['complaint_id']
@@ -0,0 +1,96 @@
+"""
+Unit tests for the in-memory reference data registry
+"""
+
+import pytest
+
+from complaints.registry import ReferenceRegistry
+
+
+@pytest.mark.unit
+class TestReferenceRegistry:
+    """Test registry loading and versioned refresh"""
+
+    def test_probe_interval_and_reload(self):
+        state = {'token': 'v1', 'loads': 0, 'probes': 0, 'now': 0.0}
+
+        def loader():
+            state['loads'] += 1
+            rows = [{'id': 1, 'name': state['token'], 'is_active': True, 'display_order': 1}]
+            return rows, [], state['token']
+
+        def probe():
+            state['probes'] += 1
+            return state['token']
+
+        registry = ReferenceRegistry(loader, probe, refresh_interval=60, clock=lambda: state['now'])
+
+        assert registry.governorate('1')['name'] == 'v1'
+        assert registry.governorate(True) is None and registry.governorate(1.5) is None
+        state['token'] = 'v2'
+        assert registry.governorate(1)['name'] == 'v1'
+        assert state['probes'] == 0
+
+        state['now'] = 61
+        assert registry.governorate(1)['name'] == 'v2'
+        assert state['loads'] == 2
+        assert registry.snapshot().version == 2
+
+    def test_submission_skips_reference_queries(self, client, auth_headers, make_complaint, count_queries):
+        make_complaint()
+
+        with count_queries() as statements:
+            make_complaint()
+
+        assert not any('FROM governorates' in sql or 'FROM complaint_types' in sql for sql in statements)
+
+    def test_admin_edit_refreshes_registry(self, service, client):
+        governorate = service.db.session.get(service.Governorate, 1)
+        governorate.is_active = False
+        service.db.session.commit()
+
+        payload = client.get('/api/governorates').get_json()
+        assert 1 not in [gov['id'] for gov in payload['governorates']]
+        assert service.reference_registry.governorate(1)['is_active'] is False
+
+    def test_inactive_type_rejected(self, service, client, auth_headers):
+        complaint_type = service.db.session.get(service.ComplaintType, 2)
+        complaint_type.is_active = False
+        service.db.session.commit()
+
+        response = client.post('/api/complaints', json={
+            'title': 'انقطاع المياه', 'description': 'انقطاع المياه منذ أسبوع',
+            'complaint_type_id': 2, 'governorate_id': 1,
+            'citizen_name': 'مواطن', 'citizen_email': 'citizen@example.com',
+        }, headers=auth_headers())
+
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+class TestReferenceETags:
+    """Test conditional GET on reference endpoints"""
+
+    @pytest.mark.parametrize('url', ['/api/governorates', '/api/complaint-types'])
+    def test_not_modified(self, client, url):
+        first = client.get(url)
+        etag = first.headers['ETag']
+
+        second = client.get(url, headers={'If-None-Match': etag})
+
+        assert first.status_code == 200
+        assert 'max-age=' in first.headers['Cache-Control']
+        assert not etag.startswith('W/')
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_etag_changes_after_edit(self, service, client):
+        etag = client.get('/api/governorates').headers['ETag']
+        governorate = service.db.session.get(service.Governorate, 3)
+        governorate.name_en = 'Alexandria City'
+        service.db.session.commit()
+
+        response = client.get('/api/governorates', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
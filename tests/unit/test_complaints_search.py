@@ -0,0 +1,81 @@
+"""
+Unit tests for Arabic normalization and full-text complaint search
+"""
+
+import pytest
+
+from complaints.arabic import normalize_arabic, tokenize
+
+
+@pytest.mark.unit
+class TestArabicNormalization:
+    """Test folding rules used by the search index"""
+
+    def test_folding_and_diacritics(self):
+        assert normalize_arabic('إِسْكَنْدَرِيَّة') == 'اسكندريه'
+        assert normalize_arabic('مستشفى') == 'مستشفي'
+        assert normalize_arabic('آمـــال') == 'امال'
+
+    def test_prefix_stripping(self):
+        assert tokenize('الطريق وبالمستشفى ١٥') == ['طريق', 'مستشفي', '15']
+        assert tokenize('الى') == ['الي']
+
+
+@pytest.mark.unit
+class TestFullTextSearch:
+    """Test ranked FTS search through GET /api/complaints"""
+
+    def _search(self, client, auth_headers, term):
+        response = client.get('/api/complaints', query_string={'search': term}, headers=auth_headers())
+        assert response.status_code == 200
+        return [item['title'] for item in response.get_json()['complaints']]
+
+    def test_normalized_ranked_results(self, service, client, auth_headers, make_complaint):
+        assert service.app.config['FULL_TEXT_SEARCH'] == 'sqlite_fts5'
+        make_complaint(title='نقص الأدوية', description='المستشفى العام في الإسكندرية بلا أدوية')
+        make_complaint(title='مستشفى الإسكندرية الجامعي', description='تأخير في استقبال المرضى')
+        make_complaint(title='انقطاع المياه', description='لا توجد مياه منذ يومين')
+
+        titles = self._search(client, auth_headers, 'مستشفي اسكندريه')
+
+        assert titles == ['مستشفى الإسكندرية الجامعي', 'نقص الأدوية']
+
+    def test_index_follows_updates(self, service, client, auth_headers, make_complaint):
+        created = make_complaint(title='انقطاع الكهرباء')
+        complaint = service.Complaint.query.filter_by(complaint_id=created['complaint_id']).one()
+        complaint.title = 'تسرب الغاز'
+        service.db.session.commit()
+
+        assert self._search(client, auth_headers, 'كهرباء') == []
+        assert self._search(client, auth_headers, 'الغاز') == ['تسرب الغاز']
+
+    def test_complaint_id_prefix(self, client, auth_headers, make_complaint):
+        created = make_complaint(title='شكوى برقم')
+        assert self._search(client, auth_headers, created['complaint_id'][:13]) == ['شكوى برقم']
+
+    def test_backend_is_detected_without_init(self, service, client, auth_headers, make_complaint, monkeypatch):
+        # gunicorn workers import the app without running init_database
+        monkeypatch.delitem(service.app.config, 'FULL_TEXT_SEARCH')
+        make_complaint(title='انقطاع الكهرباء')
+
+        assert service.app.config['FULL_TEXT_SEARCH'] == 'sqlite_fts5'
+        assert service.search_index_size() == service.Complaint.query.count() == 1
+        assert self._search(client, auth_headers, 'كهرباء') == ['انقطاع الكهرباء']
+
+    def test_init_repairs_a_drifted_index(self, service, make_complaint):
+        make_complaint(title='انقطاع الكهرباء')
+        make_complaint(title='تسرب الغاز')
+        with service.db.engine.begin() as connection:
+            connection.execute(service.db.text('DELETE FROM complaints_fts WHERE rowid = (SELECT min(rowid) FROM complaints_fts)'))
+
+        service.init_database()
+
+        assert service.search_index_size() == 2
+
+    def test_rebuild_index(self, service, client, auth_headers, make_complaint):
+        make_complaint(title='حفرة في الطريق')
+        with service.db.engine.begin() as connection:
+            connection.execute(service.db.text('DELETE FROM complaints_fts'))
+
+        assert service.rebuild_search_index() == 1
+        assert self._search(client, auth_headers, 'طريق') == ['حفرة في الطريق']
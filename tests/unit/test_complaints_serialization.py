@@ -0,0 +1,64 @@
+"""
+Unit tests for the row-level complaint serializer
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from complaints import serialization
+from complaints.serialization import FieldProjectionError, RowSerializer, parse_fields
+
+
+@pytest.mark.unit
+class TestRowSerializer:
+    """Test projection and encoding helpers"""
+
+    def test_projection_and_embeds(self):
+        serializer = RowSerializer(
+            ['id', 'title', 'governorate_id'], ['title', 'governorate'],
+            {'governorate': ('governorate_id', lambda pk: {'id': pk})}
+        )
+        assert serializer.rows([(1, 'عنوان', 7)]) == [{'title': 'عنوان', 'governorate': {'id': 7}}]
+
+    def test_parse_fields(self):
+        allowed = ['id', 'title', 'status']
+        assert parse_fields(None, allowed, allowed) == allowed
+        assert parse_fields('status, id,status', allowed, allowed) == ['status', 'id']
+        with pytest.raises(FieldProjectionError):
+            parse_fields('id,password', allowed, allowed)
+        for blank in (',', ' ', ' , '):
+            with pytest.raises(FieldProjectionError):
+                parse_fields(blank, allowed, allowed)
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_dumps_matches_isoformat(self, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(serialization, 'orjson', None)
+        moment = datetime(2025, 5, 1, 12, 30, 15, 250)
+        payload = json.loads(serialization.dumps({'at': moment, 'name': 'القاهرة'}))
+        assert payload == {'at': moment.isoformat(), 'name': 'القاهرة'}
+
+
+@pytest.mark.unit
+class TestListSerialization:
+    """The row serializer must reproduce Complaint.to_dict(include_details=False)"""
+
+    def test_list_matches_model_serialization(self, service, client, auth_headers, make_complaint):
+        created = make_complaint(citizen_phone='0100', city='المعادي')
+        complaint = service.Complaint.query.filter_by(complaint_id=created['complaint_id']).one()
+
+        payload = client.get('/api/complaints', headers=auth_headers()).get_json()
+
+        assert payload['complaints'] == [complaint.to_dict(include_details=False)]
+        assert payload['total'] == 1 and payload['pages'] == 1
+
+    def test_fields_parameter(self, client, auth_headers, make_complaint):
+        make_complaint()
+
+        payload = client.get('/api/complaints?fields=title,status', headers=auth_headers()).get_json()
+        bad = client.get('/api/complaints?fields=title,secret', headers=auth_headers())
+
+        assert payload['complaints'] == [{'title': 'حفرة في الطريق الرئيسي', 'status': 'submitted'}]
+        assert bad.status_code == 400
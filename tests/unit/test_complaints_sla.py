@@ -0,0 +1,116 @@
+"""
+Unit tests for SLA due dates, the escalation scan and the admin SLA summary
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from complaints.sla import DEFAULT_RESOLUTION_DAYS, SlaScheduler, due_at_for
+
+
+def _set_due(service, complaint_id, due_at, **values):
+    service.Complaint.query.filter_by(complaint_id=complaint_id).update({'due_at': due_at, **values})
+    service.db.session.commit()
+
+
+def _escalations(service, complaint_id):
+    complaint = service.Complaint.query.filter_by(complaint_id=complaint_id).one()
+    return service.ComplaintUpdate.query.filter_by(complaint_id=complaint.id, update_type='escalation').count()
+
+
+@pytest.mark.unit
+class TestDueDates:
+    """Test due_at materialization"""
+
+    def test_due_at_falls_back_to_default(self):
+        submitted = datetime(2024, 1, 1)
+
+        assert due_at_for(submitted, 15) == datetime(2024, 1, 16)
+        assert due_at_for(submitted, None) == submitted + timedelta(days=DEFAULT_RESOLUTION_DAYS)
+
+    def test_complaint_types_get_resolution_days(self, service):
+        roads = service.ComplaintType.query.filter_by(category='infrastructure').first()
+        other = service.ComplaintType.query.filter_by(category='other').first()
+
+        assert roads.estimated_resolution_days == 45
+        assert other.estimated_resolution_days is None
+
+    def test_submission_stores_due_at(self, service, make_complaint):
+        complaint_id = make_complaint()['complaint_id']
+        complaint = service.Complaint.query.filter_by(complaint_id=complaint_id).one()
+
+        assert complaint.due_at == complaint.submitted_at + timedelta(days=45)
+
+    def test_backfill_due_dates(self, service, make_complaint):
+        complaint_id = make_complaint()['complaint_id']
+        _set_due(service, complaint_id, None, submitted_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 2))
+
+        assert service.backfill_due_dates() == 1
+        complaint = service.Complaint.query.filter_by(complaint_id=complaint_id).one()
+        assert complaint.due_at == datetime(2024, 2, 15)
+        assert complaint.updated_at == datetime(2024, 1, 2)
+
+
+@pytest.mark.unit
+class TestSlaScan:
+    """Test scan_sla windows and idempotency"""
+
+    def test_scan_flags_due_soon_and_overdue_once(self, service, make_complaint):
+        now = datetime(2024, 6, 1, 12)
+        soon, late, later, resolved = (make_complaint()['complaint_id'] for _ in range(4))
+        _set_due(service, soon, now + timedelta(hours=10))
+        _set_due(service, late, now - timedelta(days=1))
+        _set_due(service, later, now + timedelta(days=10))
+        _set_due(service, resolved, now - timedelta(days=1), status='resolved')
+
+        with service.app.app_context():
+            first = service.scan_sla(now)
+            second = service.scan_sla(now)
+
+        assert first == {'warning': [soon], 'overdue': [late]}
+        assert second == {'warning': [], 'overdue': []}
+        assert _escalations(service, soon) == 1
+        assert _escalations(service, late) == 1
+        assert _escalations(service, resolved) == 0
+
+    def test_overdue_while_paused_escalates_on_resume(self, service, make_complaint):
+        now = datetime(2024, 6, 1, 12)
+        complaint_id = make_complaint()['complaint_id']
+        _set_due(service, complaint_id, now - timedelta(days=1), status='pending_info')
+        scheduler = SlaScheduler(service.run_sla_scan)
+
+        assert scheduler.run_once(now)['overdue'] == []
+        _set_due(service, complaint_id, now - timedelta(days=1), status='in_progress')
+
+        assert scheduler.run_once(now + timedelta(minutes=5))['overdue'] == [complaint_id]
+        assert _escalations(service, complaint_id) == 1
+
+    def test_scheduler_records_last_scan(self):
+        calls = []
+        scheduler = SlaScheduler(calls.append)
+
+        scheduler.run_once(1)
+        scheduler.run_once(2)
+
+        assert calls == [1, 2] and scheduler.last_scan == 2
+
+
+@pytest.mark.unit
+class TestSlaSummary:
+    """Test GET /api/admin/sla"""
+
+    def test_summary_counts_and_scope(self, service, client, auth_headers, make_complaint):
+        now = datetime.utcnow()
+        mine, other, soon = (make_complaint()['complaint_id'] for _ in range(3))
+        _set_due(service, mine, now - timedelta(days=2), assigned_to=50)
+        _set_due(service, other, now - timedelta(days=1), assigned_to=51)
+        _set_due(service, soon, now + timedelta(hours=1), assigned_to=50)
+
+        admin = client.get('/api/admin/sla', headers=auth_headers('1', role='admin')).get_json()
+        deputy = client.get('/api/admin/sla', headers=auth_headers('50', role='deputy')).get_json()
+
+        assert admin['overdue_count'] == 2 and admin['due_soon_count'] == 1
+        assert [row['complaint_id'] for row in admin['overdue']] == [mine, other]
+        assert deputy['overdue_count'] == 1 and deputy['due_soon_count'] == 1
+        assert client.get('/api/admin/sla', headers=auth_headers()).status_code == 403
@@ -0,0 +1,50 @@
+"""
+Unit tests for the complaint statistics engine
+"""
+
+import pytest
+
+
+@pytest.mark.unit
+class TestStatsEngine:
+    """Test aggregation straight from the complaints table"""
+
+    def test_stats_counts(self, service, make_complaint):
+        first = make_complaint()
+        make_complaint(complaint_type_id=4, governorate_id=2)
+        make_complaint(complaint_type_id=6)
+
+        complaint = service.Complaint.query.filter_by(complaint_id=first['complaint_id']).one()
+        complaint.status = 'resolved'
+        complaint.citizen_rating = 4
+        service.db.session.add(service.ComplaintAttachment(
+            complaint_id=complaint.id, filename='a.pdf', original_filename='a.pdf',
+            file_size=10, file_type='pdf', file_path='uploads/a.pdf'
+        ))
+        service.db.session.add(service.ComplaintAttachment(
+            complaint_id=complaint.id, filename='b.pdf', original_filename='b.pdf',
+            file_size=10, file_type='pdf', file_path='uploads/b.pdf'
+        ))
+        service.db.session.commit()
+
+        stats = service.stats_from_counters(service.compute_stats())
+
+        assert stats['total_complaints'] == 3
+        assert stats['submitted'] == 2
+        assert stats['resolved'] == 1
+        assert stats['high_priority'] == 1
+        assert stats['urgent_priority'] == 1
+        assert stats['with_attachments'] == 1
+        assert stats['rated_complaints'] == 1
+        assert sum(item['count'] for item in stats['by_type']) == 3
+        by_governorate = {item['governorate']: item['count'] for item in stats['by_governorate']}
+        assert by_governorate == {'القاهرة': 2, 'الجيزة': 1}
+
+    def test_stats_query_count_is_constant(self, service, make_complaint, count_queries):
+        for _ in range(5):
+            make_complaint()
+
+        with count_queries() as statements:
+            service.compute_stats()
+
+        assert len(statements) == 2
@@ -0,0 +1,71 @@
+"""
+Unit tests for the incrementally maintained statistics counters
+"""
+
+import pytest
+
+
+@pytest.mark.unit
+class TestStatsCounters:
+    """Test complaint_stats_counters maintenance and reconciliation"""
+
+    def test_counters_follow_write_paths(self, service, client, auth_headers, make_complaint):
+        first = make_complaint()
+        make_complaint(complaint_type_id=4, governorate_id=2)
+
+        complaint = service.Complaint.query.filter_by(complaint_id=first['complaint_id']).one()
+        service.record_status_change(complaint.status, 'resolved')
+        complaint.status = 'resolved'
+        service.db.session.commit()
+
+        response = client.post(
+            f"/api/complaints/{first['complaint_id']}/rate",
+            json={'rating': 5}, headers=auth_headers()
+        )
+        assert response.status_code == 200
+
+        stats = client.get('/api/stats').get_json()
+        assert stats['total_complaints'] == 2
+        assert stats['submitted'] == 1
+        assert stats['resolved'] == 1
+        assert stats['high_priority'] == 1
+        assert stats['rated_complaints'] == 1
+        assert stats == service.stats_from_counters(service.compute_stats()) | {
+            'by_type': stats['by_type'], 'by_governorate': stats['by_governorate']
+        }
+        assert sorted(item['count'] for item in stats['by_governorate']) == [1, 1]
+
+    def test_reader_uses_registry_and_skips_malformed_buckets(self, service, client, make_complaint, count_queries):
+        make_complaint()
+        service.apply_stats_deltas({('type', 'True'): 1, ('governorate', '1.5'): 1})
+        service.db.session.commit()
+
+        with count_queries() as statements:
+            stats = service.read_stats_counters()
+
+        assert len(statements) == 1
+        assert stats['by_type'] == [{'type': service.reference_registry.complaint_type(1)['name'], 'count': 1}]
+        assert stats['by_governorate'] == [{'governorate': 'القاهرة', 'count': 1}]
+        assert client.get('/api/stats').status_code == 200
+
+    def test_reconcile_fixes_drift(self, service, make_complaint):
+        make_complaint()
+        make_complaint()
+        service.apply_stats_deltas({('total', ''): 5, ('status', 'closed'): 1})
+        service.db.session.commit()
+
+        drift = service.rebuild_stats_counters()
+
+        assert drift == {'total:': -5, 'status:closed': -1}
+        assert service.read_stats_counters()['total_complaints'] == 2
+        assert service.rebuild_stats_counters() == {}
+
+    def test_reconcile_cli_command(self, service, make_complaint):
+        make_complaint()
+        service.db.session.execute(service.ComplaintStatsCounter.__table__.delete())
+        service.db.session.commit()
+
+        result = service.app.test_cli_runner().invoke(args=['reconcile-stats'])
+
+        assert result.exit_code == 0
+        assert service.read_stats_counters()['total_complaints'] == 1
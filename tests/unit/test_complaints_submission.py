@@ -0,0 +1,57 @@
+"""
+Unit tests for single-transaction complaint submission
+"""
+
+import pytest
+
+
+@pytest.mark.unit
+class TestSubmission:
+    """Test POST /api/complaints transaction shape"""
+
+    def test_single_commit_without_reads(self, service, client, auth_headers, make_complaint, count_queries):
+        make_complaint()
+        commits = []
+
+        def record_commit(session):
+            commits.append(session)
+
+        service.db.event.listen(service.db.session, 'after_commit', record_commit)
+        try:
+            with count_queries() as statements:
+                created = make_complaint()
+        finally:
+            service.db.event.remove(service.db.session, 'after_commit', record_commit)
+
+        assert len(commits) == 1
+        assert not [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+        assert created['status'] == 'submitted'
+        assert created['attachments'] == []
+        assert [update['new_status'] for update in created['updates']] == ['submitted']
+        assert created['updates'][0]['created_at'] == created['submitted_at']
+
+    def test_complaint_and_history_roll_back_together(self, service, client, auth_headers, monkeypatch):
+        def failing_deltas(deltas):
+            raise RuntimeError('counter failure')
+
+        monkeypatch.setattr(service, 'apply_stats_deltas', failing_deltas)
+        response = client.post('/api/complaints', json={
+            'title': 'عنوان', 'description': 'وصف', 'complaint_type_id': 1, 'governorate_id': 1,
+            'citizen_name': 'مواطن', 'citizen_email': 'citizen@example.com',
+        }, headers=auth_headers())
+
+        assert response.status_code == 500
+        assert service.Complaint.query.count() == 0
+        assert service.ComplaintUpdate.query.count() == 0
+
+    @pytest.mark.parametrize('field', ['complaint_type_id', 'governorate_id'])
+    @pytest.mark.parametrize('value', [True, 1.5, '1', 0])
+    def test_reference_ids_must_be_integers(self, service, client, auth_headers, field, value):
+        payload = {
+            'title': 'عنوان', 'description': 'وصف', 'complaint_type_id': 1, 'governorate_id': 1,
+            'citizen_name': 'مواطن', 'citizen_email': 'citizen@example.com', field: value,
+        }
+        response = client.post('/api/complaints', json=payload, headers=auth_headers())
+
+        assert response.status_code == 400
+        assert service.Complaint.query.count() == 0
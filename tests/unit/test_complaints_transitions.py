@@ -0,0 +1,77 @@
+"""
+Unit tests for the complaint state machine and bulk transitions
+"""
+
+import pytest
+
+from complaints.workflow import STATUSES, TRANSITIONS, can_transition, sources_for
+
+
+@pytest.mark.unit
+class TestWorkflow:
+    """Test the transition table"""
+
+    def test_every_status_is_reachable(self):
+        reachable = {'submitted'} | {target for targets in TRANSITIONS.values() for target in targets}
+        assert reachable == set(STATUSES)
+
+    def test_transitions(self):
+        assert can_transition('submitted', 'under_review')
+        assert not can_transition('submitted', 'resolved')
+        assert not can_transition('closed', 'in_progress')
+        assert sources_for('closed') == ['pending_info', 'resolved', 'rejected']
+
+
+@pytest.mark.unit
+class TestBulkTransition:
+    """Test POST /api/admin/complaints/transition"""
+
+    def _transition(self, client, auth_headers, ids, status, identity='9', role='admin'):
+        return client.post(
+            '/api/admin/complaints/transition',
+            json={'complaint_ids': ids, 'status': status},
+            headers=auth_headers(identity, role=role)
+        )
+
+    def test_moves_batch_with_set_based_statements(self, service, client, auth_headers, make_complaint, count_queries):
+        ids = [make_complaint()['complaint_id'] for _ in range(30)]
+
+        with count_queries() as queries:
+            response = self._transition(client, auth_headers, ids, 'under_review')
+
+        assert response.status_code == 200
+        assert sorted(response.get_json()['updated']) == sorted(ids)
+        assert len(queries) <= 10
+        assert service.Complaint.query.filter(service.Complaint.reviewed_at.isnot(None)).count() == 30
+        assert service.ComplaintUpdate.query.filter_by(new_status='under_review').count() == 30
+        stats = client.get('/api/stats').get_json()
+        assert stats['under_review'] == 30 and stats['submitted'] == 0
+
+    def test_invalid_and_missing_are_skipped(self, service, client, auth_headers, make_complaint):
+        first = make_complaint()['complaint_id']
+        second = make_complaint()['complaint_id']
+        self._transition(client, auth_headers, [first], 'under_review')
+
+        response = self._transition(client, auth_headers, [first, second, 'missing'], 'resolved').get_json()
+
+        assert response['updated'] == [first]
+        assert [(s['complaint_id'], s['status']) for s in response['skipped']] == [(second, 'submitted'), ('missing', None)]
+        resolved = service.Complaint.query.filter_by(complaint_id=first).one()
+        assert resolved.resolved_at is not None
+        latest = service.ComplaintUpdate.query.filter_by(complaint_id=resolved.id).order_by(service.ComplaintUpdate.id.desc()).first()
+        assert latest.message == service.SYSTEM_MESSAGES['complaint_resolved']
+
+    def test_deputy_limited_to_assigned(self, service, client, auth_headers, make_complaint):
+        mine = make_complaint()['complaint_id']
+        other = make_complaint()['complaint_id']
+        service.Complaint.query.filter_by(complaint_id=mine).update({'assigned_to': 50})
+        service.db.session.commit()
+
+        response = self._transition(client, auth_headers, [mine, other], 'under_review', identity='50', role='deputy')
+
+        assert response.get_json()['updated'] == [mine]
+
+    def test_validation(self, client, auth_headers):
+        assert self._transition(client, auth_headers, ['x'], 'archived').status_code == 400
+        assert self._transition(client, auth_headers, [], 'closed').status_code == 400
+        assert self._transition(client, auth_headers, ['x'], 'closed', role=None).status_code == 403
@@ -0,0 +1,86 @@
+"""
+Unit tests for paginated and archived complaint update history
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def long_history(service, make_complaint):
+    """A complaint with 30 updates, the oldest 15 of them a year old"""
+    complaint = make_complaint()
+    complaint_pk = service.Complaint.query.filter_by(complaint_id=complaint['complaint_id']).one().id
+    now = datetime.utcnow()
+    service.db.session.execute(service.db.insert(service.ComplaintUpdate), [
+        dict(
+            complaint_id=complaint_pk, update_type='note', message=f'ملاحظة {number}',
+            updated_by=9, updated_by_name='مراجع', updated_by_role='admin',
+            created_at=now + timedelta(days=-365 if number < 15 else 0, minutes=number)
+        )
+        for number in range(30)
+    ])
+    service.db.session.commit()
+    return complaint['complaint_id']
+
+
+def _page_through(client, auth_headers, complaint_id, limit):
+    messages, cursor = [], None
+    while True:
+        params = {'limit': limit, **({'cursor': cursor} if cursor else {})}
+        page = client.get(f'/api/complaints/{complaint_id}/updates', query_string=params, headers=auth_headers()).get_json()
+        messages += [update['message'] for update in page['updates']]
+        cursor = page['next_cursor']
+        if not cursor:
+            return messages
+
+
+@pytest.mark.unit
+class TestUpdateHistory:
+    """Test latest-N detail updates and keyset pages across the archive"""
+
+    def test_detail_returns_latest_updates_only(self, service, client, auth_headers, long_history):
+        payload = client.get(f'/api/complaints/{long_history}', headers=auth_headers()).get_json()
+
+        updates = payload['complaint']['updates']
+        assert len(updates) == service.UPDATES_PAGE_SIZE
+        assert updates[0]['message'] == 'ملاحظة 29'
+        assert payload['updates_next_cursor']
+
+    def test_pages_span_hot_and_archive_tables(self, service, client, auth_headers, long_history):
+        before = _page_through(client, auth_headers, long_history, limit=7)
+
+        archived = service.archive_update_history(older_than_days=180)
+
+        assert archived == 15
+        assert service.ComplaintUpdateArchive.query.count() == 15
+        assert _page_through(client, auth_headers, long_history, limit=7) == before
+        assert before[0] == 'ملاحظة 29' and len(before) == 31
+
+    def test_archive_is_read_without_init(self, service, client, auth_headers, long_history, monkeypatch):
+        service.archive_update_history(older_than_days=180)
+        # gunicorn workers import the app without running init_database
+        monkeypatch.delitem(service.app.config, 'UPDATE_HISTORY')
+
+        messages = _page_through(client, auth_headers, long_history, limit=10)
+
+        assert service.app.config['UPDATE_HISTORY'] == 'archive'
+        assert len(messages) == 31 and messages[-1] == 'ملاحظة 0'
+
+    def test_archive_keeps_newest_row(self, service, make_complaint):
+        make_complaint()
+        service.ComplaintUpdate.query.update({'created_at': datetime(2020, 1, 1)})
+        service.db.session.commit()
+
+        assert service.archive_update_history(older_than_days=1) == 0
+        assert service.ComplaintUpdate.query.count() == 1
+
+    def test_invalid_cursor(self, client, auth_headers, long_history):
+        response = client.get(f'/api/complaints/{long_history}/updates?cursor=bad', headers=auth_headers())
+
+        assert response.status_code == 400
+
+    def test_month_start(self, service):
+        assert service.month_start(datetime(2024, 11, 17), 2) == datetime(2025, 1, 1)
+        assert service.month_start(datetime(2024, 1, 31), -1) == datetime(2023, 12, 1)
@@ -0,0 +1,99 @@
+"""
+Unit tests for the streaming attachment upload pipeline
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+from complaints.uploads import UploadError, detect_file_type, receive_stream
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 200_000
+PDF = b'%PDF-1.7\n' + b'x' * 1000
+
+
+class ChunkCountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        assert 0 < size <= 64 * 1024
+        return super().read(size)
+
+
+@pytest.mark.unit
+class TestReceiveStream:
+    """Test chunked receiving, hashing and magic-byte validation"""
+
+    def test_chunked_hash_and_size(self, tmp_path):
+        stream = ChunkCountingStream(PNG)
+
+        received = receive_stream(stream, str(tmp_path), 'png', max_bytes=1024 * 1024)
+
+        assert received.size == len(PNG)
+        assert received.sha256 == hashlib.sha256(PNG).hexdigest()
+        assert stream.reads > 3
+        final = received.commit_to(str(tmp_path / 'final' / 'a.png'))
+        assert open(final, 'rb').read() == PNG
+        assert [name for name in os.listdir(tmp_path) if name.endswith('.part')] == []
+
+    @pytest.mark.parametrize('data, expected_type, status', [
+        (PDF, 'png', 415),
+        (PNG, 'png', 413),
+        (b'', 'pdf', 400),
+    ])
+    def test_rejections_leave_no_temp_file(self, tmp_path, data, expected_type, status):
+        with pytest.raises(UploadError) as error:
+            receive_stream(io.BytesIO(data), str(tmp_path), expected_type, max_bytes=100_000)
+
+        assert error.value.status == status
+        assert os.listdir(tmp_path) == []
+
+    def test_detect_file_type(self):
+        assert detect_file_type(b'GIF89a' + b'\x00' * 10) == 'gif'
+        assert detect_file_type(b'RIFF\x00\x00\x00\x00WEBPVP8 ') == 'webp'
+        assert detect_file_type(b'plain text file!') is None
+
+
+@pytest.mark.unit
+class TestUploadEndpoint:
+    """Test POST /api/complaints/<id>/attachments"""
+
+    def _upload(self, client, auth_headers, complaint_id, data, filename, identity='1'):
+        headers = dict(auth_headers(identity), **{'X-File-Name': filename, 'Content-Type': 'application/octet-stream'})
+        return client.post(f'/api/complaints/{complaint_id}/attachments', data=data, headers=headers)
+
+    def test_upload_creates_attachment(self, service, client, auth_headers, make_complaint):
+        complaint = make_complaint()
+
+        response = self._upload(client, auth_headers, complaint['complaint_id'], PDF, 'تقرير.pdf')
+
+        assert response.status_code == 201
+        attachment = service.ComplaintAttachment.query.one()
+        assert attachment.original_filename == 'تقرير.pdf'
+        assert attachment.sha256 == hashlib.sha256(PDF).hexdigest()
+        assert open(attachment.file_path, 'rb').read() == PDF
+        assert client.get('/api/stats').get_json()['with_attachments'] == 1
+
+    def test_rejects_spoofed_type_and_foreign_complaint(self, service, client, auth_headers, make_complaint):
+        complaint = make_complaint()
+
+        spoofed = self._upload(client, auth_headers, complaint['complaint_id'], PDF, 'photo.jpg')
+        text = self._upload(client, auth_headers, complaint['complaint_id'], b'hello', 'notes.txt')
+        foreign = self._upload(client, auth_headers, complaint['complaint_id'], PDF, 'a.pdf', identity='2')
+
+        assert spoofed.status_code == 415
+        assert text.status_code == 415
+        assert foreign.status_code == 404
+        assert service.ComplaintAttachment.query.count() == 0
+
+    def test_max_files_per_complaint(self, service, client, auth_headers, make_complaint, monkeypatch):
+        monkeypatch.setitem(service.ALLOWED_FILE_TYPES, 'max_files_per_complaint', 1)
+        complaint = make_complaint()
+
+        assert self._upload(client, auth_headers, complaint['complaint_id'], PDF, 'a.pdf').status_code == 201
+        assert self._upload(client, auth_headers, complaint['complaint_id'], PDF, 'b.pdf').status_code == 400